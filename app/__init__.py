@@ -1,8 +1,23 @@
 from flask import Flask
+from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
+from flask_wtf.csrf import CSRFProtect
 from pathlib import Path
 from dotenv import load_dotenv
 import os
 
+from app.generation import GenerationExecutor
+from app.jobs import MemoryJobStore, RedisJobStore, ReportJobs
+from app.report_cache import ReportCache
+from src.config_registry import ConfigRegistry
+from src.config_store import SqliteConfigStore
+from src.data_processing.cache import (
+    DiskCacheBackend,
+    MemoryCacheBackend,
+    ProcessedDataCache,
+    RedisCacheBackend,
+)
+
 
 def create_app():
     load_dotenv()
@@ -12,13 +27,62 @@ def create_app():
     app.config.update(
         SECRET_KEY=os.getenv("SECRET_KEY", "dev"),
         MAX_CONTENT_LENGTH=16 * 1024 * 1024,  # 16MB max file size
-        UPLOAD_FOLDER=Path(os.getenv("UPLOAD_FOLDER", "temp/uploads")),
         MAX_FILES=int(os.getenv("MAX_FILES", 10)),
         ALLOWED_EXTENSIONS={"csv"},
+        CACHE_FOLDER=Path(os.getenv("CACHE_FOLDER", "temp/cache")),
+        CACHE_MAX_MB=int(os.getenv("CACHE_MAX_MB", 512)),
+        EXCEL_ENGINE=os.getenv("EXCEL_ENGINE", "openpyxl"),
+        GENERATION_POOL=os.getenv("GENERATION_POOL", "thread"),
+        GENERATION_WORKERS=int(os.getenv("GENERATION_WORKERS", 2)),
+        GENERATION_MAX_QUEUE=int(os.getenv("GENERATION_MAX_QUEUE", 8)),
+        GENERATION_TIMEOUT=float(os.getenv("GENERATION_TIMEOUT", 120)),
+        JOB_TTL=int(os.getenv("JOB_TTL", 3600)),
+        REPORT_CACHE_MB=int(os.getenv("REPORT_CACHE_MB", 64)),
+        REPORT_CACHE_TTL=int(os.getenv("REPORT_CACHE_TTL", 3600)),
+        CONFIG_CHECK_SECONDS=float(os.getenv("CONFIG_CHECK_SECONDS", 2)),
+        CONFIG_DB=os.getenv("CONFIG_DB"),
     )
 
-    # Ensure upload directory exists
-    app.config["UPLOAD_FOLDER"].mkdir(parents=True, exist_ok=True)
+    # Configs are listed from their source and imported on first use, changed
+    # config files are picked up without a restart. Declarative configs can
+    # also be kept in a SQLite store
+    app.config["CONFIG_REGISTRY"] = ConfigRegistry(
+        check_interval=app.config["CONFIG_CHECK_SECONDS"],
+        store=(
+            SqliteConfigStore(app.config["CONFIG_DB"])
+            if app.config["CONFIG_DB"]
+            else None
+        ),
+    )
+
+    # Processed datasets are cached on disk by default, run.py can swap in Redis
+    app.config["PROCESSED_DATA_CACHE"] = ProcessedDataCache(
+        DiskCacheBackend(
+            app.config["CACHE_FOLDER"],
+            max_bytes=app.config["CACHE_MAX_MB"] * 1024 * 1024,
+        )
+    )
+
+    # Finished reports are kept in memory, run.py can add a shared Redis tier
+    app.config["REPORT_CACHE"] = ReportCache(
+        [MemoryCacheBackend(max_bytes=app.config["REPORT_CACHE_MB"] * 1024 * 1024)]
+    )
+
+    # Reports are generated on a bounded pool, so heavy reports cannot tie up
+    # the request handlers
+    app.config["GENERATION_EXECUTOR"] = GenerationExecutor(
+        kind=app.config["GENERATION_POOL"],
+        workers=app.config["GENERATION_WORKERS"],
+        max_queue=app.config["GENERATION_MAX_QUEUE"],
+        timeout=app.config["GENERATION_TIMEOUT"] or None,
+    )
+
+    # Background report jobs are kept in this process, run.py can swap in Redis
+    app.config["REPORT_JOBS"] = ReportJobs(
+        MemoryJobStore(ttl=app.config["JOB_TTL"]),
+        app.config["GENERATION_EXECUTOR"],
+        report_cache=app.config["REPORT_CACHE"],
+    )
 
     # Register blueprints
     from app.routes import main
@@ -26,3 +90,42 @@ def create_app():
     app.register_blueprint(main)
 
     return app
+
+
+def configure_services(app, redis_client, limiter_storage_uri: str) -> Limiter:
+    """Add CSRF protection, the rate limiter and the Redis backed stores.
+
+    This is the production setup of run.py. Pass None as the client to keep
+    caches and jobs in the server process.
+    """
+    CSRFProtect(app)
+
+    if redis_client is not None:
+        # Share processed datasets and finished reports between workers through
+        # Redis when requested
+        if os.environ.get("CACHE_BACKEND") == "redis":
+            app.config["PROCESSED_DATA_CACHE"] = ProcessedDataCache(
+                RedisCacheBackend(
+                    redis_client, max_bytes=app.config["CACHE_MAX_MB"] * 1024 * 1024
+                )
+            )
+            app.config["REPORT_CACHE"].tiers.append(
+                RedisCacheBackend(
+                    redis_client,
+                    max_bytes=app.config["REPORT_CACHE_MB"] * 1024 * 1024,
+                    prefix="report",
+                    ttl=app.config["REPORT_CACHE_TTL"],
+                )
+            )
+
+        # Keep report jobs in Redis, so any server process can report on them
+        if os.environ.get("JOB_BACKEND", "redis") == "redis":
+            app.config["REPORT_JOBS"] = ReportJobs(
+                RedisJobStore(redis_client, ttl=app.config["JOB_TTL"]),
+                app.config["GENERATION_EXECUTOR"],
+                report_cache=app.config["REPORT_CACHE"],
+            )
+
+    return Limiter(
+        app=app, key_func=get_remote_address, storage_uri=limiter_storage_uri
+    )
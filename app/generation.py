@@ -0,0 +1,202 @@
+import asyncio
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+import io
+import logging
+import pickle
+import threading
+from typing import Dict, List, Optional, Tuple, Union
+
+from src.data_processing.cache import ProcessedDataCache
+from src.data_processing.parallel import (
+    can_start_processes,
+    config_reference,
+    resolve_config,
+)
+from src.report_generator import ReportGenerator
+from src.types.project_config import ProjectConfig
+
+logger = logging.getLogger(__name__)
+
+
+class GenerationBusy(Exception):
+    """Raised when the generation queue is full"""
+
+
+def build_report(
+    config: Union[ProjectConfig, str],
+    files: List[Tuple[str, bytes]],
+    engine: str,
+    cache: Optional[ProcessedDataCache],
+) -> bytes:
+    """Generate a report from uploaded files and return the workbook bytes"""
+    generator = ReportGenerator(
+        resolve_config(config),
+        total_sheet_first=True,
+        close_open_excel=False,
+        files=files,
+        cache=cache,
+        engine=engine,
+    )
+    buffer = io.BytesIO()
+    generator.generate(buffer)
+    return buffer.getvalue()
+
+
+class GenerationExecutor:
+    """Runs report generation on a bounded pool, off the request handlers.
+
+    Jobs run in a thread or process pool with a fixed number of workers.
+    Jobs beyond the workers wait in the queue, up to max_queue of them,
+    after which new jobs are rejected with GenerationBusy. A job that
+    times out or whose request is cancelled is removed from the queue if
+    it has not started yet. A job that is already running cannot be
+    interrupted, so it finishes in the background and its result is
+    discarded.
+    """
+
+    def __init__(
+        self,
+        kind: str = "thread",
+        workers: int = 2,
+        max_queue: int = 8,
+        timeout: Optional[float] = None,
+    ):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        if kind == "process" and not can_start_processes():
+            logger.warning("Cannot start worker processes here - generating in threads")
+            kind = "thread"
+        self.kind = kind
+        self.workers = workers
+        self.max_queue = max_queue
+        # Seconds a request waits for its report, None waits indefinitely
+        self.timeout = timeout
+        self._pool: Optional[Executor] = None
+        self._cache_warned = False
+        self._lock = threading.Lock()
+        self._counters = {
+            "in_flight": 0,
+            "max_queued": 0,
+            "completed": 0,
+            "failed": 0,
+            "timed_out": 0,
+            "cancelled": 0,
+            "rejected": 0,
+        }
+
+    def _get_pool(self) -> Executor:
+        # Created on first use, so importing the app starts no workers
+        if self._pool is None:
+            if self.kind == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="generation"
+                )
+        return self._pool
+
+    def _queued(self) -> int:
+        return max(0, self._counters["in_flight"] - self.workers)
+
+    def metrics(self) -> Dict[str, int]:
+        """Current queue depth and totals since startup"""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queued": self._queued(),
+                **self._counters,
+            }
+
+    def _submit(self, *args) -> Future:
+        with self._lock:
+            if self._counters["in_flight"] >= self.workers + self.max_queue:
+                self._counters["rejected"] += 1
+                raise GenerationBusy(
+                    f"{self._counters['in_flight']} reports are being generated"
+                )
+            self._counters["in_flight"] += 1
+            self._counters["max_queued"] = max(
+                self._counters["max_queued"], self._queued()
+            )
+            pool = self._get_pool()
+
+        try:
+            future = pool.submit(build_report, *args)
+        except Exception:
+            with self._lock:
+                self._counters["in_flight"] -= 1
+            raise
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future: Future) -> None:
+        with self._lock:
+            self._counters["in_flight"] -= 1
+            if future.cancelled():
+                self._counters["cancelled"] += 1
+            elif future.exception() is not None:
+                self._counters["failed"] += 1
+            else:
+                self._counters["completed"] += 1
+
+    def _shareable_cache(
+        self, cache: Optional[ProcessedDataCache]
+    ) -> Optional[ProcessedDataCache]:
+        """The cache as workers get it, process workers only get picklable ones"""
+        if cache is None or self.kind == "thread":
+            return cache
+        try:
+            pickle.dumps(cache)
+            return cache
+        except (pickle.PicklingError, TypeError, AttributeError):
+            if not self._cache_warned:
+                logger.warning(
+                    "Cache cannot be shared with process workers - cache disabled"
+                )
+                self._cache_warned = True
+            return None
+
+    def submit(
+        self,
+        config: ProjectConfig,
+        files: List[Tuple[str, bytes]],
+        engine: str,
+        cache: Optional[ProcessedDataCache] = None,
+    ) -> Future:
+        """Queue a report, the future resolves to its workbook bytes.
+
+        Raises GenerationBusy when the queue is full.
+        """
+        if self.kind == "process":
+            config = config_reference(config)
+        return self._submit(config, files, engine, self._shareable_cache(cache))
+
+    async def generate(
+        self,
+        config: ProjectConfig,
+        files: List[Tuple[str, bytes]],
+        engine: str,
+        cache: Optional[ProcessedDataCache] = None,
+    ) -> bytes:
+        """Generate a report on the pool and wait for its workbook bytes.
+
+        Raises GenerationBusy when the queue is full and asyncio.TimeoutError
+        when the report is not done within the timeout.
+        """
+        future = self.submit(config, files, engine, cache)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._counters["timed_out"] += 1
+            raise
+        finally:
+            # Drops the job from the queue if it has not started yet
+            future.cancel()
+
+    def shutdown(self) -> None:
+        """Stop the workers, after the running jobs are done"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
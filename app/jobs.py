@@ -0,0 +1,183 @@
+from abc import ABC, abstractmethod
+from concurrent.futures import Future
+import json
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+import uuid
+
+from app.generation import GenerationExecutor
+from app.report_cache import ReportCache
+from src.data_processing.cache import ProcessedDataCache
+from src.data_processing.processor import CsvFormatError
+from src.types.project_config import ProjectConfig
+
+
+class JobStore(ABC):
+    """Job records and report results that expire ttl seconds after writing."""
+
+    def __init__(self, ttl: int = 3600):
+        self.ttl = ttl
+
+    @abstractmethod
+    def save(self, job: dict) -> None:
+        pass
+
+    @abstractmethod
+    def load(self, job_id: str) -> Optional[dict]:
+        """Return the job record, None if it is unknown or expired"""
+        pass
+
+    @abstractmethod
+    def save_result(self, job_id: str, content: bytes) -> None:
+        pass
+
+    @abstractmethod
+    def load_result(self, job_id: str) -> Optional[bytes]:
+        """Return the workbook bytes, None if there are none or they expired"""
+        pass
+
+
+class MemoryJobStore(JobStore):
+    """Keeps jobs in this process, for tests and single-process servers."""
+
+    def __init__(self, ttl: int = 3600):
+        super().__init__(ttl)
+        self._entries: Dict[str, Tuple[float, object]] = {}
+        self._lock = threading.Lock()
+
+    def _set(self, key: str, value) -> None:
+        now = time.time()
+        with self._lock:
+            # Expired entries are dropped whenever something is written
+            for expired in [k for k, (exp, _) in self._entries.items() if exp <= now]:
+                del self._entries[expired]
+            self._entries[key] = (now + self.ttl, value)
+
+    def _get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.time():
+            return None
+        return entry[1]
+
+    def save(self, job: dict) -> None:
+        self._set(job["id"], dict(job))
+
+    def load(self, job_id: str) -> Optional[dict]:
+        job = self._get(job_id)
+        return dict(job) if job is not None else None
+
+    def save_result(self, job_id: str, content: bytes) -> None:
+        self._set(f"{job_id}:result", content)
+
+    def load_result(self, job_id: str) -> Optional[bytes]:
+        return self._get(f"{job_id}:result")
+
+
+class RedisJobStore(JobStore):
+    """Keeps jobs in Redis, so every server process can answer for them."""
+
+    def __init__(self, client, ttl: int = 3600, prefix: str = "report-job"):
+        super().__init__(ttl)
+        self.client = client
+        self.prefix = prefix
+
+    def _key(self, job_id: str) -> str:
+        return f"{self.prefix}:{job_id}"
+
+    def save(self, job: dict) -> None:
+        self.client.set(self._key(job["id"]), json.dumps(job), ex=self.ttl)
+
+    def load(self, job_id: str) -> Optional[dict]:
+        value = self.client.get(self._key(job_id))
+        return json.loads(value) if value is not None else None
+
+    def save_result(self, job_id: str, content: bytes) -> None:
+        self.client.set(f"{self._key(job_id)}:result", content, ex=self.ttl)
+
+    def load_result(self, job_id: str) -> Optional[bytes]:
+        return self.client.get(f"{self._key(job_id)}:result")
+
+
+class ReportJobs:
+    """Generates reports in the background and tracks them in a job store.
+
+    Jobs are queued on the generation pool and their record is "pending"
+    until the report is done. The result is stored first and the record
+    is then marked "done", or "failed" with the error and the HTTP status
+    to answer downloads with. Records and results expire after the store's
+    ttl. With a report cache, a job whose report is cached is done when it
+    is submitted, and finished reports are added to the cache.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        executor: GenerationExecutor,
+        report_cache: Optional[ReportCache] = None,
+    ):
+        self.store = store
+        self.executor = executor
+        self.report_cache = report_cache
+
+    def submit(
+        self,
+        config: ProjectConfig,
+        files: List[Tuple[str, bytes]],
+        engine: str,
+        filename: str,
+        cache: Optional[ProcessedDataCache] = None,
+        cache_key: Optional[str] = None,
+    ) -> dict:
+        """Queue a report and return its job record.
+
+        cache_key is the report's digest in the report cache, and is kept as
+        the job's etag. Raises GenerationBusy when the generation queue is full.
+        """
+        job = {
+            "id": uuid.uuid4().hex,
+            "status": "pending",
+            "filename": filename,
+            "created_at": time.time(),
+            "finished_at": None,
+            "error": None,
+            "etag": cache_key,
+        }
+        if self.report_cache is not None and cache_key is not None:
+            content = self.report_cache.get(cache_key)
+            if content is not None:
+                self.store.save_result(job["id"], content)
+                job.update(status="done", finished_at=job["created_at"])
+                self.store.save(job)
+                return job
+
+        future = self.executor.submit(config, files, engine, cache)
+        self.store.save(job)
+        future.add_done_callback(lambda done: self._finish(job, done))
+        return job
+
+    def _finish(self, job: dict, future: Future) -> None:
+        job = dict(job, finished_at=time.time())
+        if future.cancelled():
+            job.update(status="failed", error="Report generation was cancelled")
+        elif future.exception() is not None:
+            # Files that do not follow the CSV format are the client's error
+            invalid = isinstance(future.exception(), CsvFormatError)
+            job.update(
+                status="failed",
+                error=str(future.exception()),
+                status_code=400 if invalid else 500,
+            )
+        else:
+            self.store.save_result(job["id"], future.result())
+            if self.report_cache is not None and job["etag"] is not None:
+                self.report_cache.set(job["etag"], future.result())
+            job["status"] = "done"
+        self.store.save(job)
+
+    def status(self, job_id: str) -> Optional[dict]:
+        return self.store.load(job_id)
+
+    def result(self, job_id: str) -> Optional[bytes]:
+        return self.store.load_result(job_id)
@@ -0,0 +1,75 @@
+import hashlib
+import json
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from src.data_processing.cache import CacheBackend
+from src.types.project_config import ProjectConfig
+
+# Bump when the report layout changes to invalidate finished reports
+REPORT_CACHE_VERSION = 1
+
+
+class ReportCache:
+    """Finished workbooks, keyed by a digest of everything that shapes them.
+
+    Tiers are checked in order, usually a memory LRU in front of a shared
+    Redis store, and a hit in a later tier is copied into the earlier ones.
+    The digest doubles as the report's ETag.
+    """
+
+    def __init__(self, tiers: List[CacheBackend]):
+        self.tiers = tiers
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def key_for(
+        config_key: str,
+        config: ProjectConfig,
+        files: List[Tuple[str, bytes]],
+        filename: str,
+        options: Dict[str, object],
+    ) -> str:
+        """Digest of the config, the files by name and content, and the options"""
+        config_class = type(config)
+        parts = {
+            "version": REPORT_CACHE_VERSION,
+            "config": [
+                config_key,
+                f"{config_class.__module__}.{config_class.__qualname__}",
+                config.version,
+            ],
+            # Titles and sheet order follow the names, so they are part of the key
+            "files": sorted(
+                (name, hashlib.sha256(content).hexdigest()) for name, content in files
+            ),
+            "filename": filename,
+            "options": options,
+        }
+        return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the finished report, None on a miss"""
+        for i, tier in enumerate(self.tiers):
+            content = tier.get(key)
+            if content is not None:
+                for earlier in self.tiers[:i]:
+                    earlier.set(key, content)
+                self._count("hits")
+                return content
+        self._count("misses")
+        return None
+
+    def set(self, key: str, content: bytes) -> None:
+        for tier in self.tiers:
+            tier.set(key, content)
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+
+    def metrics(self) -> Dict[str, int]:
+        """Hits and misses since startup"""
+        with self._lock:
+            return dict(self._counters)
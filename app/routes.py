@@ -1,58 +1,25 @@
 import asyncio
-from importlib import import_module
-import inspect
 import io
-import os
-from pathlib import Path
-import shutil
-import uuid
-from flask import Blueprint, current_app, request, render_template, send_file, jsonify
+from flask import (
+    Blueprint,
+    current_app,
+    request,
+    render_template,
+    send_file,
+    jsonify,
+    url_for,
+)
 from flask_wtf.csrf import generate_csrf
 from werkzeug.utils import secure_filename
 
-from src.project_configs.web_dev import WebDevConfig
-from src.project_configs.itp2 import ITP2Config
-from src.report_generator import ReportGenerator
-from src.types.project_config import ProjectConfig
+from app.generation import GenerationBusy
+from src.data_processing.processor import CsvFormatError
+from src.formatters.excel_formatter import ENGINES
+from src.metrics import render_histograms, render_values, timed
 
 main = Blueprint("main", __name__)
 
-
-def load_configs():
-    """Dynamically load all ProjectConfig classes from project_configs folder"""
-    configs = {}
-    project_configs_path = Path(__file__).parent.parent / "src" / "project_configs"
-
-    # Skip __init__.py and base classes
-    for file_path in project_configs_path.glob("*.py"):
-        if file_path.stem in ["__init__", "project_config"]:
-            continue
-
-        # Import the module dynamically
-        module_name = f"src.project_configs.{file_path.stem}"
-        module = import_module(module_name)
-
-        # Find all classes that inherit from ProjectConfig
-        for name, obj in inspect.getmembers(module):
-            if (
-                inspect.isclass(obj)
-                and issubclass(obj, ProjectConfig)
-                and obj != ProjectConfig
-            ):
-                # Create config instance to get display name and description
-                config = obj()
-                key = file_path.stem.lower()
-                configs[key] = {
-                    "name": config.display_name,
-                    "description": config.description,
-                    "class": obj,
-                }
-
-    return configs
-
-
-# Load configs once at startup
-CONFIGS = load_configs()
+XLSX_MIMETYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
 
 
 def allowed_file(filename):
@@ -65,9 +32,10 @@ def allowed_file(filename):
 
 @main.route("/")
 def index():
+    # Listed from the config sources, without importing any config
     config_options = [
-        {"key": k, "name": v["name"], "description": v["description"]}
-        for k, v in CONFIGS.items()
+        {"key": key, "name": entry.name, "description": entry.description}
+        for key, entry in current_app.config["CONFIG_REGISTRY"].entries().items()
     ]
     return render_template(
         "index.html",
@@ -81,24 +49,14 @@ def health_check():
     """
     Basic health check endpoint that verifies:
     1. API is responsive
-    2. Upload directory exists and is writable
-    3. Can access configuration
+    2. Can access configuration
     """
     try:
         # Log health check attempt
         current_app.logger.info("Health check initiated")
 
-        upload_dir = current_app.config["UPLOAD_FOLDER"]
-        if not upload_dir.exists() or not os.access(upload_dir, os.W_OK):
-            current_app.logger.error(f"Upload directory not accessible: {upload_dir}")
-            return (
-                jsonify(
-                    {"status": "error", "message": "Upload directory not accessible"}
-                ),
-                500,
-            )
-
-        if not CONFIGS:
+        registry = current_app.config["CONFIG_REGISTRY"]
+        if not registry:
             current_app.logger.error("Project configurations not loaded")
             return (
                 jsonify(
@@ -110,16 +68,18 @@ def health_check():
         environment = "development" if current_app.debug else "production"
 
         current_app.logger.info(
-            f"Health check successful - Configs loaded: {len(CONFIGS)}, "
-            f"Upload dir: {upload_dir}, Env: {environment}"
+            f"Health check successful - Configs loaded: {len(registry)}, "
+            f"Env: {environment}"
         )
 
         return jsonify(
             {
                 "status": "healthy",
-                "configs_loaded": len(CONFIGS),
-                "upload_dir": str(upload_dir),
+                "configs_loaded": len(registry),
+                "configs_imported": registry.loaded(),
                 "environment": environment,
+                "generation": current_app.config["GENERATION_EXECUTOR"].metrics(),
+                "report_cache": current_app.config["REPORT_CACHE"].metrics(),
             }
         )
 
@@ -128,8 +88,30 @@ def health_check():
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
-@main.route("/generate", methods=["POST"])
-async def generate_report():
+@main.route("/metrics")
+def metrics():
+    """Pipeline stage histograms and pool and cache totals, for Prometheus"""
+    lines = render_histograms()
+    lines += render_values(
+        "report_generation",
+        current_app.config["GENERATION_EXECUTOR"].metrics(),
+        counters={"completed", "failed", "timed_out", "cancelled", "rejected"},
+    )
+    lines += render_values(
+        "report_cache",
+        current_app.config["REPORT_CACHE"].metrics(),
+        counters={"hits", "misses"},
+    )
+    return current_app.response_class(
+        "\n".join(lines) + "\n", mimetype="text/plain; version=0.0.4"
+    )
+
+
+def parse_report_form():
+    """Validate the report form of /generate and /jobs.
+
+    Returns the report options and None, or None and an error response.
+    """
     # Get filename from form data, default to HoursReport
     output_filename = request.form.get("filename", "HoursReport")
 
@@ -139,104 +121,195 @@ async def generate_report():
 
     # Validate config
     config_name = request.form.get("config")
-    if config_name not in CONFIGS:
-        return jsonify({"error": "Invalid config"}), 400
+    registry = current_app.config["CONFIG_REGISTRY"]
+    if config_name not in registry:
+        return None, (jsonify({"error": "Invalid config"}), 400)
+
+    # Shared instance, so its part index is only built once. It is imported on
+    # first use, where a broken config file fails
+    try:
+        config = registry.get(config_name)
+    except KeyError:
+        return None, (jsonify({"error": "Invalid config"}), 400)
+    except Exception as e:
+        current_app.logger.error(
+            f"Error loading config {config_name}: {str(e)}", exc_info=True
+        )
+        return None, (
+            jsonify({"error": f"Could not load config {config_name}"}),
+            500,
+        )
+
+    # Validate engine, defaults to the app's configured engine
+    engine = request.form.get("engine", current_app.config["EXCEL_ENGINE"])
+    if engine not in ENGINES:
+        return None, (jsonify({"error": "Invalid engine"}), 400)
 
     # Validate files
     if "files" not in request.files:
-        return jsonify({"error": "No files uploaded"}), 400
+        return None, (jsonify({"error": "No files uploaded"}), 400)
 
     files = request.files.getlist("files")
     if not files:
-        return jsonify({"error": "No selected files"}), 400
+        return None, (jsonify({"error": "No selected files"}), 400)
 
     if len(files) > current_app.config["MAX_FILES"]:
-        return (
+        return None, (
             jsonify(
                 {"error": f"Maximum {current_app.config['MAX_FILES']} files allowed"}
             ),
             400,
         )
 
-    # Create unique upload directory
-    upload_dir = (
-        Path(current_app.root_path).parent
-        / current_app.config["UPLOAD_FOLDER"]
-        / str(uuid.uuid4())
+    # Uploads are kept in memory and the report is written to a buffer
+    if not all(
+        file and file.filename and allowed_file(file.filename) for file in files
+    ):
+        return None, (jsonify({"error": "Invalid file type"}), 400)
+
+    with timed("upload") as stage:
+        uploads = [(secure_filename(file.filename), file.read()) for file in files]
+        stage["bytes"] = sum(len(content) for _, content in uploads)
+
+    # Sorted by name, so the sheet order does not depend on the upload order
+    uploads.sort(key=lambda upload: upload[0])
+
+    return {
+        "filename": output_filename,
+        "config_key": config_name,
+        "config": config,
+        "engine": engine,
+        "files": uploads,
+    }, None
+
+
+@main.route("/generate", methods=["POST"])
+async def generate_report():
+    report, error = parse_report_form()
+    if error:
+        return error
+
+    # The digest identifies the finished report, so it is also its ETag
+    report_cache = current_app.config["REPORT_CACHE"]
+    cache_key = report_cache.key_for(
+        report["config_key"],
+        report["config"],
+        report["files"],
+        report["filename"],
+        {"engine": report["engine"]},
     )
-    upload_dir.mkdir(parents=True, exist_ok=True)
+    if cache_key in request.if_none_match:
+        response = current_app.response_class(status=304)
+        response.set_etag(cache_key)
+        return response
 
     try:
-        # Save uploaded files and generate report
-        for file in files:
-            if file and file.filename and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                file.save(upload_dir / filename)
-            else:
-                return jsonify({"error": "Invalid file type"}), 400
-
-        # Generate report
-        config = CONFIGS[config_name]["class"]()
-        generator = ReportGenerator(
-            config,
-            total_sheet_first=True,
-            close_open_excel=False,
-            data_dir=upload_dir,
+        content = report_cache.get(cache_key)
+        if content is None:
+            # Generate report on the shared pool, the request waits without blocking
+            with timed("generate") as stage:
+                content = await current_app.config["GENERATION_EXECUTOR"].generate(
+                    report["config"],
+                    report["files"],
+                    report["engine"],
+                    cache=current_app.config.get("PROCESSED_DATA_CACHE"),
+                )
+                stage["bytes"] = len(content)
+            report_cache.set(cache_key, content)
+
+        return send_file(
+            io.BytesIO(content),
+            mimetype=XLSX_MIMETYPE,
+            as_attachment=True,
+            download_name=report["filename"],
+            etag=cache_key,
         )
 
-        output_path = upload_dir / output_filename
-        generator.generate(str(output_path))
-
-        if output_path.exists():
-            memory_file = io.BytesIO()
-
-            max_retries = 5
-            retry_count = 0
-
-            while retry_count < max_retries:
-                try:
-                    # Try to read and delete file
-                    with open(output_path, "rb") as excel_file:
-                        memory_file.write(excel_file.read())
-                    memory_file.seek(0)
-
-                    # Wait a moment before cleanup
-                    await asyncio.sleep(0.5)
-
-                    # Try cleanup
-                    if upload_dir.exists():
-                        shutil.rmtree(upload_dir)
-                    break
-
-                except PermissionError:
-                    retry_count += 1
-                    if retry_count == max_retries:
-                        raise
-                    await asyncio.sleep(1)  # Wait before retry
-
-            return send_file(
-                memory_file,
-                mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                as_attachment=True,
-                download_name=output_filename,
-            )
-        else:
-            return jsonify({"error": "Failed to generate report"}), 500
+    except GenerationBusy:
+        current_app.logger.warning("Report generation queue is full")
+        return jsonify({"error": "Server busy, try again shortly"}), 503
+
+    except asyncio.TimeoutError:
+        current_app.logger.error("Report generation timed out")
+        return jsonify({"error": "Report generation timed out"}), 504
+
+    except CsvFormatError as e:
+        current_app.logger.warning(f"Invalid CSV upload: {str(e)}")
+        return jsonify({"error": str(e)}), 400
 
     except Exception as e:
         current_app.logger.error(f"Error generating report: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
-    finally:
-        # Schedule cleanup for later if directory still exists
-        if upload_dir.exists():
 
-            async def delayed_cleanup():
-                await asyncio.sleep(2)  # Wait 2 seconds
-                try:
-                    if upload_dir.exists():
-                        shutil.rmtree(upload_dir)
-                except Exception as e:
-                    current_app.logger.error(f"Error in delayed cleanup: {str(e)}")
-
-            asyncio.create_task(delayed_cleanup())
+def job_response(job: dict) -> dict:
+    """Job record with the URLs to poll and download it"""
+    return {
+        **job,
+        "status_url": url_for("main.job_status", job_id=job["id"]),
+        "download_url": url_for("main.download_job", job_id=job["id"]),
+    }
+
+
+@main.route("/jobs", methods=["POST"])
+def submit_job():
+    """Queue a report in the background, takes the same form as /generate"""
+    report, error = parse_report_form()
+    if error:
+        return error
+
+    # Cached reports make a job that is already done, like /generate
+    cache_key = current_app.config["REPORT_CACHE"].key_for(
+        report["config_key"],
+        report["config"],
+        report["files"],
+        report["filename"],
+        {"engine": report["engine"]},
+    )
+    try:
+        job = current_app.config["REPORT_JOBS"].submit(
+            report["config"],
+            report["files"],
+            report["engine"],
+            report["filename"],
+            cache=current_app.config.get("PROCESSED_DATA_CACHE"),
+            cache_key=cache_key,
+        )
+    except GenerationBusy:
+        current_app.logger.warning("Report generation queue is full")
+        return jsonify({"error": "Server busy, try again shortly"}), 503
+
+    current_app.logger.info(f"Report job {job['id']} {job['status']}")
+    return jsonify(job_response(job)), 202
+
+
+@main.route("/jobs/<job_id>")
+def job_status(job_id):
+    job = current_app.config["REPORT_JOBS"].status(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found or expired"}), 404
+    return jsonify(job_response(job))
+
+
+@main.route("/jobs/<job_id>/download")
+def download_job(job_id):
+    jobs = current_app.config["REPORT_JOBS"]
+    job = jobs.status(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found or expired"}), 404
+    if job["status"] == "failed":
+        return jsonify({"error": job["error"]}), job.get("status_code", 500)
+    if job["status"] != "done":
+        return jsonify({"error": "Report is not ready yet"}), 409
+
+    content = jobs.result(job_id)
+    if content is None:
+        return jsonify({"error": "Job not found or expired"}), 404
+
+    return send_file(
+        io.BytesIO(content),
+        mimetype=XLSX_MIMETYPE,
+        as_attachment=True,
+        download_name=job["filename"],
+        etag=job.get("etag") or False,
+    )
@@ -0,0 +1,68 @@
+"""Generate an hours report for every team folder under a root directory.
+
+Usage:
+    python batch.py teams/ --config web_dev --output reports/ --workers 4
+"""
+
+import argparse
+from pathlib import Path
+import sys
+
+from src.batch_generator import BatchGenerator
+from src.config_registry import ConfigRegistry
+from src.config_store import SPEC_SUFFIXES, load_config
+from src.formatters.excel_formatter import ENGINES
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("root", type=Path, help="folder with one subfolder per team")
+    parser.add_argument(
+        "--config",
+        required=True,
+        help="config key, such as web_dev, or a declarative config file",
+    )
+    parser.add_argument("--output", type=Path, default=Path("reports"))
+    parser.add_argument(
+        "--workers", type=int, default=None, help="defaults to every core"
+    )
+    parser.add_argument("--pool", choices=["process", "thread"], default="process")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="openpyxl")
+    parser.add_argument(
+        "--force", action="store_true", help="regenerate unchanged teams too"
+    )
+    args = parser.parse_args()
+
+    if not args.root.is_dir():
+        parser.error(f"{args.root} is not a directory")
+
+    config_path = Path(args.config)
+    if config_path.suffix in SPEC_SUFFIXES and config_path.is_file():
+        config, config_key = load_config(config_path), config_path.stem
+    else:
+        registry = ConfigRegistry()
+        if args.config not in registry:
+            parser.error(
+                f"Unknown config {args.config!r}, "
+                f"choose from {', '.join(sorted(registry.entries()))}"
+            )
+        config, config_key = registry.get(args.config), args.config
+
+    summary = BatchGenerator(
+        config,
+        config_key,
+        args.root,
+        args.output,
+        workers=args.workers,
+        pool=args.pool,
+        engine=args.engine,
+        force=args.force,
+    ).run()
+    print("")
+    print(summary.report())
+    if summary.failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
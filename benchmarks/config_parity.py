@@ -0,0 +1,150 @@
+"""Check that the declarative configs label sessions like the Python configs.
+
+The declarative WebDev and ITP2 configs in benchmarks/configs are compiled
+from JSON and YAML, stored in and loaded from a SQLite config store, and
+compared with WebDevConfig and ITP2Config on parts, groupings and the label
+of every session. Sessions cover every day from a month before the first
+part to a month after the last, each with descriptions that mix the
+keywords in different cases, positions and combinations. Both the batch
+and the per-session labeling are compared, and the batch labeling is timed
+on synthetic data. Exits with status 1 on any difference.
+
+Usage:
+    python -m benchmarks.config_parity --rows 1000000
+"""
+
+import argparse
+import itertools
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import List
+
+import pandas as pd
+
+from benchmarks.synthetic import write_csv
+from src.config_store import SqliteConfigStore, load_config, load_spec
+from src.data_processing.processor import DataProcessor
+from src.project_configs.itp2 import ITP2Config
+from src.project_configs.web_dev import WebDevConfig
+from src.types.project_config import ProjectConfig
+
+CONFIGS_DIR = Path(__file__).parent / "configs"
+# (Python config, declarative file, synthetic data profile)
+PAIRS = [
+    (WebDevConfig, "web_dev.json", "webdev"),
+    (ITP2Config, "itp2.yaml", "itp2"),
+]
+
+DESCRIPTIONS = [
+    "",
+    None,
+    "coding",
+    "Report writing",
+    "Wrote the REPORT",
+    "reporting bugs",
+    "Video editing",
+    "video and report",
+    "Self Accessment",
+    "self accessment video",
+    "Report, video and self accessment",
+    "Peer review of team 3",
+    "PEER REVIEW",
+    "peer reviewing",
+    "Did a peer review",
+    " peer review with a leading space",
+    "Peer review report video",
+]
+
+
+def sessions(config: ProjectConfig) -> pd.DataFrame:
+    """Every day around the config's parts with every description"""
+    parts = config.get_project_parts()
+    first = min(part.start_date for part in parts) - timedelta(days=31)
+    last = max(part.end_date for part in parts) + timedelta(days=31)
+    days = [first + timedelta(days=i) for i in range((last - first).days + 1)]
+    rows = list(itertools.product(days, DESCRIPTIONS))
+    return pd.DataFrame(rows, columns=["date", "description"])
+
+
+def compare(expected: ProjectConfig, actual: ProjectConfig, name: str) -> List[str]:
+    """Describe every difference between two configs"""
+    differences = []
+    if expected.get_project_parts() != actual.get_project_parts():
+        differences.append(f"{name}: project parts differ")
+    if expected.get_groupings() != actual.get_groupings():
+        differences.append(f"{name}: groupings differ")
+
+    df = sessions(expected)
+    expected_labels = expected.label_sessions(df["date"], df["description"])
+    actual_labels = actual.label_sessions(df["date"], df["description"])
+    for i in (expected_labels != actual_labels).to_numpy().nonzero()[0][:10]:
+        differences.append(
+            f"{name}: {df['date'][i]} {df['description'][i]!r} is "
+            f"{actual_labels[i]!r}, expected {expected_labels[i]!r}"
+        )
+
+    for session_date, description in zip(df["date"], df["description"]):
+        if not isinstance(description, str):
+            continue
+        expected_label = expected.label_session(session_date, description)
+        actual_label = actual.label_session(session_date, description)
+        if expected_label != actual_label:
+            differences.append(
+                f"{name}: label_session({session_date}, {description!r}) is "
+                f"{actual_label!r}, expected {expected_label!r}"
+            )
+            break
+    return differences
+
+
+def time_labeling(config: ProjectConfig, df: pd.DataFrame, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        config.label_sessions(df["date"], df["description"])
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    differences = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = SqliteConfigStore(Path(tmp_dir) / "configs.db")
+        for config_class, file_name, profile in PAIRS:
+            expected = config_class()
+            compiled = load_config(CONFIGS_DIR / file_name)
+            store.save(Path(file_name).stem, load_spec(CONFIGS_DIR / file_name))
+            stored = store.load(Path(file_name).stem)
+
+            differences += compare(expected, compiled, file_name)
+            differences += compare(expected, stored, f"{file_name} from the store")
+
+            csv_path = Path(tmp_dir) / f"{profile}.csv"
+            write_csv(csv_path, args.rows, profile=profile)
+            processor = DataProcessor(expected)
+            df = processor._preprocess_data(processor._read_csv(str(csv_path)))
+            python_time = time_labeling(expected, df, args.repeat)
+            compiled_time = time_labeling(compiled, df, args.repeat)
+            print(
+                f"{config_class.__name__:<14} {len(df):,} rows: "
+                f"Python {python_time:.3f}s, declarative {compiled_time:.3f}s"
+            )
+
+    if differences:
+        print("\nDifferences:")
+        for difference in differences:
+            print(f"  {difference}")
+        sys.exit(1)
+    print("\nDeclarative configs match WebDevConfig and ITP2Config")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Render the same report with every Excel engine and compare the results.
+
+Cell values and key styles (fills, fonts, borders, alignment, number
+formats), merges, column widths, row heights and tab colors must match
+the openpyxl engine. Exits with status 1 on any difference.
+
+Usage:
+    python -m benchmarks.engine_compare --rows 20000 --files 4
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from openpyxl import load_workbook
+
+from benchmarks.synthetic import write_csv
+from src.project_configs.itp2 import ITP2Config
+from src.report_generator import ReportGenerator
+
+# (engine, write_only) pairs, the first one is the reference
+VARIANTS = [
+    ("openpyxl", False),
+    ("openpyxl", True),
+    ("xlsxwriter", False),
+    ("parallel", False),
+]
+
+
+def _rgb(color) -> str:
+    """Last six hex digits of an RGB color, alpha and theme colors ignored"""
+    if color is None or color.type != "rgb":
+        return None
+    return color.rgb[-6:]
+
+
+def _cell_description(cell) -> tuple:
+    value = round(cell.value, 9) if isinstance(cell.value, float) else cell.value
+    fill = _rgb(cell.fill.fgColor) if cell.fill.fill_type == "solid" else None
+    return (
+        value,
+        fill,
+        bool(cell.font.b),
+        cell.font.sz or 11,
+        _rgb(cell.font.color),
+        cell.number_format,
+        cell.border.left.style if cell.border.left else None,
+        cell.alignment.horizontal,
+        cell.alignment.vertical,
+        bool(cell.alignment.wrap_text),
+    )
+
+
+def describe(path: Path) -> dict:
+    """Everything the comparison looks at, per sheet"""
+    wb = load_workbook(path)
+    sheets = {"sheetnames": wb.sheetnames}
+    for ws in wb.worksheets:
+        covered = {
+            (row, col)
+            for merged in ws.merged_cells.ranges
+            for row, col in merged.cells
+            if (row, col) != (merged.min_row, merged.min_col)
+        }
+        widths = {}
+        for dimension in ws.column_dimensions.values():
+            if dimension.customWidth:
+                # xlsxwriter stores widths with Excel's padding, compare whole units
+                for col in range(dimension.min, dimension.max + 1):
+                    widths[col] = int(dimension.width)
+        sheets[ws.title] = {
+            "cells": {
+                cell.coordinate: _cell_description(cell)
+                for row in ws.iter_rows()
+                for cell in row
+                if cell.value is not None and (cell.row, cell.column) not in covered
+            },
+            "merged": sorted(str(merged) for merged in ws.merged_cells.ranges),
+            "widths": widths,
+            "heights": {
+                row: dimension.height
+                for row, dimension in ws.row_dimensions.items()
+                if dimension.height
+            },
+            "tab": _rgb(ws.sheet_properties.tabColor),
+            "gridlines": ws.sheet_view.showGridLines,
+        }
+    wb.close()
+    return sheets
+
+
+def differences(reference: dict, other: dict) -> list:
+    found = []
+    if reference["sheetnames"] != other["sheetnames"]:
+        return [("sheetnames", reference["sheetnames"], other["sheetnames"])]
+    for title in reference["sheetnames"]:
+        for key, expected in reference[title].items():
+            actual = other[title][key]
+            if key == "cells":
+                for coordinate in sorted(set(expected) | set(actual)):
+                    if expected.get(coordinate) != actual.get(coordinate):
+                        found.append(
+                            (
+                                f"{title}!{coordinate}",
+                                expected.get(coordinate),
+                                actual.get(coordinate),
+                            )
+                        )
+            elif expected != actual:
+                found.append((f"{title} {key}", expected, actual))
+    return found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--files", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir = Path(tmp_dir) / "data"
+        data_dir.mkdir()
+        for i in range(args.files):
+            write_csv(data_dir / f"student{i}_sessions.csv", args.rows, seed=i)
+
+        descriptions = []
+        for engine, write_only in VARIANTS:
+            output_path = Path(tmp_dir) / f"{engine}-{write_only}.xlsx"
+            generator = ReportGenerator(
+                ITP2Config(),
+                close_open_excel=False,
+                data_dir=data_dir,
+                write_only=write_only,
+                engine=engine,
+            )
+            start = time.perf_counter()
+            generator.generate(str(output_path))
+            elapsed = time.perf_counter() - start
+
+            label = f"{engine}{' write-only' if write_only else ''}"
+            print(f"{label:<22} {elapsed:6.2f}s")
+            descriptions.append((label, describe(output_path)))
+
+    (reference_label, reference), *others = descriptions
+    failed = False
+    for label, description in others:
+        found = differences(reference, description)
+        if found:
+            failed = True
+            print(f"{label} differs from {reference_label} in {len(found)} places:")
+            for where, expected, actual in found[:10]:
+                print(f"  {where}: {expected} != {actual}")
+        else:
+            print(f"{label} matches {reference_label}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
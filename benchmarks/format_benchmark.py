@@ -0,0 +1,95 @@
+"""Compare the old two-pass part sheet writer with the one-pass bulk writer.
+
+Usage:
+    python -m benchmarks.format_benchmark --rows 100000
+"""
+
+import argparse
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+from openpyxl import Workbook
+from pandas import DataFrame
+
+from benchmarks.synthetic import write_csv
+from src.data_processing.processor import DataProcessor
+from src.formatters.openpyxl_engine import OpenpyxlEngine
+from src.formatters.styles import STYLE_REGISTRY
+from src.project_configs.itp2 import ITP2Config
+
+PRIMARY_COLOR = "0072BC"
+SECONDARY_COLOR = "D9EAF7"
+
+
+def part_sheet_data(file_path: Path) -> DataFrame:
+    """Every row of the file, prepared the way a part sheet receives it."""
+    processor = DataProcessor(ITP2Config())
+    df = processor._preprocess_data(processor._read_csv(file_path))
+    return processor._prepare_data_for_output(processor._label_data(df))
+
+
+def old_write(df: DataFrame) -> None:
+    """The data section as it was written before the bulk writer."""
+    wb = Workbook()
+    ws = wb.active
+    styles = STYLE_REGISTRY.register(wb, PRIMARY_COLOR, SECONDARY_COLOR)
+
+    for col, header in enumerate(df.columns, start=1):
+        ws.cell(row=2, column=col, value=header)
+    for idx, (_, row) in enumerate(df.iterrows()):
+        for col, value in enumerate(row, start=1):
+            ws.cell(row=idx + 3, column=col, value=value)
+
+    # Second pass over every cell to style it
+    max_row, max_col = ws.max_row, ws.max_column
+    for row in range(3, max_row + 1):
+        parity = "even" if row % 2 == 0 else "odd"
+        for col in range(1, max_col + 1):
+            cell = ws.cell(row=row, column=col)
+            role = "date" if isinstance(cell.value, date) else "data"
+            styles.apply(cell, f"{role}_{parity}")
+
+
+def new_write(df: DataFrame) -> None:
+    engine = OpenpyxlEngine(data=[], style_vars={})
+    ws = engine.wb.active
+    styles = engine._styles(ws, PRIMARY_COLOR, SECONDARY_COLOR)
+
+    for col, header in enumerate(df.columns, start=1):
+        ws.cell(row=2, column=col, value=header)
+    engine._write_data_rows(ws, df, styles)
+
+
+def best_of(func, df: DataFrame, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(df)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = Path(tmp_dir) / "sessions.csv"
+        write_csv(file_path, args.rows)
+        df = part_sheet_data(file_path)
+
+    old = best_of(old_write, df, args.repeat)
+    new = best_of(new_write, df, args.repeat)
+
+    print(f"Rows:         {len(df):,}")
+    print(f"Old writer:   {old:.2f}s")
+    print(f"Bulk writer:  {new:.2f}s")
+    print(f"Speedup:      {old / new:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+"""The app as run.py sets it up, with stand-ins for Redis.
+
+Served by benchmarks.load_test. Each server worker imports this module and
+gets its own fakeredis for the Redis backed stores, and the rate limiter
+keeps its counts in memory.
+"""
+
+from app import configure_services, create_app
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+app = create_app()
+
+if fakeredis is not None:
+    redis_client = fakeredis.FakeRedis()
+else:
+    print("fakeredis not available - caches and jobs are kept in memory")
+    redis_client = None
+
+limiter = configure_services(app, redis_client, limiter_storage_uri="memory://")
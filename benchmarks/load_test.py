@@ -0,0 +1,401 @@
+"""Load test /generate on a local Hypercorn server.
+
+Starts Hypercorn with the given number of worker processes serving
+benchmarks.load_server, which is the app as run.py sets it up with
+fakeredis in place of Redis and an in-memory rate limiter. Every client
+thread keeps a connection and a session: it loads the index page for its
+session cookie and CSRF token, then posts uploads to /generate the way the
+web page does. Every upload gets a unique last row, so reports are not
+served from the report or processed data caches, unless --same-upload.
+
+Prints throughput, latency percentiles, the error rate by status and the
+peak RSS of every server process. Peak RSS is read from /proc, so it is
+only reported on Linux. GENERATION_* and other app settings are taken from
+the environment.
+
+Usage:
+    python -m benchmarks.load_test --requests 40 --concurrency 4 --rows 5000
+    GENERATION_POOL=process python -m benchmarks.load_test --workers 2
+"""
+
+import argparse
+import http.client
+import http.cookies
+import itertools
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks.synthetic import PROFILES, write_csv
+
+ROOT_DIR = Path(__file__).parent.parent
+CSRF_TOKEN_RE = re.compile(r'name="csrf_token" value="([^"]+)"')
+# Synthetic data profile of each config
+CONFIG_PROFILES = {"itp2": "itp2", "web_dev": "webdev"}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def multipart(
+    fields: Dict[str, str], files: List[Tuple[str, bytes]]
+) -> Tuple[bytes, str]:
+    """Encode a form with files as multipart/form-data"""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'
+            f"{value}\r\n".encode()
+        )
+    for filename, content in files:
+        parts.append(
+            f"--{boundary}\r\nContent-Disposition: form-data; "
+            f'name="files"; filename="{filename}"\r\n'
+            f"Content-Type: text/csv\r\n\r\n".encode() + content + b"\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+class Session:
+    """One client, with its own connection, session cookie and CSRF token"""
+
+    def __init__(self, port: int, timeout: float):
+        self.port = port
+        self.timeout = timeout
+        self.conn: Optional[http.client.HTTPConnection] = None
+        self.cookies = http.cookies.SimpleCookie()
+        self.csrf_token: Optional[str] = None
+
+    def request(
+        self, method: str, path: str, body: bytes = None, headers: dict = None
+    ) -> Tuple[int, bytes]:
+        if self.conn is None:
+            self.conn = http.client.HTTPConnection(
+                "127.0.0.1", self.port, timeout=self.timeout
+            )
+        headers = dict(headers or {})
+        if self.cookies:
+            headers["Cookie"] = "; ".join(
+                f"{key}={morsel.value}" for key, morsel in self.cookies.items()
+            )
+        try:
+            self.conn.request(method, path, body=body, headers=headers)
+            response = self.conn.getresponse()
+            content = response.read()
+        except (OSError, http.client.HTTPException):
+            # Reconnect on the next request
+            self.conn.close()
+            self.conn = None
+            raise
+
+        for cookie in response.headers.get_all("Set-Cookie") or []:
+            self.cookies.load(cookie)
+        return response.status, content
+
+    def start(self) -> None:
+        """Load the index page for the session cookie and the CSRF token"""
+        status, content = self.request("GET", "/")
+        match = CSRF_TOKEN_RE.search(content.decode())
+        if status != 200 or not match:
+            raise RuntimeError(f"Index page returned {status} without a CSRF token")
+        self.csrf_token = match.group(1)
+
+    def generate(self, form: Dict[str, str], files: List[Tuple[str, bytes]]) -> int:
+        if self.csrf_token is None:
+            self.start()
+        body, content_type = multipart(form, files)
+        status, _ = self.request(
+            "POST",
+            "/generate",
+            body=body,
+            headers={"Content-Type": content_type, "X-CSRFToken": self.csrf_token},
+        )
+        return status
+
+
+class Uploads:
+    """The files of every request, unique per request unless `same`"""
+
+    def __init__(self, tmp_dir: Path, config: str, rows: int, files: int, same: bool):
+        profile = CONFIG_PROFILES[config]
+        self.files = []
+        for i in range(files):
+            path = tmp_dir / f"student{i}_sessions.csv"
+            write_csv(path, rows, seed=i, profile=profile)
+            self.files.append((path.name, path.read_bytes()))
+        self.same = same
+        self.start = PROFILES[profile].start
+
+    def for_request(self, request_id: int) -> List[Tuple[str, bytes]]:
+        if self.same:
+            return self.files
+        # A unique session changes the digest of every file
+        row = (
+            f'"{self.start:%Y-%m-%dT%H:%M:%S}.000000000Z",1,'
+            f'"""load test {request_id}"""\n'
+        ).encode()
+        return [(name, content + row) for name, content in self.files]
+
+
+def run_load(
+    port: int,
+    uploads: Uploads,
+    form: Dict[str, str],
+    requests: int,
+    concurrency: int,
+    timeout: float,
+) -> Tuple[List[Tuple[float, object]], float]:
+    """Post the requests from `concurrency` clients at once.
+
+    Returns the latency and the status, or the error name, of every request
+    and the wall time of the run.
+    """
+    request_ids = itertools.count()
+    lock = threading.Lock()
+    results: List[Tuple[float, object]] = []
+
+    def client() -> None:
+        session = Session(port, timeout)
+        while True:
+            with lock:
+                request_id = next(request_ids)
+            if request_id >= requests:
+                return
+            files = uploads.for_request(request_id)
+            start = time.perf_counter()
+            try:
+                outcome = session.generate(form, files)
+            except (OSError, http.client.HTTPException, RuntimeError) as e:
+                outcome = type(e).__name__
+            with lock:
+                results.append((time.perf_counter() - start, outcome))
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, time.perf_counter() - start
+
+
+def start_server(port: int, workers: int, tmp_dir: Path) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        CACHE_FOLDER=str(tmp_dir / "cache"),
+    )
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "hypercorn",
+            "--workers",
+            str(workers),
+            "--bind",
+            f"127.0.0.1:{port}",
+            "benchmarks.load_server:app",
+        ],
+        cwd=ROOT_DIR,
+        env=env,
+        # The pipeline's progress prints, errors still reach stderr
+        stdout=subprocess.DEVNULL,
+    )
+
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with status {server.returncode}")
+        try:
+            status, _ = Session(port, timeout=5).request("GET", "/health")
+            if status == 200:
+                return server
+        except OSError:
+            pass
+        time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("Server did not become healthy within 60s")
+
+
+def _process_tree(root_pid: int) -> List[Tuple[int, int]]:
+    """(pid, depth) of a process and its descendants, read from /proc"""
+    children: Dict[int, List[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name can contain spaces, the fields after it do not
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    tree, pending = [], [(root_pid, 0)]
+    while pending:
+        pid, depth = pending.pop()
+        tree.append((pid, depth))
+        pending += [(child, depth + 1) for child in children.get(pid, [])]
+    return tree
+
+
+def peak_rss(server_pid: int) -> Optional[List[dict]]:
+    """Peak RSS of the server and every process under it, None without /proc"""
+    if not os.path.isdir("/proc"):
+        return None
+
+    roles = {0: "server", 1: "worker"}
+    processes = []
+    for pid, depth in sorted(_process_tree(server_pid)):
+        try:
+            with open(f"/proc/{pid}/cmdline", "rb") as f:
+                cmdline = f.read().replace(b"\0", b" ").decode(errors="replace")
+            with open(f"/proc/{pid}/status") as f:
+                status = dict(
+                    line.split(":", 1) for line in f.read().splitlines() if ":" in line
+                )
+        except OSError:
+            continue
+        if "resource_tracker" in cmdline:
+            continue
+        processes.append(
+            {
+                "pid": pid,
+                "role": roles.get(depth, "generation"),
+                "peak_rss_mb": round(int(status["VmHWM"].split()[0]) / 1024, 1),
+            }
+        )
+    return processes
+
+
+def percentile(values: List[float], share: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    return values[max(0, min(len(values) - 1, round(share * len(values)) - 1))]
+
+
+def summarize(
+    results: List[Tuple[float, object]], elapsed: float, rows_per_request: int
+) -> dict:
+    latencies = sorted(latency for latency, _ in results)
+    statuses = Counter(str(outcome) for _, outcome in results)
+    succeeded = statuses.get("200", 0)
+    return {
+        "requests": len(results),
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(succeeded / elapsed, 2),
+        "rows_per_second": round(succeeded * rows_per_request / elapsed),
+        "error_rate": round(1 - succeeded / len(results), 4) if results else 0,
+        "statuses": dict(statuses),
+        "latency_seconds": {
+            name: round(percentile(latencies, share), 3)
+            for name, share in [
+                ("p50", 0.5),
+                ("p90", 0.9),
+                ("p95", 0.95),
+                ("p99", 0.99),
+            ]
+        }
+        | {"max": round(latencies[-1], 3)},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=5_000, help="Rows per file")
+    parser.add_argument("--files", type=int, default=2, help="Files per request")
+    parser.add_argument("--workers", type=int, default=1, help="Hypercorn workers")
+    parser.add_argument("--config", choices=CONFIG_PROFILES, default="itp2")
+    parser.add_argument("--engine", help="Excel engine, defaults to the app's")
+    parser.add_argument(
+        "--warmup", type=int, default=2, help="Requests sent before measuring"
+    )
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument(
+        "--same-upload",
+        action="store_true",
+        help="Send the same files every time, to measure cached reports",
+    )
+    parser.add_argument("--output", type=Path, help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    form = {"config": args.config, "filename": "LoadTest"}
+    if args.engine:
+        form["engine"] = args.engine
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_dir = Path(tmp_dir)
+        uploads = Uploads(tmp_dir, args.config, args.rows, args.files, args.same_upload)
+        port = free_port()
+        server = start_server(port, args.workers, tmp_dir)
+        try:
+            warmup_session = Session(port, args.timeout)
+            for i in range(args.warmup):
+                warmup_session.generate(form, uploads.for_request(-1 - i))
+
+            print(
+                f"Sending {args.requests} requests from {args.concurrency} clients "
+                f"to {args.workers} worker(s)..."
+            )
+            results, elapsed = run_load(
+                port,
+                uploads,
+                form,
+                args.requests,
+                args.concurrency,
+                args.timeout,
+            )
+            processes = peak_rss(server.pid)
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    summary = summarize(results, elapsed, args.rows * args.files)
+    summary["settings"] = {
+        key: value for key, value in vars(args).items() if key != "output"
+    }
+    summary["processes"] = processes
+
+    latency = summary["latency_seconds"]
+    print(f"Requests:    {summary['requests']} in {summary['seconds']:.1f}s")
+    print(
+        f"Throughput:  {summary['requests_per_second']:.2f} req/s, "
+        f"{summary['rows_per_second']:,} rows/s"
+    )
+    print(
+        f"Latency:     p50 {latency['p50']:.2f}s  p90 {latency['p90']:.2f}s  "
+        f"p95 {latency['p95']:.2f}s  p99 {latency['p99']:.2f}s  "
+        f"max {latency['max']:.2f}s"
+    )
+    print(f"Error rate:  {summary['error_rate']:.1%} {summary['statuses']}")
+    if processes is None:
+        print("Peak RSS:    needs /proc, not available on this platform")
+    else:
+        for process in processes:
+            print(
+                f"Peak RSS:    {process['role']:<10} pid {process['pid']:<7} "
+                f"{process['peak_rss_mb']:8.1f} MB"
+            )
+
+    if args.output:
+        args.output.write_text(json.dumps(summary, indent=2) + "\n", encoding="utf-8")
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Compare the old untyped CSV parse stage with the typed parse path.
+
+Usage:
+    python -m benchmarks.parse_benchmark --rows 1000000
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.synthetic import write_csv
+from src.data_processing.processor import CSV_ENGINE, DataProcessor
+from src.project_configs.itp2 import ITP2Config
+
+
+def old_parse(file_path: Path) -> pd.DataFrame:
+    """The parse stage as it was before the typed path."""
+    df = pd.read_csv(file_path)
+    df = df.sort_values(by="startTime", ascending=True)
+    df["date"] = pd.to_datetime(df["startTime"], errors="coerce").dt.date
+    df["duration_minutes"] = df["duration"]
+    df["description"] = df["description"].str.replace('"', "")
+    return df[["date", "duration_minutes", "description"]]
+
+
+def new_parse(file_path: Path) -> pd.DataFrame:
+    processor = DataProcessor(ITP2Config())
+    return processor._preprocess_data(processor._read_csv(file_path))
+
+
+def best_of(func, file_path: Path, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(file_path)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = Path(tmp_dir) / "sessions.csv"
+        write_csv(file_path, args.rows)
+
+        old = best_of(old_parse, file_path, args.repeat)
+        new = best_of(new_parse, file_path, args.repeat)
+
+    print(f"Rows:        {args.rows:,}")
+    print(f"Engine:      {CSV_ENGINE}")
+    print(f"Old parse:   {old:.2f}s")
+    print(f"Typed parse: {new:.2f}s")
+    print(f"Speedup:     {old / new:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
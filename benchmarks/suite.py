@@ -0,0 +1,273 @@
+"""Time and memory-profile the processor, the formatter and full reports.
+
+Every case writes a synthetic dataset and measures three stages on it:
+
+- process: DataProcessor.get_processed_data over every file, uncached
+- format: ExcelFormatter.format on the processed data
+- generate: ReportGenerator.generate end to end
+
+Cases are every combination of the given row counts, file counts,
+description lengths and profiles. Each stage is timed `repeat` times and
+its best time is kept, then run once more under tracemalloc for its peak
+memory, which covers Python objects and NumPy arrays but not the buffers
+of pyarrow's CSV reader. A sheet holds at most 1,048,576 rows, so run
+larger cases with `--stages process`.
+
+Results are written as JSON and compared with the baseline, and the run
+fails when a stage is slower or takes more memory than the baseline by
+more than the tolerance, ignoring slowdowns below `--min-seconds`. Save
+a baseline on the machine it is compared on.
+
+Usage:
+    python -m benchmarks.suite --rows 1000 100000 --files 1 4
+    python -m benchmarks.suite --rows 10000000 --stages process
+    python -m benchmarks.suite --save-baseline
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import openpyxl
+import pandas as pd
+
+from benchmarks.synthetic import PROFILES, parse_keyword_mix, write_dataset
+from src.data_processing.processor import DataProcessor
+from src.formatters.excel_formatter import ENGINES, ExcelFormatter
+from src.project_configs.itp2 import ITP2Config
+from src.project_configs.web_dev import WebDevConfig
+from src.report_generator import ReportGenerator
+
+STAGES = ["process", "format", "generate"]
+CONFIGS = {"itp2": ITP2Config, "webdev": WebDevConfig}
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+
+
+def case_name(rows: int, files: int, words: int, profile: str) -> str:
+    return f"{profile} rows={rows} files={files} words={words}"
+
+
+def measure(func: Callable[[], None], repeat: int, memory: bool) -> Tuple[float, float]:
+    """Best time of `repeat` runs in seconds, and the peak memory in MB"""
+    timings = []
+    # The pipeline reports its progress with print, which is not measured
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+
+        peak_mb = None
+        if memory:
+            tracemalloc.start()
+            try:
+                func()
+                peak_mb = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+            finally:
+                tracemalloc.stop()
+    return min(timings), peak_mb
+
+
+def run_case(
+    data_dir: Path,
+    profile: str,
+    stages: List[str],
+    engine: str,
+    repeat: int,
+    memory: bool,
+) -> Dict[str, Tuple[float, float]]:
+    """Measure the stages on one dataset"""
+    config = CONFIGS[profile]()
+    output_path = str(data_dir.parent / "report.xlsx")
+    csv_paths = sorted(str(path) for path in data_dir.glob("*.csv"))
+
+    def generator() -> ReportGenerator:
+        return ReportGenerator(
+            config, close_open_excel=False, data_dir=data_dir, engine=engine
+        )
+
+    def process() -> None:
+        processor = DataProcessor(config)
+        for path in csv_paths:
+            processor.get_processed_data(path)
+
+    data = generator()._process_csv_files() if "format" in stages else None
+
+    def format_report() -> None:
+        ExcelFormatter(
+            data, output_path, close_open_excel=False, engine=engine
+        ).format()
+
+    def generate() -> None:
+        generator().generate(output_path)
+
+    funcs = {"process": process, "format": format_report, "generate": generate}
+    return {stage: measure(funcs[stage], repeat, memory) for stage in stages}
+
+
+def run_suite(args: argparse.Namespace) -> List[dict]:
+    results = []
+    cases = itertools.product(
+        args.rows, args.files, args.description_words, args.profiles
+    )
+    for rows, files, words, profile in cases:
+        name = case_name(rows, files, words, profile)
+        print(f"{name}: generating data...")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            data_dir = Path(tmp_dir) / "data"
+            write_dataset(
+                data_dir,
+                rows,
+                files,
+                profile=profile,
+                description_words=words,
+                keyword_mix=args.keyword_mix,
+            )
+            measured = run_case(
+                data_dir, profile, args.stages, args.engine, args.repeat, args.memory
+            )
+
+        for stage, (seconds, peak_mb) in measured.items():
+            total_rows = rows * files
+            results.append(
+                {
+                    "case": name,
+                    "stage": stage,
+                    "rows": rows,
+                    "files": files,
+                    "description_words": words,
+                    "profile": profile,
+                    "seconds": round(seconds, 4),
+                    "rows_per_second": round(total_rows / seconds),
+                    "peak_mb": round(peak_mb, 1) if peak_mb is not None else None,
+                }
+            )
+            memory_text = f" {peak_mb:9.1f} MB" if peak_mb is not None else ""
+            rate = total_rows / seconds
+            print(f"  {stage:<9} {seconds:8.3f}s {rate:12,.0f} rows/s{memory_text}")
+    return results
+
+
+def environment(args: argparse.Namespace) -> dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "pandas": pd.__version__,
+        "openpyxl": openpyxl.__version__,
+        "engine": args.engine,
+        "repeat": args.repeat,
+        "keyword_mix": args.keyword_mix,
+    }
+
+
+def compare(
+    results: List[dict], baseline: dict, tolerance: float, min_seconds: float
+) -> List[str]:
+    """Print every stage against the baseline and return the regressions.
+
+    Stages that are slower by less than `min_seconds` are not regressions,
+    the timings of short stages vary more than that between runs.
+    """
+    previous = {(entry["case"], entry["stage"]): entry for entry in baseline["results"]}
+    regressions = []
+
+    print(f"\n{'Case':<40} {'Stage':<9} {'Time':>8} {'Memory':>8}")
+    for entry in results:
+        base = previous.get((entry["case"], entry["stage"]))
+        if base is None:
+            print(f"{entry['case']:<40} {entry['stage']:<9} {'new':>8}")
+            continue
+
+        ratios = {"time": entry["seconds"] / base["seconds"]}
+        if entry["peak_mb"] and base["peak_mb"]:
+            ratios["memory"] = entry["peak_mb"] / base["peak_mb"]
+        print(
+            f"{entry['case']:<40} {entry['stage']:<9} {ratios['time']:7.2f}x "
+            + (f"{ratios['memory']:7.2f}x" if "memory" in ratios else "")
+        )
+        if entry["seconds"] - base["seconds"] < min_seconds:
+            del ratios["time"]
+        for measure_name, ratio in ratios.items():
+            if ratio > 1 + tolerance:
+                regressions.append(
+                    f"{entry['case']} {entry['stage']}: {measure_name} {ratio:.2f}x"
+                )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--files", type=int, nargs="+", default=[2])
+    parser.add_argument("--description-words", type=int, nargs="+", default=[4])
+    parser.add_argument("--profiles", choices=PROFILES, nargs="+", default=["itp2"])
+    parser.add_argument(
+        "--keyword-mix",
+        type=parse_keyword_mix,
+        help='Keyword shares such as "Report:0.3,Video:0.1", instead of the profile\'s',
+    )
+    parser.add_argument("--stages", choices=STAGES, nargs="+", default=STAGES)
+    parser.add_argument("--engine", choices=ENGINES, default="openpyxl")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--no-memory",
+        dest="memory",
+        action="store_false",
+        help="Skip the tracemalloc run of every stage",
+    )
+    parser.add_argument("--output", type=Path, default=Path("benchmark_results.json"))
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown or memory growth over the baseline, 0.25 is 25%%",
+    )
+    parser.add_argument(
+        "--min-seconds",
+        type=float,
+        default=0.2,
+        help="Smallest slowdown over the baseline that counts as a regression",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Write the results to the baseline instead of comparing with it",
+    )
+    args = parser.parse_args()
+
+    report = {"environment": environment(args), "results": run_suite(args)}
+
+    output_path = args.baseline if args.save_baseline else args.output
+    output_path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    print(f"\nResults written to {output_path}")
+    if args.save_baseline:
+        return
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}, run with --save-baseline to create it")
+        return
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    regressions = compare(report["results"], baseline, args.tolerance, args.min_seconds)
+    if regressions:
+        print(f"\nSlower or larger than the baseline by over {args.tolerance:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print("\nNo regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Synthetic time tracking CSVs for the benchmarks.
+
+Files are written in the documented startTime,duration,description format,
+with the description quoted the way the time tracker exports it. Sessions
+fall in the semester of a config profile, and each description starts with
+one of the profile's keywords or none, followed by filler words.
+
+Usage:
+    python -m benchmarks.synthetic data/ --rows 100000 --files 4 --profile webdev
+"""
+
+import argparse
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+# Words that match none of the config keywords
+FILLER_WORDS = [
+    "api", "backend", "bug", "build", "component", "css", "database", "debug",
+    "deploy", "design", "docs", "endpoint", "feature", "fix", "frontend",
+    "layout", "lint", "merge", "meeting", "model", "planning", "refactor",
+    "routing", "schema", "setup", "sprint", "state", "styling", "tests", "ui",
+]  # fmt: skip
+
+
+@dataclass(frozen=True)
+class DataProfile:
+    """Semester and keyword mix of the sessions of a project config"""
+
+    start: datetime
+    days: int
+    # Share of the descriptions that start with each keyword, the rest have none
+    keywords: Dict[str, float]
+
+
+PROFILES: Dict[str, DataProfile] = {
+    "itp2": DataProfile(
+        datetime(2025, 1, 13),
+        124,
+        {"Report": 0.35, "Video": 0.05, "Self Accessment": 0.05},
+    ),
+    "webdev": DataProfile(datetime(2024, 8, 1), 128, {"Peer review": 0.2}),
+}
+
+
+def parse_keyword_mix(text: str) -> Dict[str, float]:
+    """Parse a mix such as "Report:0.3,Video:0.1" into keyword shares"""
+    mix = {}
+    for item in text.split(","):
+        keyword, _, share = item.rpartition(":")
+        mix[keyword.strip()] = float(share)
+    if sum(mix.values()) > 1:
+        raise ValueError(f"Keyword shares add up to more than 1: {text}")
+    return mix
+
+
+def _description_pool(
+    rng: np.random.Generator,
+    keywords: Dict[str, float],
+    description_words: int,
+    variants: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Distinct descriptions and the probability of drawing each of them"""
+    shares = {**keywords, "": 1 - sum(keywords.values())}
+    descriptions, weights = [], []
+    for keyword, share in shares.items():
+        if share <= 0:
+            continue
+        for _ in range(variants):
+            words = rng.choice(FILLER_WORDS, description_words).tolist()
+            descriptions.append(" ".join([keyword, *words]).strip())
+            weights.append(share / variants)
+    return np.array(descriptions, dtype=object), np.array(weights)
+
+
+def write_csv(
+    path: Path,
+    rows: int,
+    seed: int = 0,
+    profile: str = "itp2",
+    description_words: int = 4,
+    keyword_mix: Optional[Dict[str, float]] = None,
+    variants: int = 500,
+    chunk_rows: int = 1_000_000,
+) -> None:
+    """Write a CSV in the documented startTime,duration,description format.
+
+    Descriptions are drawn from `variants` distinct descriptions per keyword,
+    `keyword_mix` overrides the keyword shares of the profile. Rows are
+    generated in chunks, so large files take little memory.
+    """
+    rng = np.random.default_rng(seed)
+    data_profile = PROFILES[profile]
+    pool, weights = _description_pool(
+        rng,
+        data_profile.keywords if keyword_mix is None else keyword_mix,
+        description_words,
+        variants,
+    )
+    start = np.datetime64(data_profile.start, "s")
+
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("startTime,duration,description\n")
+        for offset in range(0, rows, chunk_rows):
+            count = min(chunk_rows, rows - offset)
+            seconds = rng.integers(0, data_profile.days * 24 * 3600, count)
+            start_times = np.datetime_as_string(
+                start + seconds.astype("timedelta64[s]"), unit="s"
+            )
+            durations = rng.integers(5, 241, count)
+            descriptions = pool[rng.choice(len(pool), count, p=weights)]
+            f.writelines(
+                f'"{start_time}.000000000Z",{duration},"""{description}"""\n'
+                for start_time, duration, description in zip(
+                    start_times.tolist(), durations.tolist(), descriptions.tolist()
+                )
+            )
+
+
+def write_dataset(
+    data_dir: Path, rows: int, files: int, seed: int = 0, **options
+) -> None:
+    """Write `files` CSV files of `rows` rows each, one per student"""
+    data_dir.mkdir(parents=True, exist_ok=True)
+    for i in range(files):
+        write_csv(data_dir / f"student{i}_sessions.csv", rows, seed=seed + i, **options)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("data_dir", type=Path)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--files", type=int, default=1)
+    parser.add_argument("--profile", choices=PROFILES, default="itp2")
+    parser.add_argument("--description-words", type=int, default=4)
+    parser.add_argument(
+        "--keyword-mix",
+        type=parse_keyword_mix,
+        help='Keyword shares such as "Report:0.3,Video:0.1", the rest have none',
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    write_dataset(
+        args.data_dir,
+        args.rows,
+        args.files,
+        seed=args.seed,
+        profile=args.profile,
+        description_words=args.description_words,
+        keyword_mix=args.keyword_mix,
+    )
+    print(f"Wrote {args.files} file(s) of {args.rows:,} rows to {args.data_dir}")
+
+
+if __name__ == "__main__":
+    main()
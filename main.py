@@ -8,12 +8,16 @@ def main() -> None:
     config = WebDevConfig()
     total_sheet_first = True
     close_open_excel = True
+    workers = None  # Set to e.g. os.cpu_count() to process CSV files in parallel
+    incremental = False  # Set to True to only rebuild what changed since the last run
     output_name = "HoursReport.xlsx"
 
     generator = ReportGenerator(
         config,
         total_sheet_first=total_sheet_first,
         close_open_excel=close_open_excel,
+        workers=workers,
+        incremental=incremental,
     )
 
     output_path = Path("reports") / output_name
@@ -2,11 +2,8 @@ import logging
 from logging.handlers import RotatingFileHandler
 import os
 import sys
-from app import create_app
-from flask_wtf.csrf import CSRFProtect
+from app import configure_services, create_app
 from pathlib import Path
-from flask_limiter.util import get_remote_address
-from flask_limiter import Limiter
 import redis
 
 app = create_app()
@@ -47,16 +44,17 @@ def configure_logging():
         if isinstance(handler, logging.StreamHandler):
             app.logger.removeHandler(handler)
 
+    # Pipeline stage timings, as key=value fields
+    pipeline_logger = logging.getLogger("report.pipeline")
+    pipeline_logger.setLevel(logging.INFO)
+    pipeline_logger.addHandler(file_handler)
+
     app.logger.info("Logging system initialized")
 
 
 # Initialize logging if not in debug mode
 if not app.debug:
     configure_logging()
-    Path("temp/uploads").mkdir(parents=True, exist_ok=True)
-
-csrf = CSRFProtect(app)
-app.config["MAX_CONTENT_LENGTH"] = 16 * 1024 * 1024
 
 redis_url = os.environ.get("REDIS_URL")
 
@@ -65,10 +63,10 @@ if redis_url:
 else:
     redis_client = redis.Redis(host="localhost", port=6379, db=0)
 
-limiter = Limiter(
-    app=app,
-    key_func=get_remote_address,
-    storage_uri=redis_url if redis_url else "redis://localhost:6379/0",
+limiter = configure_services(
+    app,
+    redis_client,
+    limiter_storage_uri=redis_url if redis_url else "redis://localhost:6379/0",
 )
 
 if __name__ == "__main__":
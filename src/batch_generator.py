@@ -0,0 +1,302 @@
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
+from dataclasses import dataclass, field
+import hashlib
+import io
+import json
+import os
+from pathlib import Path
+import time
+from typing import Dict, List, Optional, Union
+
+from src.data_processing.parallel import (
+    can_start_processes,
+    config_reference,
+    resolve_config,
+)
+from src.incremental import file_record
+from src.report_generator import ReportGenerator
+from src.types.project_config import ProjectConfig
+
+# Bump when the report layout changes to regenerate every team's report
+BATCH_FORMAT_VERSION = 1
+MANIFEST_NAME = ".batch_manifest.json"
+
+# The config of a process pool worker, set once when the worker starts
+_worker_config: Optional[ProjectConfig] = None
+
+
+@dataclass
+class TeamJob:
+    name: str
+    data_dir: Path
+    output_path: Path
+    csv_files: List[Path]
+    input_bytes: int
+    digest: str = ""
+    # Size, modification time and content hash of every CSV file, by name
+    files: Dict[str, dict] = field(default_factory=dict)
+
+
+@dataclass
+class TeamResult:
+    name: str
+    seconds: float = 0.0
+    input_bytes: int = 0
+    report_bytes: int = 0
+    error: Optional[str] = None
+
+
+@dataclass
+class BatchSummary:
+    generated: List[TeamResult] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+    failed: List[TeamResult] = field(default_factory=list)
+    seconds: float = 0.0
+
+    def report(self) -> str:
+        """Throughput summary of the run"""
+        input_mb = sum(result.input_bytes for result in self.generated) / 1024**2
+        lines = [
+            f"Teams:      {len(self.generated)} generated, "
+            f"{len(self.skipped)} unchanged, {len(self.failed)} failed",
+            f"Wall time:  {self.seconds:.2f}s",
+        ]
+        if self.generated and self.seconds > 0:
+            slowest = max(self.generated, key=lambda result: result.seconds)
+            average = sum(result.seconds for result in self.generated) / len(
+                self.generated
+            )
+            lines += [
+                f"Throughput: {len(self.generated) / self.seconds:.2f} teams/s, "
+                f"{input_mb / self.seconds:.2f} MB/s of CSV input",
+                f"Per team:   {average:.2f}s average, "
+                f"slowest {slowest.name} at {slowest.seconds:.2f}s",
+            ]
+        for result in self.failed:
+            lines.append(f"Failed:     {result.name}: {result.error}")
+        return "\n".join(lines)
+
+
+def _init_worker(reference: Union[ProjectConfig, str]) -> None:
+    global _worker_config
+    _worker_config = resolve_config(reference)
+
+
+def _generate_team(
+    job: TeamJob,
+    engine: str,
+    config: Optional[ProjectConfig] = None,
+    team_workers: Optional[int] = 1,
+) -> TeamResult:
+    """Render one team's report and write it in place of the old one.
+
+    team_workers is passed on as the report's file processing and render
+    workers, 1 keeps the team's work in the batch worker and None leaves
+    the report's defaults.
+    """
+    start = time.perf_counter()
+    generator = ReportGenerator(
+        config if config is not None else _worker_config,
+        total_sheet_first=True,
+        close_open_excel=False,
+        data_dir=job.data_dir,
+        engine=engine,
+        workers=team_workers,
+        render_workers=team_workers,
+    )
+    buffer = io.BytesIO()
+    generator.generate(buffer)
+
+    # Written aside and renamed, so an interrupted run leaves no partial report
+    partial_path = job.output_path.with_name(job.output_path.name + ".partial")
+    partial_path.write_bytes(buffer.getvalue())
+    os.replace(partial_path, job.output_path)
+    return TeamResult(
+        job.name,
+        seconds=time.perf_counter() - start,
+        input_bytes=job.input_bytes,
+        report_bytes=len(buffer.getvalue()),
+    )
+
+
+class BatchGenerator:
+    """Generates one report per team folder on a pool of workers.
+
+    Every subfolder of the root with CSV files is a team, and its report
+    is written to the output directory as `<team>.xlsx`. The config is
+    compiled once and shared: threads use the instance directly and each
+    worker process receives it once when it starts. Teams are the only
+    level of parallelism: with several batch workers each report is
+    processed and rendered in its worker, and only a batch with a single
+    worker leaves the report its own defaults, such as the processes of
+    the parallel engine. A manifest in the output directory records a
+    digest of each team's files, the config and the options, so teams
+    whose digest is unchanged and whose report still exists are skipped.
+    It also records the size and modification time of every file, so
+    only files where they changed are hashed again.
+    """
+
+    def __init__(
+        self,
+        config: ProjectConfig,
+        config_key: str,
+        root: Path,
+        output_dir: Path,
+        workers: Optional[int] = None,
+        pool: str = "process",
+        engine: str = "openpyxl",
+        force: bool = False,
+    ):
+        if pool not in ("thread", "process"):
+            raise ValueError(f"Unknown pool kind: {pool}")
+        self.config = config
+        self.config_key = config_key
+        self.root = Path(root)
+        self.output_dir = Path(output_dir)
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = pool
+        self.engine = engine
+        self.force = force
+        self.manifest_path = self.output_dir / MANIFEST_NAME
+
+    def find_teams(self) -> List[TeamJob]:
+        """Every team folder with CSV files, in name order"""
+        jobs = []
+        for team_dir in sorted(self.root.iterdir()):
+            if not team_dir.is_dir():
+                continue
+            csv_files = sorted(
+                path
+                for path in team_dir.iterdir()
+                if path.suffix == ".csv" and path.is_file()
+            )
+            if not csv_files:
+                continue
+            jobs.append(
+                TeamJob(
+                    name=team_dir.name,
+                    data_dir=team_dir,
+                    output_path=self.output_dir / f"{team_dir.name}.xlsx",
+                    csv_files=csv_files,
+                    input_bytes=sum(path.stat().st_size for path in csv_files),
+                )
+            )
+        return jobs
+
+    def _digest(self, job: TeamJob) -> str:
+        """Digest of everything that shapes a team's report"""
+        config_class = type(self.config)
+        parts = {
+            "version": BATCH_FORMAT_VERSION,
+            "config": [
+                self.config_key,
+                f"{config_class.__module__}.{config_class.__qualname__}",
+                self.config.version,
+            ],
+            "files": [
+                (path.name, job.files[path.name]["sha256"]) for path in job.csv_files
+            ],
+            "engine": self.engine,
+        }
+        return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+    def _load_manifest(self) -> Dict[str, dict]:
+        try:
+            manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        # Entries of older manifests held only the digest, those teams are redone
+        return {
+            name: entry for name, entry in manifest.items() if isinstance(entry, dict)
+        }
+
+    def _save_manifest(self, manifest: Dict[str, dict]) -> None:
+        partial_path = self.manifest_path.with_name(MANIFEST_NAME + ".partial")
+        partial_path.write_text(
+            json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8"
+        )
+        os.replace(partial_path, self.manifest_path)
+
+    def _executor(self, workers: int) -> Executor:
+        if self.pool == "process" and workers > 1 and can_start_processes():
+            return ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(config_reference(self.config),),
+            )
+        return ThreadPoolExecutor(max_workers=workers)
+
+    def run(self) -> BatchSummary:
+        """Generate the reports of every changed team"""
+        start = time.perf_counter()
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        manifest = {} if self.force else self._load_manifest()
+        summary = BatchSummary()
+
+        jobs = self.find_teams()
+        # Teams that are gone are forgotten
+        names = {job.name for job in jobs}
+        manifest = {name: entry for name, entry in manifest.items() if name in names}
+
+        pending = []
+        for job in jobs:
+            recorded = manifest.get(job.name, {}).get("files", {})
+            job.files = {
+                path.name: file_record(path, recorded.get(path.name))
+                for path in job.csv_files
+            }
+            job.digest = self._digest(job)
+            if (
+                manifest.get(job.name, {}).get("digest") == job.digest
+                and job.output_path.exists()
+            ):
+                summary.skipped.append(job.name)
+                # Keeps modification times that changed without the content
+                manifest[job.name] = {"digest": job.digest, "files": job.files}
+            else:
+                pending.append(job)
+
+        if not pending:
+            self._save_manifest(manifest)
+        else:
+            workers = min(self.workers, len(pending))
+            # One level of parallelism, a lone worker leaves it to the report
+            team_workers = None if workers == 1 else 1
+            # Threads share the config, worker processes got it at startup
+            with self._executor(workers) as executor:
+                shared = (
+                    self.config if isinstance(executor, ThreadPoolExecutor) else None
+                )
+                futures = {
+                    executor.submit(
+                        _generate_team, job, self.engine, shared, team_workers
+                    ): job
+                    for job in pending
+                }
+                try:
+                    for done, future in enumerate(as_completed(futures), 1):
+                        job = futures[future]
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            summary.failed.append(TeamResult(job.name, error=str(e)))
+                            manifest.pop(job.name, None)
+                            print(f"[{done}/{len(pending)}] {job.name} failed: {e}")
+                            continue
+                        summary.generated.append(result)
+                        manifest[job.name] = {"digest": job.digest, "files": job.files}
+                        print(
+                            f"[{done}/{len(pending)}] {job.name} "
+                            f"{result.seconds:.2f}s"
+                        )
+                finally:
+                    # Finished teams are skipped next time, even after an interrupt
+                    self._save_manifest(manifest)
+
+        summary.seconds = time.perf_counter() - start
+        return summary
@@ -0,0 +1,396 @@
+import ast
+from dataclasses import dataclass, replace
+import importlib
+import os
+from pathlib import Path
+import sys
+import threading
+import time
+from types import ModuleType
+from typing import Dict, List, Optional, Set, Tuple
+
+from src.config_store import SPEC_SUFFIXES, SqliteConfigStore, load_config, load_spec
+from src.types.project_config import ProjectConfig
+
+CONFIGS_DIR = Path(__file__).parent / "project_configs"
+CONFIGS_PACKAGE = "src.project_configs"
+PROJECT_CONFIG = f"{ProjectConfig.__module__}.{ProjectConfig.__qualname__}"
+
+
+@dataclass(frozen=True)
+class ConfigEntry:
+    key: str
+    name: str
+    description: str
+    # "module" for ProjectConfig classes, "file" for declarative config files
+    # and "store" for configs in the config store
+    source: str
+    mtime_ns: int
+    path: Optional[Path] = None
+    module: Optional[str] = None
+    class_name: Optional[str] = None
+    # Qualified names of the bases of module classes, as far as they resolve
+    bases: Tuple[str, ...] = ()
+
+
+def _literal_property(node: ast.ClassDef, name: str) -> Optional[str]:
+    """The string a property returns, if it only returns a literal"""
+    for item in node.body:
+        if isinstance(item, ast.FunctionDef) and item.name == name:
+            returns = [stmt for stmt in item.body if isinstance(stmt, ast.Return)]
+            if len(returns) == 1 and isinstance(returns[0].value, ast.Constant):
+                value = returns[0].value.value
+                return value if isinstance(value, str) else None
+    return None
+
+
+def _dotted_name(node: ast.expr) -> Optional[str]:
+    """The name a base class is written as, such as `itp2.ITP2Config`"""
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        value = _dotted_name(node.value)
+        return f"{value}.{node.attr}" if value else None
+    return None
+
+
+def _module_names(tree: ast.Module, module: str, package: str) -> Dict[str, str]:
+    """Qualified name of every name a module imports or defines at the top level"""
+    names = {}
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom):
+            source = node.module or ""
+            if node.level:
+                parent = package.rsplit(".", node.level - 1)[0]
+                source = f"{parent}.{source}" if source else parent
+            for alias in node.names:
+                names[alias.asname or alias.name] = f"{source}.{alias.name}"
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.asname:
+                    names[alias.asname] = alias.name
+                else:
+                    head = alias.name.split(".")[0]
+                    names[head] = head
+        elif isinstance(node, ast.ClassDef):
+            names[node.name] = f"{module}.{node.name}"
+    return names
+
+
+def _qualified_bases(node: ast.ClassDef, names: Dict[str, str]) -> Tuple[str, ...]:
+    bases = []
+    for base in node.bases:
+        name = _dotted_name(base)
+        if name is None:
+            # Such as a subscripted generic, left for the import to resolve
+            bases.append("")
+            continue
+        head, _, rest = name.partition(".")
+        qualified = names.get(head, head)
+        bases.append(f"{qualified}.{rest}" if rest else qualified)
+    return tuple(bases)
+
+
+class ConfigRegistry:
+    """Project configs by key, discovered without importing them.
+
+    Every module in the configs folder is parsed for ProjectConfig classes
+    and their display name and description, so listing configs imports
+    nothing. A class is a config when its bases lead to ProjectConfig
+    through classes of the folder's modules, and only modules with bases
+    that cannot be followed this way are imported to check them with
+    issubclass. Declarative JSON and YAML files in the folder and configs in
+    the optional store are listed too, files taking precedence over the
+    store. A config is imported or compiled on first use, and that instance
+    is shared by every later request. Changes are noticed at most every
+    `check_interval` seconds: changed files are parsed again and their
+    config is reloaded on next use, without a server restart. A module is
+    reloaded when its file changed since it was imported, however it was
+    imported, and so are the modules with classes deriving from it, bases
+    first.
+    """
+
+    def __init__(
+        self,
+        configs_dir: Path = CONFIGS_DIR,
+        package: str = CONFIGS_PACKAGE,
+        check_interval: float = 2.0,
+        store: Optional[SqliteConfigStore] = None,
+    ):
+        self.configs_dir = Path(configs_dir)
+        self.package = package
+        self.check_interval = check_interval
+        self.store = store
+        self._lock = threading.RLock()
+        self._entries: Dict[str, ConfigEntry] = {}
+        # Parsed metadata per file, reused until the file changes
+        self._parsed: Dict[Path, Tuple[int, List[ConfigEntry]]] = {}
+        # Shared instances with the file version they were created from
+        self._instances: Dict[str, Tuple[int, ProjectConfig]] = {}
+        # Classes checked by importing their module, per file version
+        self._imported_checks: Dict[Tuple[str, int], bool] = {}
+        # File version of every module in the folder, and the folder modules
+        # its classes derive from
+        self._module_files: Dict[str, int] = {}
+        self._module_bases: Dict[str, Set[str]] = {}
+        # Imported modules with the file version and import sequence number
+        # they were loaded at
+        self._imported: Dict[str, Tuple[int, int]] = {}
+        self._import_count = 0
+        self._checked_at: Optional[float] = None
+
+    def _parse(self, path: Path, mtime_ns: int) -> List[ConfigEntry]:
+        """Metadata of the configs defined in a file, none if it cannot be read"""
+        try:
+            if path.suffix == ".py":
+                return self._parse_module(path, mtime_ns)
+            spec = load_spec(path)
+            return [
+                ConfigEntry(
+                    key=path.stem.lower(),
+                    name=spec["display_name"],
+                    description=spec.get("description", ""),
+                    source="file",
+                    mtime_ns=mtime_ns,
+                    path=path,
+                )
+            ]
+        except Exception as e:
+            # Skipped until the file changes again, the other configs still load
+            print(f"Skipping config file {path.name}: {e}")
+            return []
+
+    def _parse_module(self, path: Path, mtime_ns: int) -> List[ConfigEntry]:
+        """Metadata of every class defined in a module, configs or not"""
+        tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+        module = f"{self.package}.{path.stem}"
+        names = _module_names(tree, module, self.package)
+        entries = []
+        for node in tree.body:
+            if not isinstance(node, ast.ClassDef):
+                continue
+            entries.append(
+                ConfigEntry(
+                    key=path.stem.lower(),
+                    name=_literal_property(node, "display_name"),
+                    description=_literal_property(node, "description"),
+                    source="module",
+                    mtime_ns=mtime_ns,
+                    path=path,
+                    module=module,
+                    class_name=node.name,
+                    bases=_qualified_bases(node, names),
+                )
+            )
+        return entries
+
+    def _is_config(
+        self, entry: ConfigEntry, classes: Dict[str, ConfigEntry], seen: Set[str]
+    ) -> bool:
+        """Whether a module class derives from ProjectConfig"""
+        unresolved = False
+        for base in entry.bases:
+            if base == PROJECT_CONFIG:
+                return True
+            base_entry = classes.get(base)
+            if base_entry is not None:
+                if base not in seen and self._is_config(
+                    base_entry, classes, seen | {base}
+                ):
+                    return True
+            elif base not in ("object", "abc.ABC"):
+                unresolved = True
+        return unresolved and self._import_is_config(entry)
+
+    def _import_is_config(self, entry: ConfigEntry) -> bool:
+        """Import the class's module to check it, once per file version"""
+        check = (f"{entry.module}.{entry.class_name}", entry.mtime_ns)
+        if check not in self._imported_checks:
+            try:
+                module = self._import(entry.module)
+                cls = getattr(module, entry.class_name)
+                self._imported_checks[check] = (
+                    isinstance(cls, type)
+                    and issubclass(cls, ProjectConfig)
+                    and cls is not ProjectConfig
+                )
+            except Exception as e:
+                print(f"Skipping config class {entry.class_name}: {e}")
+                self._imported_checks[check] = False
+        return self._imported_checks[check]
+
+    def _import(self, name: str) -> ModuleType:
+        """Import a module of the folder, reloading it first if it is stale"""
+        self._reload_stale(name, set())
+        module = sys.modules.get(name)
+        if module is None:
+            module = importlib.import_module(name)
+            self._import_count += 1
+            self._record_imports(self._import_count)
+        return module
+
+    def _record_imports(self, sequence: int) -> None:
+        """Remember the file version of folder modules imported along the way"""
+        for name, mtime_ns in self._module_files.items():
+            if name in sys.modules and name not in self._imported:
+                self._imported[name] = (mtime_ns, sequence)
+
+    def _reload_stale(self, name: str, visiting: Set[str]) -> int:
+        """Reload an imported module if it or a module it derives from changed.
+
+        Bases are reloaded first, so a reloaded module derives from the
+        reloaded classes. Returns the sequence number the module was last
+        imported at, 0 if it is not imported.
+        """
+        newest = 0
+        for base in sorted(self._module_bases.get(name, set()) - visiting):
+            newest = max(newest, self._reload_stale(base, visiting | {name}))
+
+        module = sys.modules.get(name)
+        if module is None or name not in self._module_files:
+            self._imported.pop(name, None)
+            return 0
+        if name not in self._imported:
+            # Imported outside the registry, taken to match the current file
+            self._imported[name] = (self._module_files[name], 0)
+        mtime_ns, sequence = self._imported[name]
+        if mtime_ns == self._module_files[name] and sequence >= newest:
+            return sequence
+
+        importlib.reload(module)
+        self._import_count += 1
+        self._imported[name] = (self._module_files[name], self._import_count)
+        self._record_imports(self._import_count)
+        for key in list(self._instances):
+            entry = self._entries.get(key)
+            if entry is not None and entry.module == name:
+                del self._instances[key]
+        return self._import_count
+
+    def _scan(self) -> None:
+        """Parse new and changed config files, drop removed ones"""
+        entries, parsed, module_files = {}, {}, {}
+        for dir_entry in sorted(os.scandir(self.configs_dir), key=lambda e: e.name):
+            path = Path(dir_entry.path)
+            if path.suffix not in (".py", *SPEC_SUFFIXES) or path.stem == "__init__":
+                continue
+            mtime_ns = dir_entry.stat().st_mtime_ns
+            cached = self._parsed.get(path)
+            file_entries = (
+                cached[1]
+                if cached and cached[0] == mtime_ns
+                else self._parse(path, mtime_ns)
+            )
+            parsed[path] = (mtime_ns, file_entries)
+            if path.suffix == ".py":
+                module_files[f"{self.package}.{path.stem}"] = mtime_ns
+
+        # Bases are followed across modules, so classes are checked once all
+        # files are parsed
+        classes = {
+            f"{entry.module}.{entry.class_name}": entry
+            for _, file_entries in parsed.values()
+            for entry in file_entries
+            if entry.source == "module"
+        }
+        module_bases: Dict[str, Set[str]] = {}
+        for entry in classes.values():
+            module_bases.setdefault(entry.module, set()).update(
+                classes[base].module
+                for base in entry.bases
+                if base in classes and classes[base].module != entry.module
+            )
+        self._module_files = module_files
+        self._module_bases = module_bases
+
+        for _, file_entries in parsed.values():
+            # Keys are file names, so a later class in the same file takes the key
+            for entry in file_entries:
+                if entry.source != "module" or self._is_config(entry, classes, set()):
+                    entries[entry.key] = entry
+
+        if self.store is not None:
+            for key, name, description, updated_ns in self.store.list():
+                entries.setdefault(
+                    key, ConfigEntry(key, name, description, "store", updated_ns)
+                )
+
+        self._parsed = parsed
+        self._entries = entries
+        current = {(name, entry.mtime_ns) for name, entry in classes.items()}
+        self._imported_checks = {
+            check: result
+            for check, result in self._imported_checks.items()
+            if check in current
+        }
+        for key in list(self._instances):
+            if key not in entries:
+                del self._instances[key]
+
+    def _refresh(self) -> None:
+        now = time.monotonic()
+        if self._checked_at is None or now - self._checked_at >= self.check_interval:
+            self._scan()
+            self._checked_at = now
+
+    def entries(self) -> Dict[str, ConfigEntry]:
+        """Metadata of every config by key, without importing any of them"""
+        with self._lock:
+            self._refresh()
+            entries = dict(self._entries)
+
+        # Names and descriptions that are not plain literals need the config
+        for key, entry in entries.items():
+            if entry.name is None or entry.description is None:
+                config = self.get(key)
+                entries[key] = replace(
+                    entry, name=config.display_name, description=config.description
+                )
+        return entries
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            self._refresh()
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._entries)
+
+    def get(self, key: str) -> ProjectConfig:
+        """The shared instance of a config, imported on first use.
+
+        Raises KeyError for unknown keys.
+        """
+        with self._lock:
+            self._refresh()
+            entry = self._entries[key]
+            if entry.source == "module":
+                self._reload_stale(entry.module, set())
+            loaded = self._instances.get(key)
+            if loaded is not None and loaded[0] == entry.mtime_ns:
+                return loaded[1]
+
+            if entry.source == "file":
+                config = load_config(entry.path)
+            elif entry.source == "store":
+                config = self.store.load(key)
+                if config is None:
+                    raise KeyError(key)
+            else:
+                config = getattr(self._import(entry.module), entry.class_name)()
+
+            self._instances[key] = (entry.mtime_ns, config)
+            return config
+
+    def reload(self) -> None:
+        """Check the config files now, instead of after the check interval"""
+        with self._lock:
+            self._checked_at = None
+            self._refresh()
+
+    def loaded(self) -> List[str]:
+        """Keys of the configs imported so far"""
+        with self._lock:
+            return sorted(self._instances)
@@ -0,0 +1,109 @@
+from contextlib import contextmanager
+import json
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from typing import Iterator, List, Optional, Tuple, Union
+
+from src.types.declarative_config import DeclarativeConfig
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+# File types a declarative config can be written in
+SPEC_SUFFIXES = (".json", ".yaml", ".yml")
+
+CREATE_CONFIGS_TABLE = """
+CREATE TABLE IF NOT EXISTS configs (
+    key TEXT PRIMARY KEY,
+    display_name TEXT NOT NULL,
+    description TEXT NOT NULL,
+    spec TEXT NOT NULL,
+    updated_ns INTEGER NOT NULL
+)
+"""
+
+
+def load_spec(path: Union[str, Path]) -> dict:
+    """Read a declarative config spec from a JSON or YAML file"""
+    path = Path(path)
+    text = path.read_text(encoding="utf-8")
+    if path.suffix == ".json":
+        return json.loads(text)
+    if path.suffix in (".yaml", ".yml"):
+        if yaml is None:
+            raise ValueError(f"PyYAML is needed to read {path.name}")
+        return yaml.safe_load(text)
+    raise ValueError(f"Unknown config file type: {path.suffix}")
+
+
+def load_config(path: Union[str, Path]) -> DeclarativeConfig:
+    """Compile a declarative config file"""
+    return DeclarativeConfig(load_spec(path))
+
+
+class SqliteConfigStore:
+    """Declarative config specs in a local SQLite database.
+
+    Names and descriptions are stored beside the spec, so configs can be
+    listed without reading or compiling any of them.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute(CREATE_CONFIGS_TABLE)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """A connection that commits on success and is always closed"""
+        conn = sqlite3.connect(self.path)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def save(self, key: str, spec: dict) -> None:
+        """Store a spec under a key, after checking that it compiles"""
+        config = DeclarativeConfig(spec)
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO configs VALUES (?, ?, ?, ?, ?)",
+                (
+                    key,
+                    config.display_name,
+                    config.description,
+                    json.dumps(spec, default=str),
+                    time.time_ns(),
+                ),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM configs WHERE key = ?", (key,))
+
+    def load_spec(self, key: str) -> Optional[dict]:
+        """Return the spec stored under a key, None if there is none"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT spec FROM configs WHERE key = ?", (key,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def load(self, key: str) -> Optional[DeclarativeConfig]:
+        """Compile the config stored under a key, None if there is none"""
+        spec = self.load_spec(key)
+        return DeclarativeConfig(spec) if spec is not None else None
+
+    def list(self) -> List[Tuple[str, str, str, int]]:
+        """Key, display name, description and update time of every config"""
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT key, display_name, description, updated_ns FROM configs"
+                " ORDER BY key"
+            ).fetchall()
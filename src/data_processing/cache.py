@@ -0,0 +1,325 @@
+import hashlib
+import io
+import json
+import os
+import struct
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+import threading
+from typing import IO, Dict, Iterable, Optional, Tuple, Union
+
+import pandas as pd
+from pandas import DataFrame
+
+from src.types.dataclasses import GroupSummary
+from src.types.project_config import ProjectConfig
+
+# Bump when the processed output format changes to invalidate old entries
+CACHE_FORMAT_VERSION = 4
+
+ProcessedData = Tuple[Dict[str, DataFrame], Dict[str, GroupSummary]]
+
+# A CSV file path or a binary file object, such as an upload held in memory
+CsvSource = Union[str, IO[bytes]]
+
+
+def hash_file(source: CsvSource) -> str:
+    """Return the sha256 hex digest of a file's content"""
+    digest = hashlib.sha256()
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+    else:
+        # File objects are read from the start and rewound for the processor
+        source.seek(0)
+        for block in iter(lambda: source.read(1024 * 1024), b""):
+            digest.update(block)
+        source.seek(0)
+    return digest.hexdigest()
+
+
+class CacheBackend(ABC):
+    """Size-bounded byte store that evicts the least recently used entries."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the stored bytes and mark the entry as recently used"""
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: bytes) -> None:
+        """Store the bytes and evict old entries until the size bound holds"""
+        pass
+
+
+class DiskCacheBackend(CacheBackend):
+    """Stores one file per entry, using file modification time for recency."""
+
+    def __init__(self, directory: Path, max_bytes: int = 512 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.bin"
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            value = path.read_bytes()
+            # Touch the entry so it counts as recently used
+            os.utime(path)
+        except FileNotFoundError:
+            # Missing, or evicted by another writer between the read and the touch
+            return None
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        path = self._path(key)
+        # Write a uniquely named file next to the target and rename it, so
+        # concurrent writers never share a temp file and readers never see
+        # partial entries
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(value)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        self._evict()
+
+    def prune(self, keep: Iterable[str]) -> None:
+        """Remove every entry whose key is not kept"""
+        keep = set(keep)
+        for path in self.directory.glob("*.bin"):
+            if path.stem not in keep:
+                path.unlink(missing_ok=True)
+
+    def _evict(self) -> None:
+        entries = []
+        for path in self.directory.glob("*.bin"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total_bytes -= size
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Keeps entries in this process, ordered from least to most recently used."""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes) -> None:
+        with self._lock:
+            old_value = self._entries.pop(key, None)
+            if old_value is not None:
+                self._total_bytes -= len(old_value)
+            if len(value) > self.max_bytes:
+                return  # Would evict everything and still not fit
+
+            self._entries[key] = value
+            self._total_bytes += len(value)
+            while self._total_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= len(evicted)
+
+
+class RedisCacheBackend(CacheBackend):
+    """Stores entries in Redis, with a sorted set of access times for recency.
+
+    With a ttl, entries also expire that many seconds after they were stored.
+    """
+
+    def __init__(
+        self,
+        client,
+        max_bytes: int = 256 * 1024 * 1024,
+        prefix: str = "processed-data",
+        ttl: Optional[int] = None,
+    ):
+        self.client = client
+        self.max_bytes = max_bytes
+        self.prefix = prefix
+        self.ttl = ttl
+        self._lru_key = f"{prefix}:lru"
+        self._sizes_key = f"{prefix}:sizes"
+        self._total_key = f"{prefix}:bytes"
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        value = self.client.get(self._key(key))
+        if value is None:
+            self._forget(key)
+            return None
+        self.client.zadd(self._lru_key, {key: time.time()})
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        old_size = self.client.hget(self._sizes_key, key)
+        pipe = self.client.pipeline()
+        pipe.set(self._key(key), value, ex=self.ttl)
+        pipe.zadd(self._lru_key, {key: time.time()})
+        pipe.hset(self._sizes_key, key, len(value))
+        pipe.incrby(self._total_key, len(value) - int(old_size or 0))
+        pipe.execute()
+        self._evict()
+
+    def _forget(self, key: str) -> None:
+        size = self.client.hget(self._sizes_key, key)
+        if size is None:
+            return
+        pipe = self.client.pipeline()
+        pipe.delete(self._key(key))
+        pipe.zrem(self._lru_key, key)
+        pipe.hdel(self._sizes_key, key)
+        pipe.decrby(self._total_key, int(size))
+        pipe.execute()
+
+    def _evict(self) -> None:
+        while int(self.client.get(self._total_key) or 0) > self.max_bytes:
+            oldest = self.client.zrange(self._lru_key, 0, 0)
+            if not oldest:
+                break
+            key = oldest[0]
+            self._forget(key.decode() if isinstance(key, bytes) else key)
+
+
+class ProcessedDataCache:
+    """Content-addressed cache for the output of DataProcessor.get_processed_data.
+
+    Entries are keyed by the file content hash and the config class and
+    version. Group rows are stored as one Parquet table, with the group
+    order and weekly summaries in a small JSON header in front of it.
+    """
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        try:
+            import pyarrow  # noqa: F401
+
+            self.enabled = True
+        except ImportError:
+            print("pyarrow not available - processed data cache disabled")
+            self.enabled = False
+
+    def key_for(self, source: CsvSource, project_config: ProjectConfig) -> str:
+        """Return the cache key for a file processed with the given config"""
+        return self.key_for_digest(hash_file(source), project_config)
+
+    @staticmethod
+    def key_for_digest(content_digest: str, project_config: ProjectConfig) -> str:
+        """Return the cache key for file content with the given hash"""
+        config_class = type(project_config)
+        config_id = (
+            f"{config_class.__module__}.{config_class.__qualname__}"
+            f"@{project_config.version}/{CACHE_FORMAT_VERSION}"
+        )
+        config_hash = hashlib.sha256(config_id.encode()).hexdigest()[:16]
+        return f"{content_digest}-{config_hash}"
+
+    def get(self, key: str) -> Optional[ProcessedData]:
+        """Return the cached processed data, None on a miss"""
+        if not self.enabled:
+            return None
+        blob = self.backend.get(key)
+        if blob is None:
+            return None
+        try:
+            return self._decode(blob)
+        except Exception as e:
+            # A truncated or corrupt entry is a miss, and gets overwritten
+            print(f"Ignoring unreadable processed data cache entry {key}: {e}")
+            return None
+
+    def set(self, key: str, data: ProcessedData) -> None:
+        """Store processed data under the given key.
+
+        The cache is an optimization, so a failed write is reported and
+        otherwise ignored instead of failing the report.
+        """
+        if not self.enabled:
+            return
+        try:
+            self.backend.set(key, self._encode(data))
+        except Exception as e:
+            print(f"Could not write processed data cache entry {key}: {e}")
+
+    @staticmethod
+    def _encode(data: ProcessedData) -> bytes:
+        group_dfs, group_summaries = data
+        summary = {
+            "groups": list(group_dfs),
+            "row_counts": [len(group_df) for group_df in group_dfs.values()],
+            "summaries": {
+                group_name: {
+                    "total_hours": float(group_summary.total_hours),
+                    "weeks": [int(w) for w in group_summary.hours_per_week["week"]],
+                    "hours": [
+                        float(h) for h in group_summary.hours_per_week["duration_hours"]
+                    ],
+                }
+                for group_name, group_summary in group_summaries.items()
+            },
+        }
+        header = json.dumps(summary).encode()
+
+        rows = io.BytesIO()
+        if group_dfs:
+            pd.concat(group_dfs.values(), ignore_index=True).to_parquet(
+                rows, index=False
+            )
+        return struct.pack(">I", len(header)) + header + rows.getvalue()
+
+    @staticmethod
+    def _decode(blob: bytes) -> ProcessedData:
+        (header_length,) = struct.unpack(">I", blob[:4])
+        summary = json.loads(blob[4 : 4 + header_length])
+
+        # Groups are stored back to back, so each one is a slice of the table
+        group_dfs: Dict[str, DataFrame] = {}
+        if summary["groups"]:
+            rows = pd.read_parquet(io.BytesIO(blob[4 + header_length :]))
+            start = 0
+            for group_name, row_count in zip(summary["groups"], summary["row_counts"]):
+                group_dfs[group_name] = rows.iloc[start : start + row_count]
+                start += row_count
+
+        group_summaries = {
+            group_name: GroupSummary(
+                total_hours=group_summary["total_hours"],
+                hours_per_week=DataFrame(
+                    {
+                        "week": pd.array(group_summary["weeks"], dtype="UInt32"),
+                        "duration_hours": group_summary["hours"],
+                    }
+                ),
+            )
+            for group_name, group_summary in summary["summaries"].items()
+        }
+        return group_dfs, group_summaries
@@ -0,0 +1,94 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from importlib import import_module
+import io
+from itertools import repeat
+import multiprocessing
+import os
+import pickle
+from typing import List, Optional, Union
+
+from src.data_processing.cache import CsvSource, ProcessedData
+from src.data_processing.processor import DataProcessor
+from src.types.project_config import ProjectConfig
+
+
+def can_start_processes() -> bool:
+    """Whether this process may start worker processes.
+
+    Daemonic processes, such as the workers of `hypercorn --workers`, may not.
+    """
+    return not multiprocessing.current_process().daemon
+
+
+def config_reference(config: ProjectConfig) -> Union[ProjectConfig, str]:
+    """Return the config itself if it can be pickled, else its class path"""
+    try:
+        pickle.dumps(config)
+        return config
+    except (pickle.PicklingError, TypeError, AttributeError):
+        config_class = type(config)
+        return f"{config_class.__module__}:{config_class.__qualname__}"
+
+
+def resolve_config(reference: Union[ProjectConfig, str]) -> ProjectConfig:
+    """Turn a config reference back into a config instance"""
+    if isinstance(reference, ProjectConfig):
+        return reference
+    module_name, class_name = reference.split(":")
+    return getattr(import_module(module_name), class_name)()
+
+
+def _picklable_source(source: CsvSource) -> CsvSource:
+    """Open files cannot be sent to the workers, so send their content instead"""
+    if isinstance(source, (str, os.PathLike, io.BytesIO)):
+        return source
+    source.seek(0)
+    return io.BytesIO(source.read())
+
+
+def _process_in_worker(
+    reference: Union[ProjectConfig, str], chunk_size: Optional[int], source: CsvSource
+) -> ProcessedData:
+    processor = DataProcessor(resolve_config(reference), chunk_size=chunk_size)
+    return processor.get_processed_data(source)
+
+
+def process_files(
+    processor: DataProcessor, sources: List[CsvSource], workers: int
+) -> List[ProcessedData]:
+    """Process independent CSV files in a process pool.
+
+    Results are returned in the order of sources. The processor's cache
+    is only used in this process, workers just parse, label and summarize.
+    Where no processes can be started, the files are processed one by one.
+    """
+    results: List[Optional[ProcessedData]] = [None] * len(sources)
+    cache_keys = {}
+
+    if processor.cache:
+        for i, source in enumerate(sources):
+            cache_keys[i] = processor.cache.key_for(source, processor.project_config)
+            results[i] = processor.cache.get(cache_keys[i])
+
+    misses = [i for i, result in enumerate(results) if result is None]
+    if not misses:
+        return results
+
+    reference = config_reference(processor.project_config)
+    if can_start_processes():
+        pool: Executor = ProcessPoolExecutor(max_workers=min(workers, len(misses)))
+    else:
+        pool = ThreadPoolExecutor(max_workers=1)
+    with pool:
+        processed = pool.map(
+            _process_in_worker,
+            repeat(reference),
+            repeat(processor.chunk_size),
+            [_picklable_source(sources[i]) for i in misses],
+        )
+        for i, result in zip(misses, processed):
+            results[i] = result
+            if processor.cache:
+                processor.cache.set(cache_keys[i], result)
+
+    return results
@@ -1,61 +1,232 @@
-from pandas import DataFrame
+import pickle
+import tempfile
+import numpy as np
+from pandas import DataFrame, Series
 import pandas as pd
-from typing import Dict, Tuple
+from typing import IO, Dict, Iterator, Optional, Tuple
+from src.data_processing.cache import CsvSource, ProcessedDataCache
+from src.metrics import timed
 from src.types.dataclasses import GroupSummary
 from src.types.project_config import ProjectConfig
 
+try:
+    import pyarrow
+    from pyarrow import compute as pyarrow_compute, csv as pyarrow_csv
+
+    CSV_ENGINE = "pyarrow"
+    # The column types of CSV_DTYPES below, for reading with pyarrow directly
+    CSV_ARROW_TYPES = {
+        "startTime": pyarrow.string(),
+        "duration": pyarrow.float64(),
+        "description": pyarrow.string(),
+    }
+except ImportError:
+    CSV_ENGINE = "c"
+
+# Documented CSV format: ISO 8601 startTime, integer duration in minutes and
+# a triple-quoted description. Any other columns are skipped while parsing.
+# startTime is parsed after reading, the same way for every engine, and
+# duration is read as floats so empty cells do not stop the report.
+CSV_COLUMNS = ["startTime", "duration", "description"]
+CSV_DTYPES = {"startTime": str, "duration": "float64", "description": str}
+
+# Time of day followed by a UTC offset, the offset is dropped so sessions keep
+# their local time, even when offsets differ across a daylight saving change
+UTC_OFFSET_RE = r"([T ]\d{2}:[\d:.]*)(?:Z|[+-]\d{2}(?::?\d{2})?)$"
+
+
+class CsvFormatError(ValueError):
+    """Raised when a CSV file does not follow the documented format"""
+
 
 class DataProcessor:
-    def __init__(self, project_config: ProjectConfig):
+    def __init__(
+        self,
+        project_config: ProjectConfig,
+        chunk_size: Optional[int] = None,
+        cache: Optional[ProcessedDataCache] = None,
+    ):
         self.project_config = project_config
+        # Rows per chunk in streaming mode, None reads the whole file at once
+        self.chunk_size = chunk_size
+        self.cache = cache
+
+    @staticmethod
+    def _rewind(source: CsvSource) -> CsvSource:
+        """Return the source, file objects rewound to be read from the start"""
+        if hasattr(source, "seek"):
+            source.seek(0)
+        return source
 
-    def _read_csv(self, file_path: str) -> DataFrame:
+    def _read_csv(self, source: CsvSource) -> DataFrame:
         """Read the CSV file into a DataFrame."""
-        return pd.read_csv(file_path)
+        try:
+            if CSV_ENGINE == "pyarrow":
+                # Read with pyarrow directly, as pandas lets it parse startTime
+                # into UTC before applying the string type
+                table = pyarrow_csv.read_csv(
+                    self._rewind(source),
+                    convert_options=pyarrow_csv.ConvertOptions(
+                        include_columns=CSV_COLUMNS, column_types=CSV_ARROW_TYPES
+                    ),
+                )
+                return table.to_pandas()
+            return pd.read_csv(
+                self._rewind(source), usecols=CSV_COLUMNS, dtype=CSV_DTYPES
+            )
+        except (ValueError, KeyError) as e:
+            raise self._format_error(source, e) from e
+
+    def _format_error(self, source: CsvSource, error: Exception) -> CsvFormatError:
+        """Explain why a CSV file could not be read, naming the column if possible"""
+        try:
+            # Read again without the numeric column type to find the bad value
+            df = pd.read_csv(
+                self._rewind(source),
+                usecols=CSV_COLUMNS,
+                dtype={column: str for column in CSV_COLUMNS},
+            )
+        except (ValueError, KeyError) as e:
+            return CsvFormatError(f"Invalid CSV file: {e}")
+
+        durations = pd.to_numeric(df["duration"], errors="coerce")
+        invalid = durations.isna() & df["duration"].notna()
+        if invalid.any():
+            row = invalid.to_numpy().nonzero()[0][0]
+            return CsvFormatError(
+                f"Column 'duration' must hold numbers of minutes, found "
+                f"{df['duration'].iloc[row]!r} on line {row + 2}"
+            )
+        return CsvFormatError(f"Invalid CSV file: {error}")
+
+    @staticmethod
+    def _parse_start_times(start_times: Series) -> Series:
+        """Parse startTime values with the fixed ISO 8601 format.
+
+        Sessions keep the local time they were logged at: UTC offsets are
+        dropped before parsing, so a session is dated by its local date.
+        """
+        if pd.api.types.is_datetime64_any_dtype(start_times):
+            if start_times.dt.tz is not None:
+                return start_times.dt.tz_localize(None)
+            return start_times
 
-    def _preprocess_data(self, df: DataFrame) -> DataFrame:
+        if CSV_ENGINE == "pyarrow":
+            local_times = pyarrow_compute.replace_substring_regex(
+                pyarrow.array(start_times, type=pyarrow.string()),
+                pattern=UTC_OFFSET_RE,
+                replacement=r"\1",
+            )
+            try:
+                parsed = local_times.cast(pyarrow.timestamp("ns"))
+                return Series(parsed.to_numpy(), index=start_times.index)
+            except pyarrow.ArrowInvalid:
+                # Invalid values become NaT below, like in the C engine path
+                pass
+
+        return pd.to_datetime(
+            start_times.str.replace(UTC_OFFSET_RE, r"\1", regex=True),
+            format="ISO8601",
+            errors="coerce",
+        )
+
+    @staticmethod
+    def _minutes(duration: Series) -> Series:
+        """Durations as whole minutes when they all are, as in the CSV files"""
+        whole = duration.notna().all() and (duration % 1 == 0).all()
+        return duration.astype("int64") if whole else duration
+
+    def _preprocess_data(self, df: DataFrame, sort: bool = True) -> DataFrame:
         """Process the raw data into required format."""
-        # Sort by full timestamp first
-        df = df.sort_values(by="startTime", ascending=True)
-        df["date"] = pd.to_datetime(df["startTime"], errors="coerce").dt.date
-        df["duration_minutes"] = df["duration"]
-        df["description"] = df["description"].str.replace('"', "")
-        df = df[["date", "duration_minutes", "description"]]
-        return df
+        start_times = self._parse_start_times(df["startTime"])
+        if sort:
+            # Sort by full timestamp first
+            order = start_times.sort_values(kind="stable").index
+            df, start_times = df.loc[order], start_times.loc[order]
 
-    def _split_data(self, df: DataFrame) -> Dict[str, DataFrame]:
-        """Split data by project parts based on config."""
-        df["Part"] = df.apply(
-            lambda row: self.project_config.label_session(
-                row["date"], row["description"]
-            ),
-            axis=1,
+        # ISO year and week once for the whole frame, year_week = year * 100 + week
+        iso_calendar = start_times.dt.isocalendar()
+        return DataFrame(
+            {
+                "startTime": start_times,
+                "date": start_times.dt.date,
+                "week": iso_calendar["week"],
+                "year_week": iso_calendar["year"] * 100 + iso_calendar["week"],
+                "duration_minutes": self._minutes(df["duration"]),
+                "description": df["description"].str.replace('"', ""),
+            }
+        )
+
+    def _get_part_groups(self) -> Dict[str, str]:
+        """Map every part name to its group, configs list each part once."""
+        return {
+            part_name: group_name
+            for group_name, group_parts in self.project_config.get_groupings().items()
+            for part_name in group_parts
+        }
+
+    def _label_data(self, df: DataFrame) -> DataFrame:
+        """Label every session with its project part and group.
+
+        Both columns are categorical, with groups ordered as in the config.
+        """
+        labels = self.project_config.label_sessions(df["date"], df["description"])
+        df["Part"] = labels.astype("category")
+        df["group"] = pd.Categorical(
+            labels.map(self._get_part_groups()),
+            categories=list(self.project_config.get_groupings()),
         )
+        return df
 
-        groupings = self.project_config.get_groupings()
+    def _split_data(self, df: DataFrame) -> Dict[str, DataFrame]:
+        """Split labeled data into the config's groups, in config order.
 
-        group_dfs = {}
+        The rows are stable-sorted by group once, and every group is a slice
+        of that shared frame rather than a copy of its rows. Rows without a
+        group sort first and are left out.
+        """
+        codes = df["group"].cat.codes.to_numpy()
+        df = df.iloc[np.argsort(codes, kind="stable")]
+        sorted_codes = np.sort(codes, kind="stable")
 
-        # For each group, collect all matching parts at once
-        for group_name, group_parts in groupings.items():
-            matching_rows = df["Part"].isin(group_parts)
-            if matching_rows.any():
-                group_df = df[matching_rows].copy()
-                group_df = group_df.reset_index(drop=True)
-                group_dfs[group_name] = group_df
+        group_dfs: Dict[str, DataFrame] = {}
+        for code, group_name in enumerate(df["group"].cat.categories):
+            start, stop = np.searchsorted(sorted_codes, [code, code + 1])
+            if start < stop:
+                group_dfs[group_name] = df.iloc[start:stop]
         return group_dfs
 
-    def _calculate_summary(self, df: DataFrame) -> GroupSummary:
-        """Calculate hours summary per dataset."""
-        df.loc[:, "week"] = pd.to_datetime(df["date"]).dt.isocalendar().week
-        df.loc[:, "duration_hours"] = df["duration_minutes"] / 60
-        total_hours = df["duration_hours"].sum()
-        hours_per_week = df.groupby("week")["duration_hours"].sum().reset_index()
-        return total_hours, hours_per_week
+    def _aggregate_hours(self, df: DataFrame) -> Tuple[Series, Series]:
+        """Return total hours per group and hours per group and ISO week."""
+        hours = df["duration_minutes"] / 60
+        total_hours = hours.groupby(df["group"], observed=True).sum()
+        weekly_hours = hours.groupby(
+            [df["group"], df["year_week"]], observed=True
+        ).sum()
+        return total_hours, weekly_hours
+
+    def _build_summaries(
+        self, total_hours: Series, weekly_hours: Series
+    ) -> Dict[str, GroupSummary]:
+        """Build a GroupSummary per group from the aggregated hours."""
+        group_summaries: Dict[str, GroupSummary] = {}
+        for group_name in self.project_config.get_groupings():
+            if group_name not in total_hours.index:
+                continue
+            group_weeks = weekly_hours.xs(group_name, level="group").sort_index()
+            group_summaries[group_name] = GroupSummary(
+                total_hours=total_hours[group_name],
+                hours_per_week=DataFrame(
+                    {
+                        "week": (group_weeks.index % 100).astype("UInt32"),
+                        "duration_hours": group_weeks.to_numpy(),
+                    }
+                ),
+            )
+        return group_summaries
 
     def _prepare_data_for_output(self, df: DataFrame) -> DataFrame:
         """Format data for Excel output."""
-        df["week"] = pd.to_datetime(df["date"]).dt.isocalendar().week
         return df.rename(
             columns={
                 "Part": "Part",
@@ -66,29 +237,131 @@ class DataProcessor:
             }
         )[["Part", "Week", "Date", "Minutes", "Description"]]
 
+    @staticmethod
+    def _read_spool(spool: IO[bytes]) -> DataFrame:
+        """Read back every chunk written to a group spool, in global time order."""
+        spool.seek(0)
+        chunks = []
+        while True:
+            try:
+                chunks.append(pickle.load(spool))
+            except EOFError:
+                break
+        df = pd.concat(chunks, ignore_index=True)
+        df = df.sort_values(by="startTime", kind="stable")
+        # Chunks have their own Part categories, so concat falls back to strings
+        df["Part"] = df["Part"].astype("category")
+        return df.drop(columns="startTime").reset_index(drop=True)
+
+    def _read_chunks(self, source: CsvSource) -> Iterator[DataFrame]:
+        """Read the CSV file in chunks of chunk_size rows."""
+        try:
+            # The pyarrow engine cannot read in chunks, so use the C engine here
+            yield from pd.read_csv(
+                self._rewind(source),
+                chunksize=self.chunk_size,
+                usecols=CSV_COLUMNS,
+                dtype=CSV_DTYPES,
+            )
+        except (ValueError, KeyError) as e:
+            raise self._format_error(source, e) from e
+
+    def _get_processed_data_streaming(
+        self, source: CsvSource
+    ) -> Tuple[Dict[str, DataFrame], Dict[str, GroupSummary]]:
+        """Process the CSV in bounded chunks.
+
+        Each chunk is labeled and split on its own. Weekly hours are folded
+        into running totals and the prepared rows are spooled to temporary
+        files, so only one chunk is held in memory while reading.
+        """
+        total_hours: Optional[Series] = None
+        weekly_hours: Optional[Series] = None
+        spools: Dict[str, IO[bytes]] = {}
+
+        try:
+            for chunk in self._read_chunks(source):
+                with timed("preprocess", rows=len(chunk)):
+                    chunk = self._preprocess_data(chunk, sort=False)
+                with timed("label", rows=len(chunk)):
+                    chunk = self._label_data(chunk)
+
+                chunk_total_hours, chunk_weekly_hours = self._aggregate_hours(chunk)
+                if total_hours is None:
+                    total_hours, weekly_hours = chunk_total_hours, chunk_weekly_hours
+                else:
+                    total_hours = total_hours.add(chunk_total_hours, fill_value=0)
+                    weekly_hours = weekly_hours.add(chunk_weekly_hours, fill_value=0)
+
+                with timed("split", rows=len(chunk)):
+                    for group_name, group_df in self._split_data(chunk).items():
+                        if group_name not in spools:
+                            spools[group_name] = tempfile.TemporaryFile()
+                        prepared = self._prepare_data_for_output(group_df)
+                        prepared["startTime"] = group_df["startTime"].values
+                        pickle.dump(prepared, spools[group_name])
+
+            if total_hours is None:
+                return {}, {}
+
+            with timed("summarize"):
+                group_summaries = self._build_summaries(total_hours, weekly_hours)
+            # Keep the group order of the config, like _split_data does
+            prepared_group_dfs = {
+                group_name: self._read_spool(spools[group_name])
+                for group_name in group_summaries
+            }
+        finally:
+            for spool in spools.values():
+                spool.close()
+
+        return prepared_group_dfs, group_summaries
+
     def get_processed_data(
-        self, file_path: str
+        self, source: CsvSource
     ) -> Tuple[Dict[str, DataFrame], Dict[str, GroupSummary]]:
-        """Process the data and return dictionaries mapping group names to their data."""
-        # Read and preprocess
-        df: DataFrame = self._read_csv(file_path)
-        df: DataFrame = self._preprocess_data(df)
+        """Process the data and return dictionaries mapping group names to their data.
 
-        # Split into groups
-        group_dfs: Dict[str, DataFrame] = self._split_data(df)
+        The source is a CSV file path or a binary file object, read from its start.
+        """
+        if self.cache:
+            cache_key = self.cache.key_for(source, self.project_config)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
 
-        # Calculate summaries and prepare data for each group
-        group_summaries: Dict[str, GroupSummary] = {}
-        prepared_group_dfs: Dict[str, DataFrame] = {}
+        processed = self._process_file(source)
 
-        for group_name, group_df in group_dfs.items():
-            # Calculate summary
-            total_hours, hours_per_week = self._calculate_summary(group_df)
-            group_summaries[group_name] = GroupSummary(
-                total_hours=total_hours, hours_per_week=hours_per_week
-            )
+        if self.cache:
+            self.cache.set(cache_key, processed)
+        return processed
+
+    def _process_file(
+        self, source: CsvSource
+    ) -> Tuple[Dict[str, DataFrame], Dict[str, GroupSummary]]:
+        """Read, label and summarize a single CSV file."""
+        if self.chunk_size:
+            return self._get_processed_data_streaming(source)
 
-            # Prepare data for output
-            prepared_group_dfs[group_name] = self._prepare_data_for_output(group_df)
+        # Read, preprocess and label
+        with timed("read") as stage:
+            df: DataFrame = self._read_csv(source)
+            stage["rows"] = len(df)
+        with timed("preprocess", rows=len(df)):
+            df: DataFrame = self._preprocess_data(df)
+        with timed("label", rows=len(df)):
+            df: DataFrame = self._label_data(df)
+
+        # Summarize every group and week in one pass
+        with timed("summarize", rows=len(df)):
+            total_hours, weekly_hours = self._aggregate_hours(df)
+            group_summaries = self._build_summaries(total_hours, weekly_hours)
+
+        # Split into groups and prepare data for output
+        with timed("split", rows=len(df)):
+            prepared_group_dfs: Dict[str, DataFrame] = {
+                group_name: self._prepare_data_for_output(group_df)
+                for group_name, group_df in self._split_data(df).items()
+            }
 
         return prepared_group_dfs, group_summaries
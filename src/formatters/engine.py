@@ -0,0 +1,155 @@
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import IO, Dict, Iterator, List, Tuple, Union
+
+from pandas import DataFrame
+
+from src.types.dataclasses import GroupSummary, ProjectInfo
+
+ReportData = List[
+    Tuple[
+        ProjectInfo,
+        Dict[str, DataFrame],  # Group data
+        Dict[str, GroupSummary],  # Group summaries
+    ]
+]
+
+# Style variable of every part sheet column width, by one-based column
+PART_SHEET_WIDTHS = {
+    1: "part_col_width",
+    2: "week_col_width",
+    3: "date_col_width",
+    4: "minutes_col_width",
+    5: "description_col_width",
+    7: "summary_metric_col_width",
+    8: "summary_value_col_width",
+}
+
+
+class ExcelEngine(ABC):
+    """Renders report data as an .xlsx workbook with one spreadsheet library.
+
+    Every engine produces the same layout: a Total sheet with a grid of
+    project summaries, and one sheet per project part with the sessions in
+    columns A-E and the weekly overview and summary in columns G-H.
+    """
+
+    # Name used to select the engine, e.g. in ReportGenerator
+    name: str
+
+    def __init__(
+        self,
+        data: ReportData,
+        style_vars: Dict[str, int],
+        total_sheet_first: bool = True,
+    ):
+        self.data = data
+        self.style_vars = style_vars
+        self.total_sheet_first = total_sheet_first
+
+    @abstractmethod
+    def render(self, output_path: Union[str, IO[bytes]]) -> None:
+        """Write the Total and part sheets and save the workbook to a path or buffer"""
+        pass
+
+
+class PartSheetLayout:
+    """The cells of a part sheet in row order, for engines that stream rows.
+
+    Columns A-E hold the title, header and data rows, columns G-H the
+    weekly overview and the summary block. Rows and columns are one-based
+    as in Excel and styles are given as StyleRegistry roles.
+    """
+
+    def __init__(
+        self,
+        df: DataFrame,
+        title: str,
+        total_hours: float,
+        hours_per_week: DataFrame,
+    ):
+        self.df = df
+        self.title = title
+        self.total_weeks = len(hours_per_week)
+
+        # Weekly overview rows start at row 3, the summary block below them
+        self.weekly_start = 3
+        self.summary_start = self.total_weeks + 4
+        self.summary_data = [
+            ("Total Hours", total_hours),
+            ("Total Weeks", self.total_weeks),
+            (
+                "Average Hours/Week",
+                total_hours / self.total_weeks if self.total_weeks else 0,
+            ),
+        ]
+        self.hours_per_week = hours_per_week
+
+        self.data_end = len(df) + 2
+        self.last_row = max(self.data_end, self.summary_start + len(self.summary_data))
+
+        # (min_row, min_col, max_row, max_col) of the title and summary header
+        self.merges = [
+            (1, 1, 1, 5),
+            (self.summary_start, 7, self.summary_start, 8),
+        ]
+
+    @staticmethod
+    def _parity(row: int) -> str:
+        return "even" if row % 2 == 0 else "odd"
+
+    def _side_cells(self) -> Dict[int, list]:
+        """Cells in columns G-H, by row"""
+        side_cells = {}
+        weeks = zip(self.hours_per_week["week"], self.hours_per_week["duration_hours"])
+        for row, (week, hours) in enumerate(weeks, self.weekly_start):
+            parity = self._parity(row)
+            side_cells[row] = [
+                (7, f"Week {week}", f"cell_{parity}"),
+                (8, hours, f"hours_{parity}"),
+            ]
+        side_cells[self.summary_start] = [(7, "Summary", "header_wrap")]
+        for row, (metric, value) in enumerate(
+            self.summary_data, self.summary_start + 1
+        ):
+            parity = self._parity(row)
+            value_role = "hours_wrap" if "Hours" in metric else "count_wrap"
+            side_cells[row] = [
+                (7, metric, f"data_{parity}"),
+                (8, value, f"{value_role}_{parity}"),
+            ]
+        return side_cells
+
+    def sized_row(self, row: int) -> bool:
+        """Whether the row gets the fixed part row height"""
+        return (
+            row <= self.data_end
+            or row <= self.weekly_start + self.total_weeks - 1
+            or self.summary_start <= row <= self.summary_start + len(self.summary_data)
+        )
+
+    def rows(self) -> Iterator[Tuple[int, List[Tuple[int, object, str]]]]:
+        """Yield (row, cells) for every row, cells as (column, value, role)"""
+        side_cells = self._side_cells()
+
+        yield 1, [(1, self.title, "title")]
+
+        headers = [
+            (col, header, "header") for col, header in enumerate(self.df.columns, 1)
+        ]
+        yield 2, headers + [(7, "Week", "header"), (8, "Hours", "header")]
+
+        row = 3
+        for values in self.df.itertuples(index=False, name=None):
+            parity = self._parity(row)
+            data_role, date_role = f"data_{parity}", f"date_{parity}"
+            cells = [
+                # Dates keep their date format
+                (col, value, date_role if isinstance(value, date) else data_role)
+                for col, value in enumerate(values, 1)
+            ]
+            yield row, cells + side_cells.get(row, [])
+            row += 1
+
+        for row in range(row, self.last_row + 1):
+            yield row, side_cells.get(row, [])
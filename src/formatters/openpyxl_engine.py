@@ -0,0 +1,521 @@
+from copy import copy
+from datetime import date
+from openpyxl import Workbook
+from openpyxl.cell import Cell, WriteOnlyCell
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.cell_range import CellRange
+
+from pandas import DataFrame
+
+from typing import IO, Dict, Tuple, Union
+from src.formatters.engine import (
+    PART_SHEET_WIDTHS,
+    ExcelEngine,
+    PartSheetLayout,
+    ReportData,
+)
+from src.formatters.styles import STYLE_REGISTRY, StyleRegistry, WorkbookStyles
+from src.metrics import timed
+from src.types.dataclasses import GroupSummary
+
+
+class OpenpyxlEngine(ExcelEngine):
+    """Builds the report with openpyxl, in regular or write-only mode."""
+
+    name = "openpyxl"
+
+    def __init__(
+        self,
+        data: ReportData,
+        style_vars: Dict[str, int],
+        total_sheet_first: bool = True,
+        write_only: bool = False,
+        style_registry: StyleRegistry = STYLE_REGISTRY,
+    ):
+        super().__init__(data, style_vars, total_sheet_first)
+        self.wb = Workbook(write_only=write_only)
+        self.style_registry = style_registry
+        self._workbook_styles: Dict[Tuple[str, str], WorkbookStyles] = {}
+
+    def _styles(self, ws, primary_color: str, secondary_color: str) -> WorkbookStyles:
+        """Return the styles of a color scheme, registered in the sheet's workbook."""
+        if ws.parent is not self.wb:  # Scratch workbook of _write_total_sheet
+            return self.style_registry.register(
+                ws.parent, primary_color, secondary_color
+            )
+        scheme = (primary_color, secondary_color)
+        if scheme not in self._workbook_styles:
+            self._workbook_styles[scheme] = self.style_registry.register(
+                self.wb, primary_color, secondary_color
+            )
+        return self._workbook_styles[scheme]
+
+    def render(self, output_path: Union[str, IO[bytes]]) -> None:
+        """Build every sheet and save the workbook."""
+        try:
+            # Remove default sheet
+            if "Sheet" in self.wb.sheetnames:
+                self.wb.remove(self.wb["Sheet"])
+
+            # Write-only workbooks stream rows to disk and need rows in order
+            if self.wb.write_only:
+                format_total_sheet = self._write_total_sheet
+                format_part_sheets = self._write_part_sheets
+            else:
+                format_total_sheet = self._format_total_sheet
+                format_part_sheets = self._format_part_sheets
+
+            if self.total_sheet_first:
+                with timed("total_sheet"):
+                    format_total_sheet()
+                format_part_sheets()
+            else:
+                format_part_sheets()
+                with timed("total_sheet"):
+                    format_total_sheet()
+
+            print("Saving the workbook...")
+            with timed("save"):
+                self.wb.save(output_path)
+        finally:
+            self.wb.close()
+
+    def _format_part_sheets(self) -> None:
+        """Format individual sheets for each project's parts."""
+        for project_info, parts_data, summaries in self.data:
+            for part_name, df in parts_data.items():
+                # Create sheet
+                sheet_name = f"{project_info.title} {part_name}"
+                ws = self.wb.create_sheet(title=sheet_name)
+
+                # Set tab color
+                ws.sheet_properties.tabColor = project_info.primary_color
+
+                # Write and format sheet
+                with timed("part_sheet", rows=len(df)):
+                    self._format_part_sheet(
+                        ws=ws,
+                        df=df,
+                        title=f"{project_info.title} - {part_name}",
+                        primary_color=project_info.primary_color,
+                        secondary_color=project_info.secondary_color,
+                        total_hours=summaries[part_name].total_hours,
+                        hours_per_week=summaries[part_name].hours_per_week,
+                    )
+
+    def _format_part_sheet(
+        self,
+        ws,
+        df: DataFrame,
+        title: str,
+        primary_color: str,
+        secondary_color: str,
+        total_hours: float,
+        hours_per_week: DataFrame,
+    ) -> None:
+        """Format a single part sheet with data and styling."""
+        styles = self._styles(ws, primary_color, secondary_color)
+
+        # Add title
+        ws.merge_cells("A1:E1")
+        title_cell = ws.cell(row=1, column=1, value=title)
+        styles.apply(title_cell, "title")
+
+        # Write column headers (row 2, after title row) and style them
+        for col, header in enumerate(df.columns, start=1):
+            ws.cell(row=2, column=col, value=header)
+        self._format_header_row(ws, 2, styles)
+
+        # Write data starting from row 3
+        self._write_data_rows(ws, df, styles)
+
+        # Format data section
+        self._format_data_section(ws)
+
+        # Add and format weekly overview
+        self._add_weekly_overview(ws, hours_per_week, styles)
+
+        # Add and format summary section
+        self._add_summary_section(ws, total_hours, hours_per_week, styles)
+
+    def _format_total_sheet(self) -> None:
+        """Create and format the total summary sheet."""
+        ws = self.wb.create_sheet(title="Total")
+        self._build_total_sheet(ws)
+
+    def _build_total_sheet(self, ws) -> None:
+        """Fill a worksheet with the total summary grid."""
+        ws.sheet_properties.tabColor = self.style_vars["tab_color"]
+        ws.sheet_view.showGridLines = False
+
+        col_offset = 0
+        row = 1
+
+        for i, (project_info, _, summaries) in enumerate(self.data):
+            # Calculate position in 2x2 grid
+            if i % 3 == 0 and i > 0:  # Every 2nd dataset starts a new row
+                row += 12  # Height of each project section
+                col_offset = 0
+
+            # Merge cells for title (A-D or F-I depending on column offset)
+            start_col = chr(ord("A") + col_offset)
+            end_col = chr(ord("D") + col_offset)
+            ws.merge_cells(f"{start_col}{row}:{end_col}{row}")
+
+            # Add project section title
+            title_cell = ws.cell(
+                row=row, column=1 + col_offset, value=f"{project_info.title} - Summary"
+            )
+            styles = self._styles(
+                ws, project_info.primary_color, project_info.secondary_color
+            )
+            styles.apply(title_cell, "title")
+
+            # Set row height for title
+            ws.row_dimensions[row].height = self.style_vars["total_row_height"]
+
+            # Add part summaries and totals with column offset
+            next_row = self._add_project_summary(
+                ws, row + 1, styles, summaries, col_offset
+            )
+            next_row = self._add_project_totals_summary(
+                ws, next_row + 1, styles, summaries, col_offset
+            )
+
+            # Move to next column position
+            col_offset += 5  # Leave space between columns
+
+    def _write_total_sheet(self) -> None:
+        """Write the total summary sheet to a write-only workbook.
+
+        The grid is small, so it is built in a scratch worksheet with the
+        regular methods and then streamed out row by row.
+        """
+        scratch_wb = Workbook()
+        scratch_ws = scratch_wb.active
+        self._build_total_sheet(scratch_ws)
+
+        ws = self.wb.create_sheet(title="Total")
+        ws.sheet_properties.tabColor = copy(scratch_ws.sheet_properties.tabColor)
+        ws.sheet_view.showGridLines = scratch_ws.sheet_view.showGridLines
+        for letter, dimension in scratch_ws.column_dimensions.items():
+            ws.column_dimensions[letter].width = dimension.width
+        for merged_range in scratch_ws.merged_cells.ranges:
+            ws.merged_cells.add(str(merged_range))
+
+        for row in scratch_ws.iter_rows():
+            row_idx = row[0].row
+            height = scratch_ws.row_dimensions[row_idx].height
+            if height is not None:
+                ws.row_dimensions[row_idx].height = height
+
+            cells = []
+            for source in row:
+                cell = WriteOnlyCell(ws, value=source.value)
+                if source.has_style:
+                    cell.font = copy(source.font)
+                    cell.fill = copy(source.fill)
+                    cell.border = copy(source.border)
+                    cell.alignment = copy(source.alignment)
+                    cell.number_format = source.number_format
+                cells.append(cell)
+            ws.append(cells)
+
+        scratch_wb.close()
+
+    def _write_part_sheets(self) -> None:
+        """Write individual sheets for each project's parts to a write-only workbook."""
+        for project_info, parts_data, summaries in self.data:
+            for part_name, df in parts_data.items():
+                ws = self.wb.create_sheet(title=f"{project_info.title} {part_name}")
+                ws.sheet_properties.tabColor = project_info.primary_color
+
+                with timed("part_sheet", rows=len(df)):
+                    self._write_part_sheet(
+                        ws=ws,
+                        df=df,
+                        title=f"{project_info.title} - {part_name}",
+                        primary_color=project_info.primary_color,
+                        secondary_color=project_info.secondary_color,
+                        total_hours=summaries[part_name].total_hours,
+                        hours_per_week=summaries[part_name].hours_per_week,
+                    )
+
+    def _write_part_sheet(
+        self,
+        ws,
+        df: DataFrame,
+        title: str,
+        primary_color: str,
+        secondary_color: str,
+        total_hours: float,
+        hours_per_week: DataFrame,
+    ) -> None:
+        """Stream a part sheet row by row with the same layout as _format_part_sheet.
+
+        Every row is emitted once, in order, with its styles attached, so no
+        cells are kept in memory.
+        """
+        styles = self._styles(ws, primary_color, secondary_color)
+        layout = PartSheetLayout(df, title, total_hours, hours_per_week)
+
+        # Dimensions and merges must be set before the first row is written
+        for col, key in PART_SHEET_WIDTHS.items():
+            ws.column_dimensions[get_column_letter(col)].width = self.style_vars[key]
+        for min_row, min_col, max_row, max_col in layout.merges:
+            ws.merged_cells.add(
+                CellRange(
+                    min_row=min_row, min_col=min_col, max_row=max_row, max_col=max_col
+                )
+            )
+
+        for row_idx, cells in layout.rows():
+            if layout.sized_row(row_idx):
+                ws.row_dimensions[row_idx].height = self.style_vars["parts_row_height"]
+
+            row = [None] * (cells[-1][0] if cells else 0)
+            for col, value, role in cells:
+                cell = WriteOnlyCell(ws, value=value)
+                styles.apply(cell, role)
+                row[col - 1] = cell
+            ws.append(row)
+
+    def _format_header_row(self, ws, row: int, styles: WorkbookStyles) -> None:
+        """Format the header row with the scheme's header style."""
+        for cell in ws[row]:
+            styles.apply(cell, "header")
+
+    def _write_data_rows(self, ws, df: DataFrame, styles: WorkbookStyles) -> None:
+        """Append the data rows below the header, values and styles in one pass.
+
+        Rows are read as plain tuples, and every cell is created with its
+        style and appended, so no cell is looked up or touched twice.
+        """
+        row_idx = ws.max_row + 1
+        for values in df.itertuples(index=False, name=None):
+            parity = "even" if row_idx % 2 == 0 else "odd"
+            cells = []
+            for value in values:
+                cell = Cell(ws, value=value)
+                # Dates keep their date format
+                role = "date" if isinstance(value, date) else "data"
+                styles.apply(cell, f"{role}_{parity}")
+                cells.append(cell)
+            ws.append(cells)
+            row_idx += 1
+
+    def _format_data_section(self, ws) -> None:
+        """Set the column widths and row heights of the main data section."""
+        max_row = ws.max_row
+
+        # Set column widths
+        ws.column_dimensions["A"].width = self.style_vars["part_col_width"]
+        ws.column_dimensions["B"].width = self.style_vars["week_col_width"]
+        ws.column_dimensions["C"].width = self.style_vars["date_col_width"]
+        ws.column_dimensions["D"].width = self.style_vars["minutes_col_width"]
+        ws.column_dimensions["E"].width = self.style_vars["description_col_width"]
+
+        # Apply row height to all rows
+        for row in range(1, max_row + 1):
+            ws.row_dimensions[row].height = self.style_vars["parts_row_height"]
+
+    def _add_weekly_overview(
+        self, ws, hours_per_week: DataFrame, styles: WorkbookStyles
+    ) -> None:
+        """Add and format weekly hours overview section."""
+        # Start position for weekly overview
+        start_col = 7  # Column G
+        start_row = 2
+
+        # Add headers
+        ws.cell(row=start_row, column=start_col, value="Week")
+        ws.cell(row=start_row, column=start_col + 1, value="Hours")
+
+        # Style headers
+        for col in range(start_col, start_col + 2):
+            styles.apply(ws.cell(row=start_row, column=col), "header")
+
+        # Add data
+        for current_row, week, hours in zip(
+            range(start_row + 1, start_row + len(hours_per_week) + 1),
+            hours_per_week["week"],
+            hours_per_week["duration_hours"],
+        ):
+            parity = "even" if current_row % 2 == 0 else "odd"
+
+            # Week number
+            week_cell = ws.cell(row=current_row, column=start_col, value=f"Week {week}")
+            styles.apply(week_cell, f"cell_{parity}")
+
+            # Hours value
+            hours_cell = ws.cell(row=current_row, column=start_col + 1, value=hours)
+            styles.apply(hours_cell, f"hours_{parity}")
+
+        # Set column widths
+        ws.column_dimensions[get_column_letter(start_col)].width = self.style_vars[
+            "summary_metric_col_width"
+        ]
+        ws.column_dimensions[get_column_letter(start_col + 1)].width = self.style_vars[
+            "summary_value_col_width"
+        ]
+
+        # Apply row height to all rows in weekly overview
+        for row in range(start_row, start_row + len(hours_per_week) + 1):
+            ws.row_dimensions[row].height = self.style_vars["parts_row_height"]
+
+    def _add_summary_section(
+        self,
+        ws,
+        total_hours: float,
+        hours_per_week: DataFrame,
+        styles: WorkbookStyles,
+    ) -> None:
+        """Add and format summary section with totals."""
+        # Start position (below weekly overview)
+        start_col = 7  # Column G
+        start_row = len(hours_per_week) + 4  # Add some spacing
+
+        # Add header
+        ws.merge_cells(
+            start_row=start_row,
+            start_column=start_col,
+            end_row=start_row,
+            end_column=start_col + 1,
+        )
+        header = ws.cell(row=start_row, column=start_col, value="Summary")
+        styles.apply(header, "header_wrap")
+
+        # Add summary data
+        data = [
+            ("Total Hours", total_hours),
+            ("Total Weeks", len(hours_per_week)),
+            (
+                "Average Hours/Week",
+                total_hours / len(hours_per_week) if len(hours_per_week) > 0 else 0,
+            ),
+        ]
+
+        for idx, (metric, value) in enumerate(data, 1):
+            current_row = start_row + idx
+            parity = "even" if current_row % 2 == 0 else "odd"
+
+            # Metric name
+            metric_cell = ws.cell(row=current_row, column=start_col, value=metric)
+            styles.apply(metric_cell, f"data_{parity}")
+
+            # Value
+            value_cell = ws.cell(row=current_row, column=start_col + 1, value=value)
+            value_role = "hours_wrap" if "Hours" in metric else "count_wrap"
+            styles.apply(value_cell, f"{value_role}_{parity}")
+
+        # Set row height
+        for row in range(start_row, start_row + len(data) + 1):
+            ws.row_dimensions[row].height = self.style_vars["parts_row_height"]
+
+    def _add_project_summary(
+        self,
+        ws,
+        start_row: int,
+        styles: WorkbookStyles,
+        summaries: Dict[str, GroupSummary],
+        col_offset: int = 0,
+    ) -> int:
+        # Add headers with offset
+        headers = ["Project", "Total Hours", "Total Weeks", "Average Hours/Week"]
+        for col, header in enumerate(headers, 1):
+            cell = ws.cell(row=start_row, column=col + col_offset, value=header)
+            styles.apply(cell, "header")
+
+        # Add data for each part, hours columns get one decimal and weeks none
+        current_row = start_row + 1
+        column_roles = ["data", "hours_wrap", "count_wrap", "hours_wrap"]
+
+        for part_name, summary in summaries.items():
+            row_data = [
+                part_name,
+                summary.total_hours,
+                len(summary.hours_per_week),
+                (
+                    summary.total_hours / len(summary.hours_per_week)
+                    if len(summary.hours_per_week) > 0
+                    else 0
+                ),
+            ]
+
+            parity = "even" if current_row % 2 == 0 else "odd"
+            for col, (value, role) in enumerate(zip(row_data, column_roles), 1):
+                # Add col_offset here
+                cell = ws.cell(row=current_row, column=col + col_offset, value=value)
+                styles.apply(cell, f"{role}_{parity}")
+
+            current_row += 1
+
+        # Set column widths with offset
+        ws.column_dimensions[get_column_letter(1 + col_offset)].width = self.style_vars[
+            "project_col_width"
+        ]
+        ws.column_dimensions[get_column_letter(2 + col_offset)].width = self.style_vars[
+            "total_hours_col_width"
+        ]
+        ws.column_dimensions[get_column_letter(3 + col_offset)].width = self.style_vars[
+            "total_weeks_col_width"
+        ]
+        ws.column_dimensions[get_column_letter(4 + col_offset)].width = self.style_vars[
+            "avg_hours_per_week_col_width"
+        ]
+
+        # Apply row height to all rows in project summary
+        for row in range(start_row, current_row):
+            ws.row_dimensions[row].height = self.style_vars["total_row_height"]
+
+        return current_row
+
+    def _add_project_totals_summary(
+        self,
+        ws,
+        start_row: int,
+        styles: WorkbookStyles,
+        summaries: Dict[str, GroupSummary],
+        col_offset: int = 0,
+    ) -> int:
+        """Add summary totals for entire project. Returns next row number."""
+        # Calculate project totals
+        total_hours = sum(s.total_hours for s in summaries.values())
+        total_weeks = sum(len(s.hours_per_week) for s in summaries.values())
+        avg_hours = total_hours / total_weeks if total_weeks > 0 else 0
+
+        # Add header with offset
+        ws.merge_cells(
+            start_row=start_row,
+            start_column=1 + col_offset,
+            end_row=start_row,
+            end_column=2 + col_offset,
+        )
+        header = ws.cell(row=start_row, column=1 + col_offset, value="Project Total")
+        styles.apply(header, "header_wrap")
+
+        # Add summary data with offset
+        data = [
+            ("Total Hours", total_hours),
+            ("Total Weeks", total_weeks),
+            ("Average Hours/Week", avg_hours),
+        ]
+
+        for idx, (metric, value) in enumerate(data, 1):
+            current_row = start_row + idx
+            parity = "even" if current_row % 2 == 0 else "odd"
+
+            # Metric name with offset
+            metric_cell = ws.cell(row=current_row, column=1 + col_offset, value=metric)
+            styles.apply(metric_cell, f"cell_{parity}")
+
+            # Value with offset
+            value_cell = ws.cell(row=current_row, column=2 + col_offset, value=value)
+            value_role = "hours" if "Hours" in metric else "count"
+            styles.apply(value_cell, f"{value_role}_{parity}")
+
+        # Apply row heights
+        for row in range(start_row, start_row + len(data) + 1):
+            ws.row_dimensions[row].height = self.style_vars["total_row_height"]
+
+        return start_row + len(data) + 1
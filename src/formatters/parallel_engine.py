@@ -0,0 +1,249 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date
+import math
+import os
+import re
+import shutil
+import tempfile
+import time
+from typing import IO, Dict, List, Optional, Tuple, Union
+from xml.sax.saxutils import escape
+import zipfile
+
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.utils import get_column_letter
+from openpyxl.utils.datetime import to_excel
+from openpyxl.utils.exceptions import IllegalCharacterError
+from openpyxl.worksheet.cell_range import CellRange
+
+from src.data_processing.parallel import can_start_processes
+from src.formatters.engine import PART_SHEET_WIDTHS, PartSheetLayout, ReportData
+from src.formatters.openpyxl_engine import OpenpyxlEngine
+from src.formatters.sheet_cache import SheetCache
+from src.formatters.styles import STYLE_REGISTRY, StyleRegistry
+from src.metrics import record, timed
+
+# The empty rows element of a placeholder sheet and its dimension
+EMPTY_SHEET_DATA_RE = re.compile(rb"<sheetData\s*/>|<sheetData>\s*</sheetData>")
+DIMENSION_RE = re.compile(rb"<dimension [^>]*/>")
+
+
+def _cell_xml(ref: str, value, style_id: int) -> str:
+    """One <c> element, strings are written inline instead of shared"""
+    if isinstance(value, str):
+        if ILLEGAL_CHARACTERS_RE.search(value):
+            raise IllegalCharacterError(f"{value} cannot be used in worksheets.")
+        if len(value) > 1 and value.startswith("="):
+            # Formulas, as openpyxl and xlsxwriter treat them
+            return f'<c r="{ref}" s="{style_id}"><f>{escape(value[1:])}</f><v></v></c>'
+        return (
+            f'<c r="{ref}" s="{style_id}" t="inlineStr">'
+            f'<is><t xml:space="preserve">{escape(value)}</t></is></c>'
+        )
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return f'<c r="{ref}" s="{style_id}"/>'
+    if isinstance(value, bool):
+        return f'<c r="{ref}" s="{style_id}" t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, date):
+        return f'<c r="{ref}" s="{style_id}"><v>{to_excel(value)}</v></c>'
+    # Numbers, including numpy scalars
+    return f'<c r="{ref}" s="{style_id}"><v>{value}</v></c>'
+
+
+def _write_sheet_data(
+    path: str, layout: PartSheetLayout, style_ids: Dict[str, int], row_height: float
+) -> float:
+    """Write the <sheetData> element of a part sheet to a file.
+
+    Runs in the worker processes. Cells refer to their format by its index
+    in the workbook's styles.xml, so workers need no workbook of their own.
+    Returns the seconds it took, to be recorded by the main process.
+    """
+    start = time.perf_counter()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("<sheetData>")
+        for row, cells in layout.rows():
+            sized = layout.sized_row(row)
+            if not cells and not sized:
+                continue
+
+            parts = [
+                (
+                    f'<row r="{row}" ht="{row_height}" customHeight="1">'
+                    if sized
+                    else f'<row r="{row}">'
+                )
+            ]
+            for col, value, role in cells:
+                parts.append(
+                    _cell_xml(f"{get_column_letter(col)}{row}", value, style_ids[role])
+                )
+            parts.append("</row>")
+            f.write("".join(parts))
+        f.write("</sheetData>")
+    return time.perf_counter() - start
+
+
+class ParallelEngine(OpenpyxlEngine):
+    """Builds the report with the part sheets rendered in a process pool.
+
+    The main process builds the Total sheet, the shared styles and the rest
+    of the workbook package with openpyxl, plus an empty placeholder for
+    every part sheet with its tab color, widths and merges. Workers write
+    the rows of the part sheets as worksheet XML, and the rows are spliced
+    into the placeholders while the package is copied to the output file.
+
+    With a sheet cache and the processed data cache key of every dataset,
+    rows rendered by an earlier run are spliced in instead of rendered
+    again, and newly rendered rows are added to the cache.
+    """
+
+    name = "parallel"
+
+    def __init__(
+        self,
+        data: ReportData,
+        style_vars: Dict[str, int],
+        total_sheet_first: bool = True,
+        workers: int = None,
+        style_registry: StyleRegistry = STYLE_REGISTRY,
+        sheet_cache: Optional[SheetCache] = None,
+        dataset_keys: Optional[List[str]] = None,
+    ):
+        super().__init__(
+            data, style_vars, total_sheet_first, style_registry=style_registry
+        )
+        # Worker processes, None uses every core
+        self.workers = workers
+        self.sheet_cache = sheet_cache if dataset_keys is not None else None
+        self.dataset_keys = dataset_keys
+
+    def _executor(self) -> Executor:
+        sheet_count = sum(len(parts_data) for _, parts_data, _ in self.data)
+        workers = min(self.workers or os.cpu_count() or 1, sheet_count)
+        if workers <= 1 or not can_start_processes():
+            # A single worker gains nothing from a pool, only the cost of one
+            return ThreadPoolExecutor(max_workers=1)
+        return ProcessPoolExecutor(max_workers=workers)
+
+    def render(self, output_path: Union[str, IO[bytes]]) -> None:
+        """Build every sheet and save the workbook."""
+        try:
+            # Remove default sheet
+            if "Sheet" in self.wb.sheetnames:
+                self.wb.remove(self.wb["Sheet"])
+
+            with tempfile.TemporaryDirectory() as tmp_dir, self._executor() as pool:
+                if self.total_sheet_first:
+                    with timed("total_sheet"):
+                        self._format_total_sheet()
+                    pending = self._submit_part_sheets(pool, tmp_dir)
+                else:
+                    pending = self._submit_part_sheets(pool, tmp_dir)
+                    with timed("total_sheet"):
+                        self._format_total_sheet()
+
+                # Sheets get their file names on save
+                print("Saving the workbook...")
+                with timed("save"):
+                    package_path = os.path.join(tmp_dir, "package.xlsx")
+                    self.wb.save(package_path)
+
+                    sheet_rows = {}
+                    for ws, layout, rows_path, future, cache_key in pending:
+                        if future is not None:
+                            # Timed in the workers, recorded where it is exported
+                            record("part_sheet", future.result(), rows=len(layout.df))
+                            if cache_key is not None:
+                                self.sheet_cache.set(cache_key, rows_path)
+                        dimension = f'<dimension ref="A1:H{layout.last_row}"/>'
+                        sheet_rows[ws.path[1:]] = (rows_path, dimension.encode())
+
+                    self._assemble(package_path, sheet_rows, output_path)
+        finally:
+            self.wb.close()
+
+    def _submit_part_sheets(self, pool: Executor, tmp_dir: str) -> List[Tuple]:
+        """Add a placeholder for every part sheet and queue the rendering of its rows."""
+        pending = []
+        row_height = self.style_vars["parts_row_height"]
+        for i, (project_info, parts_data, summaries) in enumerate(self.data):
+            for part_name, df in parts_data.items():
+                ws = self.wb.create_sheet(title=f"{project_info.title} {part_name}")
+                ws.sheet_properties.tabColor = project_info.primary_color
+
+                layout = PartSheetLayout(
+                    df,
+                    f"{project_info.title} - {part_name}",
+                    summaries[part_name].total_hours,
+                    summaries[part_name].hours_per_week,
+                )
+                for col, key in PART_SHEET_WIDTHS.items():
+                    ws.column_dimensions[get_column_letter(col)].width = (
+                        self.style_vars[key]
+                    )
+                # Added as ranges only, merge_cells would create the covered cells
+                for min_row, min_col, max_row, max_col in layout.merges:
+                    ws.merged_cells.add(
+                        CellRange(
+                            min_row=min_row,
+                            min_col=min_col,
+                            max_row=max_row,
+                            max_col=max_col,
+                        )
+                    )
+
+                styles = self._styles(
+                    ws, project_info.primary_color, project_info.secondary_color
+                )
+                style_ids = styles.style_ids()
+
+                cache_key = None
+                if self.sheet_cache is not None:
+                    cache_key = self.sheet_cache.key_for(
+                        self.dataset_keys[i],
+                        f"{ws.title}/{layout.title}",
+                        style_ids,
+                        row_height,
+                    )
+                    cached_path = self.sheet_cache.get(cache_key)
+                    if cached_path is not None:
+                        pending.append((ws, layout, cached_path, None, cache_key))
+                        continue
+
+                rows_path = os.path.join(tmp_dir, f"rows{len(pending)}.xml")
+                future = pool.submit(
+                    _write_sheet_data, rows_path, layout, style_ids, row_height
+                )
+                pending.append((ws, layout, rows_path, future, cache_key))
+
+        if self.sheet_cache is not None:
+            reused = sum(1 for *_, future, _ in pending if future is None)
+            print(f"Reusing {reused} of {len(pending)} rendered part sheets")
+        return pending
+
+    @staticmethod
+    def _assemble(
+        package_path: str,
+        sheet_rows: Dict[str, Tuple[str, bytes]],
+        output_path: Union[str, IO[bytes]],
+    ) -> None:
+        """Copy the package to the output file with the rows in their placeholders."""
+        with zipfile.ZipFile(package_path) as package, zipfile.ZipFile(
+            output_path, "w", zipfile.ZIP_DEFLATED
+        ) as output:
+            for item in package.infolist():
+                content = package.read(item)
+                if item.filename not in sheet_rows:
+                    output.writestr(item, content)
+                    continue
+
+                rows_path, dimension = sheet_rows[item.filename]
+                content = DIMENSION_RE.sub(dimension, content, count=1)
+                head, tail = EMPTY_SHEET_DATA_RE.split(content, maxsplit=1)
+                with output.open(item.filename, "w", force_zip64=True) as sheet, open(
+                    rows_path, "rb"
+                ) as rows:
+                    sheet.write(head)
+                    shutil.copyfileobj(rows, sheet, 1024 * 1024)
+                    sheet.write(tail)
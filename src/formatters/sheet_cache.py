@@ -0,0 +1,71 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+import shutil
+import tempfile
+from typing import Dict, Iterable, Optional, Set
+
+# Bump when the worksheet XML the parallel engine writes changes
+SHEET_FORMAT_VERSION = 1
+
+
+class SheetCache:
+    """Rendered rows of part sheets, one XML file per sheet in a directory.
+
+    An entry is the <sheetData> element the parallel engine splices into a
+    part sheet. Its key covers the processed dataset, the sheet's title,
+    the cell format indices its cells refer to and the row height, so an
+    entry is only reused for a sheet that would render the same.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Keys read or written since the cache was opened
+        self.used: Set[str] = set()
+
+    @staticmethod
+    def key_for(
+        dataset_key: str,
+        title: str,
+        style_ids: Dict[str, int],
+        row_height: float,
+    ) -> str:
+        """Return the key of a part sheet of a processed dataset"""
+        parts = [SHEET_FORMAT_VERSION, dataset_key, title, style_ids, row_height]
+        return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.xml"
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the path of the cached rows, None on a miss"""
+        path = self._path(key)
+        if not path.exists():
+            return None
+        self.used.add(key)
+        return str(path)
+
+    def set(self, key: str, rows_path: str) -> None:
+        """Keep a copy of rendered rows"""
+        path = self._path(key)
+        # Copied to a uniquely named file next to the target and renamed, so
+        # concurrent writers never share a temp file and readers never see
+        # partial files
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as dst, open(rows_path, "rb") as src:
+                shutil.copyfileobj(src, dst)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        self.used.add(key)
+
+    def prune(self, keep: Iterable[str]) -> None:
+        """Remove every entry whose key is not kept"""
+        keep = set(keep)
+        for path in self.directory.glob("*.xml"):
+            if path.stem not in keep:
+                path.unlink(missing_ok=True)
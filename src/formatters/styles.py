@@ -0,0 +1,183 @@
+from copy import copy
+from typing import Dict, Optional, Tuple
+
+from openpyxl import Workbook
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.styles.borders import DEFAULT_BORDER
+from openpyxl.styles.fills import DEFAULT_EMPTY_FILL
+from openpyxl.styles.fonts import DEFAULT_FONT
+from openpyxl.worksheet.worksheet import Worksheet
+
+try:
+    from openpyxl.styles.cell_style import StyleArray
+except ImportError:
+    StyleArray = None
+
+
+def _has_style_internals() -> bool:
+    """Whether cells and workbooks keep their styles the way WorkbookStyles expects"""
+    if StyleArray is None:
+        return False
+    try:
+        wb = Workbook()
+        style_array = StyleArray()
+        style_array.numFmtId = 2
+        cell = wb.active["A1"]
+        cell._style = copy(style_array)
+        style_id = wb._cell_styles.add(style_array)
+        return cell.number_format == "0.00" and cell.style_id == style_id
+    except (AttributeError, TypeError):
+        return False
+
+
+# Private openpyxl internals, only used by WorkbookStyles: a cell's _style and
+# the workbook's _cell_styles list. Without them, styles are assigned through
+# the public cell attributes, which is slower but gives the same workbook
+STYLE_INTERNALS = _has_style_internals()
+
+
+class WorkbookStyles:
+    """The styles of one color scheme, registered in one workbook.
+
+    With openpyxl's style internals, a role is applied by copying its style
+    array into the cell, otherwise by assigning the font, fill, border,
+    alignment and number format one by one.
+    """
+
+    def __init__(
+        self,
+        wb: Workbook,
+        definitions: Dict[str, dict],
+        style_arrays: Optional[Dict[str, "StyleArray"]] = None,
+    ):
+        self._wb = wb
+        self._definitions = definitions
+        self._style_arrays = style_arrays
+
+    def apply(self, cell, role: str) -> None:
+        """Give the cell the registered style for the role."""
+        if self._style_arrays is not None:
+            cell._style = copy(self._style_arrays[role])
+            return
+        definition = self._definitions[role]
+        cell.font = definition["font"]
+        cell.fill = definition["fill"]
+        cell.border = definition["border"]
+        cell.alignment = definition.get("alignment", Alignment())
+        cell.number_format = definition["number_format"]
+
+    def style_ids(self) -> Dict[str, int]:
+        """Return the index of every role's cell format in the saved styles.xml.
+
+        For worksheet XML that is written outside of openpyxl, the cells
+        refer to their format by this index in their s attribute.
+        """
+        if self._style_arrays is not None:
+            return {
+                role: self._wb._cell_styles.add(style_array)
+                for role, style_array in self._style_arrays.items()
+            }
+        # Cells of a sheet that is never added to the workbook, one per role as
+        # the workbook keeps the style of the cell it is registered from
+        scratch_ws = Worksheet(self._wb)
+        style_ids = {}
+        for row, role in enumerate(self._definitions, 1):
+            cell = scratch_ws.cell(row=row, column=1)
+            self.apply(cell, role)
+            style_ids[role] = cell.style_id
+        return style_ids
+
+
+class StyleRegistry:
+    """Cell styles for reports, defined once per color scheme.
+
+    Roles cover the title, headers and the odd and even rows of data,
+    date, hours and count cells. The style definitions are cached per
+    color scheme and registered in every workbook that uses them, so one
+    registry can be shared across sheets and requests.
+    """
+
+    def __init__(self):
+        self._definitions: Dict[Tuple[str, str], Dict[str, dict]] = {}
+
+    def _build_definitions(self, primary: str, secondary: str) -> Dict[str, dict]:
+        thin = Side(style="thin")
+        thin_border = Border(left=thin, right=thin, top=thin, bottom=thin)
+        light_fill = PatternFill(
+            start_color=secondary, end_color=secondary, fill_type="solid"
+        )
+        header_fill = PatternFill(
+            start_color=primary, end_color=primary, fill_type="solid"
+        )
+        header_font = Font(bold=True, color="FFFFFF")
+        center = Alignment(horizontal="center", vertical="center")
+        center_wrap = Alignment(horizontal="center", vertical="center", wrap_text=True)
+
+        definitions = {
+            "title": dict(font=Font(size=14, bold=True), alignment=center),
+            "header": dict(font=header_font, fill=header_fill, alignment=center),
+            "header_wrap": dict(
+                font=header_font, fill=header_fill, alignment=center_wrap
+            ),
+        }
+
+        # Bordered cells, with the secondary color on even rows
+        variants = {
+            "data": (center_wrap, "General"),
+            "date": (center_wrap, "yyyy-mm-dd"),
+            "hours_wrap": (center_wrap, "0.0"),
+            "count_wrap": (center_wrap, "0"),
+            "cell": (center, "General"),
+            "hours": (center, "0.0"),
+            "count": (center, "0"),
+        }
+        for role, (alignment, number_format) in variants.items():
+            for parity, fill in [("odd", DEFAULT_EMPTY_FILL), ("even", light_fill)]:
+                definitions[f"{role}_{parity}"] = dict(
+                    fill=fill,
+                    border=thin_border,
+                    alignment=alignment,
+                    number_format=number_format,
+                )
+
+        # Anything not set falls back to the workbook defaults
+        return {
+            role: {
+                "font": DEFAULT_FONT,
+                "fill": DEFAULT_EMPTY_FILL,
+                "border": DEFAULT_BORDER,
+                "number_format": "General",
+                **definition,
+            }
+            for role, definition in definitions.items()
+        }
+
+    def definitions(self, primary: str, secondary: str) -> Dict[str, dict]:
+        """Return the style definitions of a color scheme, keyed by role"""
+        scheme = (primary, secondary)
+        if scheme not in self._definitions:
+            self._definitions[scheme] = self._build_definitions(primary, secondary)
+        return self._definitions[scheme]
+
+    def register(self, wb: Workbook, primary: str, secondary: str) -> WorkbookStyles:
+        """Register the scheme's styles in the workbook.
+
+        Each role becomes a single cell format. They are not added as named
+        styles, as openpyxl already writes equal formats once and a named
+        style record per role would only grow styles.xml.
+        """
+        definitions = self.definitions(primary, secondary)
+        if not STYLE_INTERNALS:
+            return WorkbookStyles(wb, definitions)
+
+        style_arrays = {}
+        for role, definition in definitions.items():
+            # Binding adds the font, fill, border and format to the workbook
+            style = NamedStyle(name=role, **definition)
+            style.bind(wb)
+            style_arrays[role] = copy(style.as_tuple())
+        return WorkbookStyles(wb, definitions, style_arrays)
+
+
+# Shared by every formatter, the definitions only depend on the colors
+STYLE_REGISTRY = StyleRegistry()
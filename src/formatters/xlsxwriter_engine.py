@@ -0,0 +1,246 @@
+import math
+from typing import IO, Dict, Tuple, Union
+
+from openpyxl.utils import column_index_from_string
+from pandas import DataFrame
+import xlsxwriter
+from xlsxwriter.format import Format
+
+from src.formatters.engine import (
+    PART_SHEET_WIDTHS,
+    ExcelEngine,
+    PartSheetLayout,
+    ReportData,
+)
+from src.formatters.openpyxl_engine import OpenpyxlEngine
+from src.formatters.styles import STYLE_REGISTRY, StyleRegistry
+from src.metrics import timed
+
+
+def _format_properties(font, fill, border, alignment, number_format) -> dict:
+    """Translate openpyxl style objects into xlsxwriter format properties."""
+    properties = {}
+    if font.b:
+        properties["bold"] = True
+    if font.sz and font.sz != 11:
+        properties["font_size"] = font.sz
+    if font.color is not None and font.color.type == "rgb":
+        properties["font_color"] = f"#{font.color.rgb[-6:]}"
+    if fill.fill_type == "solid":
+        properties["pattern"] = 1
+        properties["bg_color"] = f"#{fill.fgColor.rgb[-6:]}"
+    if border.left is not None and border.left.style == "thin":
+        properties["border"] = 1
+    if alignment.horizontal:
+        properties["align"] = alignment.horizontal
+    if alignment.vertical == "center":
+        properties["valign"] = "vcenter"
+    if alignment.wrap_text:
+        properties["text_wrap"] = True
+    if number_format and number_format != "General":
+        properties["num_format"] = number_format
+    return properties
+
+
+class XlsxWriterEngine(ExcelEngine):
+    """Builds the report with xlsxwriter in constant_memory mode.
+
+    Rows are flushed to disk as soon as the next row is started, so every
+    sheet is written strictly row by row, like the openpyxl write-only mode.
+    Styles come from the same registry as the openpyxl engine.
+    """
+
+    name = "xlsxwriter"
+
+    def __init__(
+        self,
+        data: ReportData,
+        style_vars: Dict[str, int],
+        total_sheet_first: bool = True,
+        style_registry: StyleRegistry = STYLE_REGISTRY,
+    ):
+        super().__init__(data, style_vars, total_sheet_first)
+        self.style_registry = style_registry
+        self.wb = None
+        self._formats: Dict[Tuple[str, str], Dict[str, Format]] = {}
+
+    def render(self, output_path: Union[str, IO[bytes]]) -> None:
+        """Build every sheet and save the workbook."""
+        # openpyxl neither turns strings into hyperlinks nor writes NaN values
+        self.wb = xlsxwriter.Workbook(
+            output_path, {"constant_memory": True, "strings_to_urls": False}
+        )
+        try:
+            if self.total_sheet_first:
+                with timed("total_sheet"):
+                    self._write_total_sheet()
+                self._write_part_sheets()
+            else:
+                self._write_part_sheets()
+                with timed("total_sheet"):
+                    self._write_total_sheet()
+
+            print("Saving the workbook...")
+            # Closing writes the package
+            with timed("save"):
+                self.wb.close()
+        finally:
+            if not self.wb.fileclosed:
+                self.wb.close()
+
+    def _styles(self, primary_color: str, secondary_color: str) -> Dict[str, Format]:
+        """Return the scheme's registered styles as xlsxwriter formats, by role."""
+        scheme = (primary_color, secondary_color)
+        if scheme not in self._formats:
+            definitions = self.style_registry.definitions(*scheme)
+            self._formats[scheme] = {
+                role: self.wb.add_format(
+                    _format_properties(
+                        definition["font"],
+                        definition["fill"],
+                        definition["border"],
+                        definition["alignment"],
+                        definition["number_format"],
+                    )
+                )
+                for role, definition in definitions.items()
+            }
+        return self._formats[scheme]
+
+    @staticmethod
+    def _write(ws, row: int, col: int, value, cell_format: Format) -> None:
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            ws.write_blank(row, col, None, cell_format)
+        else:
+            ws.write(row, col, value, cell_format)
+
+    def _write_total_sheet(self) -> None:
+        """Write the total summary sheet.
+
+        The grid is small and projects share rows, so it is laid out in a
+        scratch openpyxl sheet with the openpyxl engine and copied over row
+        by row, with the styles translated to xlsxwriter formats.
+        """
+        scratch = OpenpyxlEngine(
+            self.data, self.style_vars, style_registry=self.style_registry
+        )
+        scratch_ws = scratch.wb.active
+        scratch._build_total_sheet(scratch_ws)
+
+        ws = self.wb.add_worksheet("Total")
+        ws.set_tab_color(f"#{scratch_ws.sheet_properties.tabColor.rgb[-6:]}")
+        if not scratch_ws.sheet_view.showGridLines:
+            ws.hide_gridlines(2)
+        for letter, dimension in scratch_ws.column_dimensions.items():
+            if dimension.width:
+                col = column_index_from_string(letter) - 1
+                ws.set_column(col, col, dimension.width)
+
+        merges = {
+            (merged.min_row, merged.min_col): merged
+            for merged in scratch_ws.merged_cells.ranges
+        }
+        formats = {}
+
+        def cell_format(cell) -> Format:
+            key = cell.style_id
+            if key not in formats:
+                formats[key] = self.wb.add_format(
+                    _format_properties(
+                        cell.font,
+                        cell.fill,
+                        cell.border,
+                        cell.alignment,
+                        cell.number_format,
+                    )
+                )
+            return formats[key]
+
+        for row_idx in range(1, scratch_ws.max_row + 1):
+            height = scratch_ws.row_dimensions[row_idx].height
+            if height is not None:
+                ws.set_row(row_idx - 1, height)
+
+            for cell in scratch_ws[row_idx]:
+                if cell.coordinate in scratch_ws.merged_cells and (
+                    (cell.row, cell.column) not in merges
+                ):
+                    continue  # Covered by the merge of its range
+                if cell.value is None and not cell.has_style:
+                    continue
+
+                merged = merges.get((cell.row, cell.column))
+                if merged:
+                    ws.merge_range(
+                        merged.min_row - 1,
+                        merged.min_col - 1,
+                        merged.max_row - 1,
+                        merged.max_col - 1,
+                        cell.value,
+                        cell_format(cell),
+                    )
+                else:
+                    self._write(
+                        ws, cell.row - 1, cell.column - 1, cell.value, cell_format(cell)
+                    )
+
+        scratch.wb.close()
+
+    def _write_part_sheets(self) -> None:
+        """Write individual sheets for each project's parts."""
+        for project_info, parts_data, summaries in self.data:
+            for part_name, df in parts_data.items():
+                ws = self.wb.add_worksheet(f"{project_info.title} {part_name}")
+                ws.set_tab_color(f"#{project_info.primary_color}")
+
+                with timed("part_sheet", rows=len(df)):
+                    self._write_part_sheet(
+                        ws=ws,
+                        df=df,
+                        title=f"{project_info.title} - {part_name}",
+                        styles=self._styles(
+                            project_info.primary_color, project_info.secondary_color
+                        ),
+                        total_hours=summaries[part_name].total_hours,
+                        hours_per_week=summaries[part_name].hours_per_week,
+                    )
+
+    def _write_part_sheet(
+        self,
+        ws,
+        df: DataFrame,
+        title: str,
+        styles: Dict[str, Format],
+        total_hours: float,
+        hours_per_week: DataFrame,
+    ) -> None:
+        """Write a part sheet row by row with the layout of the openpyxl engine.
+
+        xlsxwriter rows and columns are zero-based, the layout's one-based.
+        """
+        layout = PartSheetLayout(df, title, total_hours, hours_per_week)
+
+        for col, key in PART_SHEET_WIDTHS.items():
+            ws.set_column(col - 1, col - 1, self.style_vars[key])
+        merges = {
+            (min_row, min_col): (max_row, max_col)
+            for min_row, min_col, max_row, max_col in layout.merges
+        }
+
+        row_height = self.style_vars["parts_row_height"]
+        for row, cells in layout.rows():
+            if layout.sized_row(row):
+                ws.set_row(row - 1, row_height)
+            for col, value, role in cells:
+                merged = merges.get((row, col))
+                if merged:
+                    ws.merge_range(
+                        row - 1,
+                        col - 1,
+                        merged[0] - 1,
+                        merged[1] - 1,
+                        value,
+                        styles[role],
+                    )
+                else:
+                    self._write(ws, row - 1, col - 1, value, styles[role])
@@ -0,0 +1,125 @@
+import json
+import os
+from pathlib import Path
+import tempfile
+from typing import Dict, Optional, Set
+
+from src.data_processing.cache import (
+    CsvSource,
+    DiskCacheBackend,
+    ProcessedDataCache,
+    hash_file,
+)
+from src.formatters.sheet_cache import SheetCache
+from src.types.project_config import ProjectConfig
+
+# Bump when the manifest layout changes, older manifests are then ignored
+MANIFEST_VERSION = 1
+
+
+def file_record(path: CsvSource, recorded: Optional[dict] = None) -> dict:
+    """Size, modification time and content hash of a file.
+
+    The recorded hash is kept when the size and modification time still
+    match the recorded ones, so unchanged files are not read.
+    """
+    stat = os.stat(path)
+    if (
+        recorded
+        and recorded["size"] == stat.st_size
+        and recorded["mtime_ns"] == stat.st_mtime_ns
+    ):
+        content_digest = recorded["sha256"]
+    else:
+        content_digest = hash_file(path)
+    return {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": content_digest,
+    }
+
+
+class ManifestDataCache(ProcessedDataCache):
+    """Processed data cache whose file hashes come from the manifest.
+
+    A file whose size and modification time match the manifest keeps its
+    recorded hash, so unchanged files are not read at all.
+    """
+
+    def __init__(self, backend: DiskCacheBackend, store: "IncrementalStore"):
+        super().__init__(backend)
+        self.store = store
+        # Keys looked up since the cache was opened
+        self.used: Set[str] = set()
+
+    def key_for(self, source: CsvSource, project_config: ProjectConfig) -> str:
+        if isinstance(source, (str, os.PathLike)):
+            key = self.key_for_digest(self.store.digest(source), project_config)
+        else:
+            key = super().key_for(source, project_config)
+        self.used.add(key)
+        return key
+
+
+class IncrementalStore:
+    """What a report was built from, kept in a folder next to the report.
+
+    The manifest records the size, modification time and content hash of
+    every CSV file, the processed datasets are kept per file content and
+    config, and the rendered rows of every part sheet are kept per
+    dataset. On the next run only new and changed files are processed and
+    only their sheets rendered. Entries the report no longer uses are
+    removed when the manifest is saved.
+    """
+
+    def __init__(self, output_path: Path):
+        output_path = Path(output_path)
+        self.directory = output_path.with_name(f".{output_path.name}.cache")
+        self.manifest_path = self.directory / "manifest.json"
+        self._recorded = self._load_manifest()
+        self._files: Dict[str, dict] = {}
+
+        self.data_cache = ManifestDataCache(
+            DiskCacheBackend(self.directory / "processed"), self
+        )
+        self.sheet_cache = SheetCache(self.directory / "sheets")
+
+    def _load_manifest(self) -> Dict[str, dict]:
+        try:
+            manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if manifest.get("version") != MANIFEST_VERSION:
+            return {}
+        return manifest.get("files", {})
+
+    def digest(self, path: CsvSource) -> str:
+        """Content hash of a file, hashed again only if it changed"""
+        path = os.path.abspath(path)
+        if path in self._files:
+            return self._files[path]["sha256"]
+
+        self._files[path] = file_record(path, self._recorded.get(path))
+        return self._files[path]["sha256"]
+
+    def save(self) -> None:
+        """Record this run's files and drop the entries it did not use"""
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "files": self._files,
+            "datasets": sorted(self.data_cache.used),
+            "sheets": sorted(self.sheet_cache.used),
+        }
+        # Written to a uniquely named file and renamed, so concurrent runs
+        # never share a temp file and readers never see a partial manifest
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(json.dumps(manifest, indent=2))
+            os.replace(tmp_name, self.manifest_path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+        self.data_cache.backend.prune(self.data_cache.used)
+        self.sheet_cache.prune(self.sheet_cache.used)
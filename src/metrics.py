@@ -0,0 +1,129 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+import logging
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Stage timings are also logged here as key=value fields, with the same
+# fields attached to the record as "fields" for structured handlers
+logger = logging.getLogger("report.pipeline")
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+ROW_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+BYTE_BUCKETS = (10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+
+
+class Histogram:
+    """Cumulative histogram per stage, rendered in the Prometheus text format."""
+
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # Per stage: count per bucket (the last one is +Inf), sum and count
+        self._stages: Dict[str, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, stage: str, value: float) -> None:
+        with self._lock:
+            if stage not in self._stages:
+                self._stages[stage] = ([0] * (len(self.buckets) + 1), [0.0, 0])
+            counts, totals = self._stages[stage]
+            counts[bisect_left(self.buckets, value)] += 1
+            totals[0] += value
+            totals[1] += 1
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            stages = {
+                stage: (list(counts), list(totals))
+                for stage, (counts, totals) in self._stages.items()
+            }
+        for stage, (counts, (total, count)) in sorted(stages.items()):
+            cumulative = 0
+            for bound, bucket_count in zip([*self.buckets, "+Inf"], counts):
+                cumulative += bucket_count
+                lines.append(
+                    f'{self.name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}'
+                )
+            lines.append(f'{self.name}_sum{{stage="{stage}"}} {total}')
+            lines.append(f'{self.name}_count{{stage="{stage}"}} {count}')
+        return lines
+
+
+STAGE_SECONDS = Histogram(
+    "report_stage_duration_seconds",
+    "Duration of report pipeline stages",
+    DURATION_BUCKETS,
+)
+STAGE_ROWS = Histogram(
+    "report_stage_rows", "Rows handled by report pipeline stages", ROW_BUCKETS
+)
+STAGE_BYTES = Histogram(
+    "report_stage_bytes",
+    "Bytes read or written by report pipeline stages",
+    BYTE_BUCKETS,
+)
+HISTOGRAMS = [STAGE_SECONDS, STAGE_ROWS, STAGE_BYTES]
+
+
+def record(
+    stage: str, seconds: float, rows: Optional[int] = None, size: Optional[int] = None
+) -> None:
+    """Record one run of a pipeline stage and log it"""
+    STAGE_SECONDS.observe(stage, seconds)
+    if rows is not None:
+        STAGE_ROWS.observe(stage, rows)
+    if size is not None:
+        STAGE_BYTES.observe(stage, size)
+
+    fields = {"stage": stage, "duration_ms": round(seconds * 1000, 1)}
+    if rows is not None:
+        fields["rows"] = rows
+    if size is not None:
+        fields["bytes"] = size
+    logger.info(
+        " ".join(f"{key}={value}" for key, value in fields.items()),
+        extra={"fields": fields},
+    )
+
+
+@contextmanager
+def timed(stage: str, rows: Optional[int] = None) -> Iterator[dict]:
+    """Time the block as a pipeline stage.
+
+    The block can fill in "rows" and "bytes" of the yielded dict once they
+    are known. Nothing is recorded when the block raises.
+    """
+    counts = {"rows": rows, "bytes": None}
+    start = time.perf_counter()
+    yield counts
+    record(stage, time.perf_counter() - start, counts["rows"], counts["bytes"])
+
+
+def render_values(
+    prefix: str, values: Dict[str, float], counters: Iterable[str] = ()
+) -> List[str]:
+    """Render plain values as Prometheus gauges, or counters when listed"""
+    lines = []
+    for key, value in sorted(values.items()):
+        if key in counters:
+            name = f"{prefix}_{key}_total"
+            lines += [f"# TYPE {name} counter", f"{name} {value}"]
+        else:
+            name = f"{prefix}_{key}"
+            lines += [f"# TYPE {name} gauge", f"{name} {value}"]
+    return lines
+
+
+def render_histograms() -> List[str]:
+    """Every pipeline histogram in the Prometheus text format"""
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines += histogram.render()
+    return lines
@@ -1,9 +1,18 @@
 from datetime import date
 from typing import Dict, List
+from pandas import Series
+from src.types.keyword_classifier import KeywordClass, KeywordClassifier
 from src.types.project_config import ProjectConfig, ProjectPart
 
 
 class ITP2Config(ProjectConfig):
+    keywords = KeywordClassifier(
+        [
+            KeywordClass("report", ("report",)),
+            KeywordClass("self accessment", ("self accessment",)),
+            KeywordClass("video", ("video",)),
+        ]
+    )
 
     @property
     def display_name(self) -> str:
@@ -77,24 +86,12 @@ class ITP2Config(ProjectConfig):
         }
 
     def label_session(self, session_date: date, description: str) -> str:
-        parts = self.get_project_parts()
-        is_report = "report" in description.lower()
-        is_video = "video" in description.lower()
-        is_self_accessment = "self accessment" in description.lower()
-
-        matching_parts = []
-        for part in parts:
-            # Skip empty parts or parts without dates
-            if (
-                not part.name
-                or not hasattr(part, "start_date")
-                or not hasattr(part, "end_date")
-            ):
-                continue
-
-            # Check if date falls within range
-            if part.start_date <= session_date <= part.end_date:
-                matching_parts.append(part)
+        classes = self.keywords.classify(description)
+        is_report = classes & self.keywords.bits["report"]
+        is_video = classes & self.keywords.bits["video"]
+        is_self_accessment = classes & self.keywords.bits["self accessment"]
+
+        matching_parts = self.part_index.lookup(session_date)
 
         # If no matching parts found
         if not matching_parts:
@@ -120,3 +117,22 @@ class ITP2Config(ProjectConfig):
 
         # Fallback to first matching part if none of the above conditions met
         return matching_parts[0].name
+
+    def label_sessions(self, dates: Series, descriptions: Series) -> Series:
+        classes = self.keywords.classify_column(descriptions)
+        codes = self.part_index.segment_codes(dates)
+        labels = Series(self.part_index.first_match(codes), index=dates.index)
+
+        # Apply keyword overrides from lowest to highest priority
+        for keyword in ["video", "self accessment", "report"]:
+            has_keyword = self.keywords.has(classes, keyword)
+            keyword_part = Series(
+                self.part_index.first_match(
+                    codes, lambda p, keyword=keyword: keyword in p.name.lower()
+                ),
+                index=dates.index,
+            )
+            use_keyword = has_keyword & keyword_part.notna()
+            labels = labels.where(~use_keyword, keyword_part)
+
+        return labels.fillna("Unknown")
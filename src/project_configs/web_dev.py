@@ -1,9 +1,15 @@
 from datetime import date
 from typing import Dict, List
+from pandas import Series
+from src.types.keyword_classifier import KeywordClass, KeywordClassifier
 from src.types.project_config import ProjectConfig, ProjectPart
 
 
 class WebDevConfig(ProjectConfig):
+    keywords = KeywordClassifier(
+        [KeywordClass("peer review", ("peer review",), match="prefix")]
+    )
+
     @property
     def display_name(self) -> str:
         return "IT2810 WebDev"
@@ -58,22 +64,8 @@ class WebDevConfig(ProjectConfig):
         }
 
     def label_session(self, session_date: date, description: str) -> str:
-        parts = self.get_project_parts()
-        is_peer_review = description.lower().startswith("peer review")
-
-        matching_parts = []
-        for part in parts:
-            # Skip empty parts or parts without dates
-            if (
-                not part.name
-                or not hasattr(part, "start_date")
-                or not hasattr(part, "end_date")
-            ):
-                continue
-
-            # Check if date falls within range
-            if part.start_date <= session_date <= part.end_date:
-                matching_parts.append(part)
+        is_peer_review = self.keywords.classify(description) != 0
+        matching_parts = self.part_index.lookup(session_date)
 
         # If no matching parts found
         if not matching_parts:
@@ -92,3 +84,25 @@ class WebDevConfig(ProjectConfig):
 
         # Fallback to first matching part if none of the above conditions met
         return matching_parts[0].name
+
+    def label_sessions(self, dates: Series, descriptions: Series) -> Series:
+        is_peer_review = self.keywords.has(
+            self.keywords.classify_column(descriptions), "peer review"
+        )
+        codes = self.part_index.segment_codes(dates)
+
+        # First matching part of each kind, mirroring label_session
+        first_any = Series(self.part_index.first_match(codes), index=dates.index)
+        first_peer_review = Series(
+            self.part_index.first_match(codes, lambda p: "Peer Review" in p.name),
+            index=dates.index,
+        )
+        first_regular = Series(
+            self.part_index.first_match(codes, lambda p: "Peer Review" not in p.name),
+            index=dates.index,
+        )
+
+        labels = first_any.where(first_regular.isna(), first_regular)
+        use_peer_review = is_peer_review & first_peer_review.notna()
+        labels = labels.where(~use_peer_review, first_peer_review)
+        return labels.fillna("Unknown")
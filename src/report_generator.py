@@ -1,9 +1,13 @@
+import io
 from pathlib import Path
-from openpyxl import Workbook
 import os
+from typing import IO, Iterable, List, Tuple, Union
 
+from src.data_processing.cache import CsvSource, ProcessedDataCache
+from src.data_processing.parallel import process_files
 from src.data_processing.processor import DataProcessor
 from src.formatters.excel_formatter import ExcelFormatter
+from src.incremental import IncrementalStore
 from src.types.dataclasses import ProjectInfo
 from src.types.project_config import ProjectConfig
 
@@ -15,10 +19,36 @@ class ReportGenerator:
         total_sheet_first: bool = True,
         close_open_excel: bool = True,
         data_dir: Path = None,
+        chunk_size: int = None,
+        cache: ProcessedDataCache = None,
+        workers: int = None,
+        write_only: bool = False,
+        engine: str = None,
+        render_workers: int = None,
+        files: Iterable[Union[IO[bytes], Tuple[str, bytes]]] = None,
+        incremental: bool = False,
     ):
         self.config = config
         self.total_sheet_first = total_sheet_first
         self.close_open_excel = close_open_excel
+        self.chunk_size = chunk_size
+        self.cache = cache
+        # Worker processes for per-file processing, None or 1 runs serially
+        self.workers = workers
+        # Stream sheets with openpyxl's write-only mode to keep memory flat
+        self.write_only = write_only
+        # Library that renders the workbook, "openpyxl", "xlsxwriter" or
+        # "parallel". None uses openpyxl, or the parallel engine when incremental
+        self.engine = engine
+        # Worker processes of the parallel engine, None uses every core
+        self.render_workers = render_workers
+
+        # In-memory CSV files, as file objects or (name, bytes) pairs, read
+        # instead of the data directory
+        self.files = files
+        # Keep processed files and rendered sheets next to the report, and
+        # only process and render what changed since the last run
+        self.incremental = incremental
 
         # Use provided paths or defaults
         self._script_dir = Path(__file__).parent.parent
@@ -49,22 +79,44 @@ class ReportGenerator:
             counter += 1
         return f"{base_title} ({counter})"
 
-    def _process_csv_files(self) -> list:
-        """Process all CSV files in the data directory"""
-        processor = DataProcessor(self.config)
-        csv_files = [f for f in os.listdir(self._data_dir) if f.endswith(".csv")]
+    def _csv_sources(self) -> List[Tuple[str, CsvSource]]:
+        """Return the file name and source of every CSV file to process"""
+        if self.files is None:
+            return [
+                (csv_file, os.path.join(self._data_dir, csv_file))
+                for csv_file in os.listdir(self._data_dir)
+                if csv_file.endswith(".csv")
+            ]
+
+        sources = []
+        for file in self.files:
+            if isinstance(file, tuple):
+                name, content = file
+                sources.append((name, io.BytesIO(content)))
+            else:
+                name = Path(str(getattr(file, "name", "dataset.csv"))).name
+                sources.append((name, file))
+        return sources
+
+    def _process_csv_files(
+        self, csv_sources: List[Tuple[str, CsvSource]], cache: ProcessedDataCache = None
+    ) -> list:
+        """Process the given CSV files, in memory or in the data directory"""
+        processor = DataProcessor(
+            self.config, chunk_size=self.chunk_size, cache=cache or self.cache
+        )
 
         datasets_info = []
         existing_titles = []
 
-        for i, csv_file in enumerate(csv_files):
+        for i, (csv_file, source) in enumerate(csv_sources):
             color_scheme = self.COLOR_SCHEMES[i % len(self.COLOR_SCHEMES)]
             title = self._get_title_from_filename(csv_file, existing_titles)
             existing_titles.append(title)
 
             datasets_info.append(
                 {
-                    "csv_path": os.path.join(self._data_dir, csv_file),
+                    "source": source,
                     "info": ProjectInfo(
                         title=title,
                         primary_color=color_scheme[0],
@@ -73,30 +125,57 @@ class ReportGenerator:
                 }
             )
 
+        sources = [dataset["source"] for dataset in datasets_info]
+        if self.workers and self.workers > 1 and len(sources) > 1:
+            results = process_files(processor, sources, self.workers)
+        else:
+            results = [processor.get_processed_data(source) for source in sources]
+
         processed_data = []
-        for dataset in datasets_info:
-            group_dfs, group_summaries = processor.get_processed_data(
-                dataset["csv_path"]
-            )
+        for dataset, (group_dfs, group_summaries) in zip(datasets_info, results):
             processed_data.append((dataset["info"], group_dfs, group_summaries))
 
         return processed_data
 
-    def generate(self, output_path: str) -> None:
-        """Generate the Excel report at the specified path"""
-        processed_data = self._process_csv_files()
-
-        wb = None
-        try:
-            wb = Workbook()
-            formatter = ExcelFormatter(
-                wb=wb,
-                data=processed_data,
-                output_path=str(output_path),
-                total_sheet_first=self.total_sheet_first,
-                close_open_excel=self.close_open_excel,
-            )
-            formatter.format()
-        finally:
-            if wb:
-                wb.close()
+    def generate(self, output: Union[str, IO[bytes]]) -> None:
+        """Generate the Excel report at the specified path or into a binary buffer"""
+        # Listed once, so the datasets and their keys come from the same files
+        csv_sources = self._csv_sources()
+        if not self.incremental:
+            processed_data = self._process_csv_files(csv_sources)
+            self._format(processed_data, output, self.engine or "openpyxl")
+            return
+
+        if hasattr(output, "write"):
+            raise ValueError("Incremental generation needs an output path")
+        if self.engine not in (None, "parallel"):
+            raise ValueError("Incremental generation needs the parallel engine")
+
+        store = IncrementalStore(Path(output))
+        processed_data = self._process_csv_files(csv_sources, cache=store.data_cache)
+        dataset_keys = [
+            store.data_cache.key_for(source, self.config) for _, source in csv_sources
+        ]
+        self._format(
+            processed_data,
+            output,
+            "parallel",
+            sheet_cache=store.sheet_cache,
+            dataset_keys=dataset_keys,
+        )
+        store.save()
+
+    def _format(
+        self, processed_data: list, output: Union[str, IO[bytes]], engine: str, **kwargs
+    ) -> None:
+        formatter = ExcelFormatter(
+            data=processed_data,
+            output_path=output if hasattr(output, "write") else str(output),
+            total_sheet_first=self.total_sheet_first,
+            close_open_excel=self.close_open_excel,
+            engine=engine,
+            write_only=self.write_only,
+            render_workers=self.render_workers,
+            **kwargs,
+        )
+        formatter.format()
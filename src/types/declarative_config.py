@@ -0,0 +1,184 @@
+from dataclasses import dataclass
+from datetime import date
+from functools import cached_property
+import hashlib
+import json
+from typing import Dict, List, Tuple
+
+import numpy as np
+from pandas import Series
+
+from src.types.dataclasses import ProjectPart
+from src.types.keyword_classifier import MATCH_MODES, KeywordClass, KeywordClassifier
+from src.types.project_config import ProjectConfig
+
+# Every combination of keyword rules gets a column in the decision table
+MAX_KEYWORD_RULES = 12
+
+
+@dataclass(frozen=True)
+class KeywordRule:
+    """Sends sessions to the first of its parts that covers their date.
+
+    A rule applies to sessions whose lowercase description contains, or
+    starts with, one of its keywords. A rule without keywords applies to
+    every session. Rules are tried from the highest priority down.
+    """
+
+    name: str
+    parts: Tuple[str, ...]
+    keywords: Tuple[str, ...] = ()
+    match: str = "contains"
+    priority: int = 0
+
+
+def _parse_date(value, field: str) -> date:
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value))
+    except ValueError:
+        raise ValueError(f"Invalid date for {field}: {value!r}") from None
+
+
+class DeclarativeConfig(ProjectConfig):
+    """A project config compiled from a declarative spec.
+
+    The spec is a dict, as loaded from JSON, YAML or the config store:
+
+        display_name: IT2810 WebDev
+        description: <p>...</p>
+        parts:
+          - {name: P1 Part 1, start: 2024-08-01, end: 2024-09-20}
+        rules:
+          - {name: peer review, keywords: [peer review], match: prefix,
+             parts: [Peer Review P1 Part 1], priority: 1}
+        groupings:
+          Project 1: [P1 Part 1]
+
+    Sessions that no rule places go to the first part covering their date,
+    and sessions outside every part are "Unknown". On compile, every date
+    segment of the part index and every combination of keyword rules is
+    resolved into a decision table, so labeling is a table lookup.
+    """
+
+    def __init__(self, spec: dict):
+        self.spec = spec
+        for field in ("display_name", "parts"):
+            if field not in spec:
+                raise ValueError(f"Config spec is missing {field!r}")
+
+        self._parts = [
+            ProjectPart(
+                part["name"],
+                _parse_date(part["start"], f"{part['name']} start"),
+                _parse_date(part["end"], f"{part['name']} end"),
+            )
+            for part in spec["parts"]
+        ]
+        part_names = {part.name for part in self._parts}
+        self._groupings = {
+            group: list(parts) for group, parts in spec.get("groupings", {}).items()
+        }
+        self.rules = self._parse_rules(spec.get("rules", []), part_names)
+        super().__init__()
+        self._compile()
+
+    @staticmethod
+    def _parse_rules(rule_specs: List[dict], part_names: set) -> List[KeywordRule]:
+        rules = []
+        for i, rule_spec in enumerate(rule_specs):
+            rule = KeywordRule(
+                name=rule_spec.get("name", f"rule {i + 1}"),
+                parts=tuple(rule_spec["parts"]),
+                keywords=tuple(
+                    keyword.lower() for keyword in rule_spec.get("keywords", [])
+                ),
+                match=rule_spec.get("match", "contains"),
+                priority=int(rule_spec.get("priority", 0)),
+            )
+            if rule.match not in MATCH_MODES:
+                raise ValueError(f"Rule {rule.name!r} has unknown match {rule.match!r}")
+            unknown = set(rule.parts) - part_names
+            if unknown:
+                raise ValueError(
+                    f"Rule {rule.name!r} targets unknown parts {sorted(unknown)}"
+                )
+            rules.append(rule)
+
+        # Highest priority first, declaration order among equals
+        return sorted(rules, key=lambda rule: -rule.priority)
+
+    def _compile(self) -> None:
+        """Resolve every date segment and keyword combination into a label"""
+        self.keyword_rules = [rule for rule in self.rules if rule.keywords]
+        if len(self.keyword_rules) > MAX_KEYWORD_RULES:
+            raise ValueError(
+                f"At most {MAX_KEYWORD_RULES} rules with keywords are supported"
+            )
+        # Rule i of keyword_rules sets bit i of the class codes
+        self.keywords = KeywordClassifier(
+            [
+                KeywordClass(rule.name, rule.keywords, rule.match)
+                for rule in self.keyword_rules
+            ]
+        )
+
+        self.labels = ["Unknown"] + sorted({part.name for part in self._parts})
+        label_codes = {label: code for code, label in enumerate(self.labels)}
+
+        table = np.zeros(
+            (len(self.part_index.candidates), 1 << len(self.keyword_rules)),
+            dtype=np.int16,
+        )
+        for segment, candidates in enumerate(self.part_index.candidates):
+            for mask in range(table.shape[1]):
+                label = candidates[0].name if candidates else "Unknown"
+                for rule in self.rules:
+                    if rule.keywords and not mask & self.keywords.bits[rule.name]:
+                        continue
+                    target = next(
+                        (part.name for part in candidates if part.name in rule.parts),
+                        None,
+                    )
+                    if target is not None:
+                        label = target
+                        break
+                table[segment, mask] = label_codes[label]
+
+        table.setflags(write=False)
+        self.decision_table = table
+        self._label_array = np.array(self.labels, dtype=object)
+
+    @property
+    def display_name(self) -> str:
+        return self.spec["display_name"]
+
+    @property
+    def description(self) -> str:
+        return self.spec.get("description", "")
+
+    @cached_property
+    def version(self) -> str:
+        """Digest of the whole spec, rules included"""
+        canonical = json.dumps(self.spec, sort_keys=True, default=str)
+        return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+    def get_project_parts(self) -> List[ProjectPart]:
+        return list(self._parts)
+
+    def get_groupings(self) -> Dict[str, List[str]]:
+        return {group: list(parts) for group, parts in self._groupings.items()}
+
+    def label_session(self, session_date: date, description: str) -> str:
+        segment = self.part_index.segment_code(session_date)
+        return self.labels[
+            self.decision_table[segment, self.keywords.classify(description)]
+        ]
+
+    def label_sessions(self, dates: Series, descriptions: Series) -> Series:
+        codes = self.decision_table[
+            self.part_index.segment_codes(dates),
+            self.keywords.classify_column(descriptions),
+        ]
+        return Series(self._label_array[codes], index=dates.index)
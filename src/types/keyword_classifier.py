@@ -0,0 +1,114 @@
+from dataclasses import dataclass
+import re
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+from pandas import Series
+
+MATCH_MODES = ("contains", "prefix")
+
+
+@dataclass(frozen=True)
+class KeywordClass:
+    """A named set of keywords, matched against lowercase descriptions.
+
+    With match "contains" a description is in the class when it contains
+    one of the keywords, with "prefix" when it starts with one.
+    """
+
+    name: str
+    keywords: Tuple[str, ...]
+    match: str = "contains"
+
+
+class KeywordClassifier:
+    """Sorts descriptions into keyword classes in a single pass.
+
+    Class i sets bit i of a description's class code. All keywords are
+    compiled into one alternation, longest first, that is tried at every
+    position of the lowercase description. Where keywords overlap, only the
+    longest one starting at a position is found, so each keyword also marks
+    the classes of every keyword it contains, and at the start of the
+    description the classes of every prefix keyword it starts with.
+    """
+
+    def __init__(self, classes: Sequence[KeywordClass]):
+        self.classes = tuple(
+            KeywordClass(
+                keyword_class.name,
+                tuple(keyword.lower() for keyword in keyword_class.keywords),
+                keyword_class.match,
+            )
+            for keyword_class in classes
+        )
+        self.bits: Dict[str, int] = {}
+        for i, keyword_class in enumerate(self.classes):
+            if keyword_class.match not in MATCH_MODES:
+                raise ValueError(
+                    f"Keyword class {keyword_class.name!r} has unknown match "
+                    f"{keyword_class.match!r}"
+                )
+            if not keyword_class.keywords or not all(keyword_class.keywords):
+                raise ValueError(
+                    f"Keyword class {keyword_class.name!r} has an empty keyword"
+                )
+            if keyword_class.name in self.bits:
+                raise ValueError(f"Duplicate keyword class {keyword_class.name!r}")
+            self.bits[keyword_class.name] = 1 << i
+
+        keywords = sorted(
+            {
+                keyword
+                for keyword_class in self.classes
+                for keyword in keyword_class.keywords
+            },
+            key=lambda keyword: (-len(keyword), keyword),
+        )
+        # Classes marked by a keyword found anywhere, and found at the start
+        self._contains_codes: Dict[str, int] = {}
+        self._prefix_codes: Dict[str, int] = {}
+        for found in keywords:
+            contains_code = prefix_code = 0
+            for i, keyword_class in enumerate(self.classes):
+                for keyword in keyword_class.keywords:
+                    if keyword_class.match == "contains" and keyword in found:
+                        contains_code |= 1 << i
+                    elif keyword_class.match == "prefix" and found.startswith(keyword):
+                        prefix_code |= 1 << i
+            self._contains_codes[found] = contains_code
+            self._prefix_codes[found] = prefix_code | contains_code
+
+        # Capturing inside a lookahead finds overlapping keywords too
+        alternation = "|".join(re.escape(keyword) for keyword in keywords)
+        self._pattern = re.compile(f"(?=({alternation}))") if keywords else None
+
+    def classify(self, description: str) -> int:
+        """Return the class code of a single description"""
+        if self._pattern is None or not isinstance(description, str):
+            return 0
+        code = 0
+        for found in self._pattern.finditer(description.lower()):
+            if found.start() == 0:
+                code |= self._prefix_codes[found.group(1)]
+            else:
+                code |= self._contains_codes[found.group(1)]
+        return code
+
+    def classify_column(self, descriptions: Series) -> np.ndarray:
+        """Return the class code of every description, 0 for missing ones.
+
+        Each distinct description is classified once, so repeated
+        descriptions cost a lookup.
+        """
+        positions, uniques = descriptions.factorize()
+        # Missing descriptions have position -1, which picks the trailing 0
+        codes = np.fromiter(
+            (self.classify(value) for value in uniques),
+            dtype=np.int64,
+            count=len(uniques),
+        )
+        return np.append(codes, 0)[positions]
+
+    def has(self, codes: np.ndarray, name: str) -> np.ndarray:
+        """Return where the class codes include the named class"""
+        return (codes & self.bits[name]) != 0
@@ -0,0 +1,87 @@
+from bisect import bisect_right
+from datetime import date
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import Series
+
+from src.types.dataclasses import ProjectPart
+
+# Day number of 1970-01-01 in the proleptic Gregorian ordinal, used to line up
+# date.toordinal() with numpy's datetime64[D] epoch days
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+class PartIndex:
+    """Immutable, sorted interval index over a config's project parts.
+
+    The timeline is cut at every part start and end into disjoint segments,
+    and each segment stores the parts covering it in declaration order.
+    Looking up a date is then a bisection over the segment boundaries.
+    """
+
+    def __init__(self, parts: List[ProjectPart]):
+        self.parts: Tuple[ProjectPart, ...] = tuple(
+            part for part in parts if part.name and part.start_date and part.end_date
+        )
+
+        # Segment boundaries as epoch days, end dates are inclusive
+        points = sorted(
+            {self._to_day(part.start_date) for part in self.parts}
+            | {self._to_day(part.end_date) + 1 for part in self.parts}
+        )
+        self.boundaries: Tuple[int, ...] = tuple(points)
+        self._boundary_array = np.array(points, dtype=np.int64)
+        self._boundary_array.setflags(write=False)
+
+        # candidates[i] covers [boundaries[i - 1], boundaries[i]), so the
+        # first and last entries are the empty segments outside all parts
+        self.candidates: Tuple[Tuple[ProjectPart, ...], ...] = ((),) + tuple(
+            tuple(
+                part
+                for part in self.parts
+                if self._to_day(part.start_date) <= point <= self._to_day(part.end_date)
+            )
+            for point in points
+        )
+
+    @staticmethod
+    def _to_day(value: date) -> int:
+        return value.toordinal() - _EPOCH_ORDINAL
+
+    def segment_code(self, session_date: date) -> int:
+        """Return the segment number of a single date"""
+        return bisect_right(self.boundaries, self._to_day(session_date))
+
+    def lookup(self, session_date: date) -> Tuple[ProjectPart, ...]:
+        """Return the parts whose date range contains the given date"""
+        return self.candidates[self.segment_code(session_date)]
+
+    def segment_codes(self, dates: Series) -> np.ndarray:
+        """Return the segment number of every date, missing dates land in segment 0"""
+        days = pd.to_datetime(dates).to_numpy().astype("datetime64[D]").astype(np.int64)
+        # NaT becomes the smallest int64 and therefore sorts before every boundary
+        return np.searchsorted(self._boundary_array, days, side="right")
+
+    def first_match(
+        self,
+        codes: np.ndarray,
+        predicate: Optional[Callable[[ProjectPart], bool]] = None,
+    ) -> np.ndarray:
+        """Return the first candidate part name per segment code, None if none match"""
+        table = np.array(
+            [
+                next(
+                    (
+                        part.name
+                        for part in candidates
+                        if predicate is None or predicate(part)
+                    ),
+                    None,
+                )
+                for candidates in self.candidates
+            ],
+            dtype=object,
+        )
+        return table[codes]
@@ -1,11 +1,34 @@
 from abc import ABC, abstractmethod
 from datetime import date
+from functools import cached_property
+import hashlib
 from typing import Dict, List
 
+from pandas import Series
+
 from src.types.dataclasses import ProjectPart
+from src.types.part_index import PartIndex
 
 
 class ProjectConfig(ABC):
+    def __init__(self):
+        # Built once per instance so labeling never rescans the part list
+        self.part_index = PartIndex(self.get_project_parts())
+        self._check_groupings()
+
+    def _check_groupings(self) -> None:
+        """Raise ValueError when a part is listed in more than one grouping"""
+        part_groups: Dict[str, str] = {}
+        for group_name, part_names in self.get_groupings().items():
+            for part_name in part_names:
+                listed_in = part_groups.setdefault(part_name, group_name)
+                if listed_in != group_name:
+                    raise ValueError(
+                        f"Part {part_name!r} is listed in groupings "
+                        f"{listed_in!r} and {group_name!r}, a part can only "
+                        f"belong to one grouping"
+                    )
+
     @property
     @abstractmethod
     def display_name(self) -> str:
@@ -18,6 +41,17 @@ class ProjectConfig(ABC):
         """Return a detailed description of the project config"""
         pass
 
+    @cached_property
+    def version(self) -> str:
+        """Return a version identifying the labeling rules, used for caching.
+
+        Defaults to a digest of the project parts and groupings, computed once
+        per instance. Override it and change the value whenever label_session
+        logic changes.
+        """
+        rules = repr((self.get_project_parts(), self.get_groupings()))
+        return hashlib.sha256(rules.encode()).hexdigest()[:16]
+
     @abstractmethod
     def get_project_parts(self) -> List[ProjectPart]:
         """Return list of project parts with their date ranges"""
@@ -32,3 +66,18 @@ class ProjectConfig(ABC):
     def label_session(self, session_date: date, description: str) -> str:
         """Label each session based on date and description"""
         pass
+
+    def label_sessions(self, dates: Series, descriptions: Series) -> Series:
+        """Label a batch of sessions, one label per row.
+
+        Configs can override this with whole-column operations. The default
+        falls back to calling label_session for every row.
+        """
+        return Series(
+            [
+                self.label_session(session_date, description)
+                for session_date, description in zip(dates, descriptions)
+            ],
+            index=dates.index,
+            dtype=object,
+        )
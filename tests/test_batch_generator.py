@@ -0,0 +1,84 @@
+import json
+import os
+
+import pytest
+
+from benchmarks.synthetic import write_csv
+from src import batch_generator, incremental
+from src.batch_generator import MANIFEST_NAME, BatchGenerator
+from src.project_configs.web_dev import WebDevConfig
+
+
+@pytest.fixture
+def teams(tmp_path):
+    root = tmp_path / "teams"
+    for team in ("alpha", "beta"):
+        (root / team).mkdir(parents=True)
+        write_csv(root / team / "member_hours.csv", 50, profile="webdev")
+    return root
+
+
+@pytest.fixture
+def hashed(monkeypatch):
+    hashed = []
+
+    def hash_file(path):
+        hashed.append(os.path.basename(os.path.dirname(path)))
+        return original(path)
+
+    original = incremental.hash_file
+    monkeypatch.setattr(incremental, "hash_file", hash_file)
+    return hashed
+
+
+def run(root, output_dir, workers=2):
+    return BatchGenerator(
+        WebDevConfig(), "web_dev", root, output_dir, workers=workers, pool="thread"
+    ).run()
+
+
+def test_only_changed_files_are_hashed_again(teams, tmp_path, hashed):
+    output_dir = tmp_path / "reports"
+    summary = run(teams, output_dir)
+    assert sorted(result.name for result in summary.generated) == ["alpha", "beta"]
+    assert sorted(hashed) == ["alpha", "beta"]
+
+    # Unchanged files keep their recorded hash
+    hashed.clear()
+    summary = run(teams, output_dir)
+    assert sorted(summary.skipped) == ["alpha", "beta"]
+    assert hashed == []
+
+    # A touched file is hashed again, but its report is still up to date
+    csv_path = teams / "alpha" / "member_hours.csv"
+    os.utime(csv_path, ns=(0, csv_path.stat().st_mtime_ns + 1_000_000_000))
+    summary = run(teams, output_dir)
+    assert sorted(summary.skipped) == ["alpha", "beta"]
+    assert hashed == ["alpha"]
+
+    hashed.clear()
+    write_csv(csv_path, 60, seed=1, profile="webdev")
+    summary = run(teams, output_dir)
+    assert [result.name for result in summary.generated] == ["alpha"]
+    assert hashed == ["alpha"]
+
+    manifest = json.loads((output_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+    assert manifest["alpha"]["files"]["member_hours.csv"]["size"] == (
+        csv_path.stat().st_size
+    )
+
+
+@pytest.mark.parametrize("workers, team_workers", [(2, 1), (1, None)])
+def test_teams_are_the_only_level_of_parallelism(
+    teams, tmp_path, monkeypatch, workers, team_workers
+):
+    options = []
+
+    class RecordingGenerator(batch_generator.ReportGenerator):
+        def __init__(self, *args, **kwargs):
+            options.append((kwargs["workers"], kwargs["render_workers"]))
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(batch_generator, "ReportGenerator", RecordingGenerator)
+    run(teams, tmp_path / "reports", workers=workers)
+    assert options == [(team_workers, team_workers)] * 2
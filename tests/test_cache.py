@@ -0,0 +1,46 @@
+from concurrent.futures import ThreadPoolExecutor
+import io
+
+from src.data_processing.cache import DiskCacheBackend, ProcessedDataCache
+from src.data_processing.processor import DataProcessor
+from src.project_configs.web_dev import WebDevConfig
+
+CSV = b"""startTime,duration,description
+2024-09-20T10:00:00.000000000Z,45,\"\"\"Coding\"\"\"
+2024-09-21T10:00:00.000000000Z,30,\"\"\"Peer review\"\"\"
+"""
+
+
+def test_concurrent_writes_of_one_key(tmp_path):
+    backend = DiskCacheBackend(tmp_path)
+    values = [bytes([i]) * 100_000 for i in range(8)]
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        for _ in pool.map(lambda value: backend.set("k", value), values * 4):
+            pass
+
+    assert backend.get("k") in values
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_corrupt_entry_is_a_miss(tmp_path):
+    cache = ProcessedDataCache(DiskCacheBackend(tmp_path))
+    processor = DataProcessor(WebDevConfig(), cache=cache)
+    expected, _ = processor.get_processed_data(io.BytesIO(CSV))
+
+    [entry] = tmp_path.glob("*.bin")
+    entry.write_bytes(entry.read_bytes()[:40])
+
+    grouped_data, _ = processor.get_processed_data(io.BytesIO(CSV))
+    assert list(grouped_data) == list(expected)
+    # The reprocessed data replaced the corrupt entry
+    assert cache.get(entry.stem) is not None
+
+
+def test_failed_write_does_not_fail_processing(tmp_path):
+    backend = DiskCacheBackend(tmp_path)
+    processor = DataProcessor(WebDevConfig(), cache=ProcessedDataCache(backend))
+    backend.directory = tmp_path / "missing"
+
+    _, summaries = processor.get_processed_data(io.BytesIO(CSV))
+    assert summaries["Project 1"].total_hours == 0.75
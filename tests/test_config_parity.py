@@ -0,0 +1,31 @@
+from pathlib import Path
+
+import pytest
+
+from benchmarks.config_parity import CONFIGS_DIR, PAIRS, compare
+from src.config_store import SqliteConfigStore, load_config, load_spec
+
+
+def require_parser(file_name):
+    # YAML configs need the optional PyYAML
+    if file_name.endswith((".yaml", ".yml")):
+        pytest.importorskip("yaml")
+
+
+@pytest.mark.parametrize("config_class, file_name, profile", PAIRS)
+def test_declarative_config_matches_python_config(config_class, file_name, profile):
+    require_parser(file_name)
+    assert (
+        compare(config_class(), load_config(CONFIGS_DIR / file_name), file_name) == []
+    )
+
+
+@pytest.mark.parametrize("config_class, file_name, profile", PAIRS)
+def test_stored_config_matches_python_config(
+    tmp_path, config_class, file_name, profile
+):
+    require_parser(file_name)
+    store = SqliteConfigStore(tmp_path / "configs.db")
+    key = Path(file_name).stem
+    store.save(key, load_spec(CONFIGS_DIR / file_name))
+    assert compare(config_class(), store.load(key), file_name) == []
@@ -0,0 +1,108 @@
+import os
+import sys
+import textwrap
+
+from src.config_registry import ConfigRegistry
+
+MODULES = {
+    "__init__.py": "",
+    "term.py": """
+        from datetime import date
+
+        from src.types.dataclasses import ProjectPart
+        from src.types.project_config import ProjectConfig
+
+
+        class TermConfig(ProjectConfig):
+            @property
+            def display_name(self):
+                return "Term"
+
+            @property
+            def description(self):
+                return "Base term"
+
+            def get_project_parts(self):
+                return [ProjectPart("P1", date(2024, 9, 1), date(2024, 9, 30))]
+
+            def get_groupings(self):
+                return {"Project 1": ["P1"]}
+
+            def label_session(self, session_date, description):
+                return "P1"
+        """,
+    "fall.py": """
+        from . import term
+
+
+        class FallConfig(term.TermConfig):
+            @property
+            def display_name(self):
+                return "Fall"
+        """,
+    "late_fall.py": """
+        from .fall import FallConfig as Fall
+
+
+        class LateFallConfig(Fall):
+            pass
+        """,
+    "web.py": """
+        from src.project_configs.web_dev import WebDevConfig
+
+
+        class WebConfig(WebDevConfig):
+            pass
+        """,
+    "helpers.py": """
+        class Helper:
+            pass
+        """,
+}
+
+
+def make_registry(tmp_path, monkeypatch, package):
+    configs_dir = tmp_path / package
+    configs_dir.mkdir()
+    for name, source in MODULES.items():
+        (configs_dir / name).write_text(textwrap.dedent(source), encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    return ConfigRegistry(configs_dir, package=package)
+
+
+def test_subclassed_configs_are_found(tmp_path, monkeypatch):
+    registry = make_registry(tmp_path, monkeypatch, "subclassed_configs")
+    entries = registry.entries()
+
+    assert sorted(entries) == ["fall", "late_fall", "term", "web"]
+    assert entries["fall"].name == "Fall"
+    assert entries["late_fall"].name == "Fall"
+    assert entries["late_fall"].description == "Base term"
+    assert type(registry.get("late_fall")).__name__ == "LateFallConfig"
+
+
+def test_only_unresolved_bases_are_imported(tmp_path, monkeypatch):
+    registry = make_registry(tmp_path, monkeypatch, "lazy_configs")
+    assert "fall" in registry and "late_fall" in registry
+
+    # Bases within the folder resolve without importing, web's base is
+    # imported from another package to check it
+    imported = sorted(name for name in sys.modules if name.startswith("lazy_"))
+    assert imported == ["lazy_configs", "lazy_configs.web"]
+
+
+def test_editing_a_base_module_reloads_its_subclasses(tmp_path, monkeypatch):
+    registry = make_registry(tmp_path, monkeypatch, "reloaded_configs")
+    assert registry.get("late_fall").label_session(None, "") == "P1"
+
+    # term was imported by fall, not by the registry
+    term = tmp_path / "reloaded_configs" / "term.py"
+    term.write_text(term.read_text().replace('return "P1"', 'return "P2"'))
+    mtime_ns = term.stat().st_mtime_ns + 1_000_000_000
+    os.utime(term, ns=(mtime_ns, mtime_ns))
+    registry.reload()
+
+    assert registry.get("term").label_session(None, "") == "P2"
+    assert registry.get("late_fall").label_session(None, "") == "P2"
+    assert registry.get("fall").label_session(None, "") == "P2"
+    assert isinstance(registry.get("late_fall"), type(registry.get("term")))
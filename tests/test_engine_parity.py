@@ -0,0 +1,59 @@
+import pytest
+
+from benchmarks.engine_compare import VARIANTS, describe, differences
+from benchmarks.synthetic import write_csv
+from src.formatters import styles
+from src.project_configs.itp2 import ITP2Config
+from src.report_generator import ReportGenerator
+
+
+def render(data_dir, output_path, engine, write_only):
+    generator = ReportGenerator(
+        ITP2Config(),
+        close_open_excel=False,
+        data_dir=data_dir,
+        write_only=write_only,
+        engine=engine,
+    )
+    generator.generate(str(output_path))
+    return describe(output_path)
+
+
+@pytest.fixture(scope="module")
+def data_dir(tmp_path_factory):
+    data_dir = tmp_path_factory.mktemp("data")
+    for i in range(2):
+        write_csv(data_dir / f"student{i}_sessions.csv", 300, seed=i)
+    return data_dir
+
+
+@pytest.fixture(scope="module")
+def reports(tmp_path_factory, data_dir):
+    tmp_path = tmp_path_factory.mktemp("engines")
+    return {
+        (engine, write_only): render(
+            data_dir, tmp_path / f"{engine}-{write_only}.xlsx", engine, write_only
+        )
+        for engine, write_only in VARIANTS
+    }
+
+
+@pytest.mark.parametrize("engine, write_only", VARIANTS[1:])
+def test_engines_match_openpyxl(reports, engine, write_only):
+    assert differences(reports[VARIANTS[0]], reports[(engine, write_only)]) == []
+
+
+def test_reports_have_content(reports):
+    reference = reports[VARIANTS[0]]
+    assert len(reference["sheetnames"]) > 2
+    assert all(reference[title]["cells"] for title in reference["sheetnames"])
+
+
+@pytest.mark.parametrize("engine, write_only", VARIANTS)
+def test_public_style_fallback_matches(
+    reports, data_dir, tmp_path, monkeypatch, engine, write_only
+):
+    # As with an openpyxl release without the style internals
+    monkeypatch.setattr(styles, "STYLE_INTERNALS", False)
+    report = render(data_dir, tmp_path / "report.xlsx", engine, write_only)
+    assert differences(reports[VARIANTS[0]], report) == []
@@ -0,0 +1,96 @@
+import os
+
+import pytest
+
+from benchmarks.engine_compare import describe
+from benchmarks.synthetic import write_csv
+from src.formatters import parallel_engine
+from src.project_configs.itp2 import ITP2Config
+from src.report_generator import ReportGenerator
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    for i in range(3):
+        write_csv(data_dir / f"student{i}_sessions.csv", 200, seed=i)
+    return data_dir
+
+
+@pytest.fixture
+def rendered(monkeypatch):
+    """Titles of the part sheets whose rows are rendered, not reused"""
+    rendered = []
+
+    def write_sheet_data(rows_path, layout, *args):
+        rendered.append(layout.title.split(" - ")[0])
+        return original(rows_path, layout, *args)
+
+    original = parallel_engine._write_sheet_data
+    monkeypatch.setattr(parallel_engine, "_write_sheet_data", write_sheet_data)
+    return rendered
+
+
+def generate(data_dir, output_path, **options):
+    ReportGenerator(
+        ITP2Config(),
+        close_open_excel=False,
+        data_dir=data_dir,
+        render_workers=1,
+        **options,
+    ).generate(str(output_path))
+    return describe(output_path)
+
+
+def csv_order(data_dir):
+    return [name for name in os.listdir(data_dir) if name.endswith(".csv")]
+
+
+def title(name):
+    return name.split("_")[0].capitalize()
+
+
+def check_incremental(data_dir, tmp_path, rendered):
+    """Render incrementally, return the rendered titles after checking the report"""
+    rendered.clear()
+    report = generate(data_dir, tmp_path / "report.xlsx", incremental=True)
+    titles = set(rendered)
+    assert report == generate(data_dir, tmp_path / "full.xlsx", engine="parallel")
+    return titles
+
+
+def test_only_changed_sheets_are_rendered(data_dir, tmp_path, rendered):
+    assert check_incremental(data_dir, tmp_path, rendered) == {
+        "Student0",
+        "Student1",
+        "Student2",
+    }
+    assert check_incremental(data_dir, tmp_path, rendered) == set()
+
+    write_csv(data_dir / "student1_sessions.csv", 250, seed=7)
+    assert check_incremental(data_dir, tmp_path, rendered) == {"Student1"}
+
+    # Files listed after the removed one shift to another color scheme
+    before = csv_order(data_dir)
+    os.remove(data_dir / before[0])
+    shifted = {
+        title(name)
+        for i, name in enumerate(csv_order(data_dir))
+        if before.index(name) != i
+    }
+    assert shifted
+    assert check_incremental(data_dir, tmp_path, rendered) == shifted
+
+    # Only the entries of the last run are kept
+    cache_dir = tmp_path / ".report.xlsx.cache"
+    sheets = describe(tmp_path / "report.xlsx")["sheetnames"]
+    assert len(list((cache_dir / "processed").glob("*.bin"))) == 2
+    assert len(list((cache_dir / "sheets").glob("*.xml"))) == len(sheets) - 1
+
+
+def test_incremental_rejects_other_engines(data_dir, tmp_path):
+    with pytest.raises(ValueError, match="parallel engine"):
+        generate(
+            data_dir, tmp_path / "report.xlsx", incremental=True, engine="xlsxwriter"
+        )
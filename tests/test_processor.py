@@ -0,0 +1,49 @@
+from datetime import date
+import io
+
+import pytest
+
+from src.data_processing.processor import CsvFormatError, DataProcessor
+from src.project_configs.web_dev import WebDevConfig
+
+# The peer review is logged after midnight local time, the day before in UTC
+OFFSET_CSV = b"""startTime,duration,description
+2024-09-21T00:30:00+02:00,30,\"\"\"Peer review\"\"\"
+2024-09-20T23:30:00+01:00,15,\"\"\"Coding\"\"\"
+2024-09-20T10:00:00.000000000Z,45,\"\"\"Coding\"\"\"
+"""
+
+
+def labeled_sessions(chunk_size):
+    processor = DataProcessor(WebDevConfig(), chunk_size=chunk_size)
+    grouped_data, _ = processor.get_processed_data(io.BytesIO(OFFSET_CSV))
+    return {
+        (group, row["Part"], row["Date"], row["Minutes"])
+        for group, df in grouped_data.items()
+        for _, row in df.iterrows()
+    }
+
+
+@pytest.mark.parametrize("chunk_size", [None, 1, 2])
+def test_utc_offsets_keep_the_local_date(chunk_size):
+    assert labeled_sessions(chunk_size) == {
+        ("Peer Reviews", "Peer Review P1 Part 1", date(2024, 9, 21), 30),
+        ("Project 1", "P1 Part 1", date(2024, 9, 20), 15),
+        ("Project 1", "P1 Part 1", date(2024, 9, 20), 45),
+    }
+
+
+@pytest.mark.parametrize("chunk_size", [None, 1])
+def test_empty_duration_still_makes_a_report(chunk_size):
+    csv = OFFSET_CSV.replace(b",15,", b",,")
+    processor = DataProcessor(WebDevConfig(), chunk_size=chunk_size)
+    _, summaries = processor.get_processed_data(io.BytesIO(csv))
+    assert summaries["Project 1"].total_hours == 0.75
+
+
+@pytest.mark.parametrize("chunk_size", [None, 1])
+def test_invalid_duration_names_the_column(chunk_size):
+    csv = OFFSET_CSV.replace(b",15,", b",15 min,")
+    processor = DataProcessor(WebDevConfig(), chunk_size=chunk_size)
+    with pytest.raises(CsvFormatError, match="'duration'.*'15 min' on line 3"):
+        processor.get_processed_data(io.BytesIO(csv))
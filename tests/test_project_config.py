@@ -0,0 +1,16 @@
+import pytest
+
+from src.project_configs.web_dev import WebDevConfig
+
+
+class OverlappingConfig(WebDevConfig):
+    def get_groupings(self):
+        groupings = super().get_groupings()
+        # The first part of Project 1 is also listed under Peer Reviews
+        groupings["Peer Reviews"] = groupings["Peer Reviews"] + ["P1 Part 1"]
+        return groupings
+
+
+def test_parts_in_several_groupings_are_rejected():
+    with pytest.raises(ValueError, match="'P1 Part 1'.*'Project 1' and 'Peer Reviews'"):
+        OverlappingConfig()
@@ -0,0 +1,69 @@
+import io
+
+import pytest
+
+from app import create_app
+from app.report_cache import ReportCache
+from src.project_configs.web_dev import WebDevConfig
+
+CSV = b"""startTime,duration,description
+2024-09-20T10:00:00.000000000Z,45,\"\"\"Coding\"\"\"
+2024-09-21T10:00:00.000000000Z,30,\"\"\"Peer review\"\"\"
+"""
+
+
+def key_for(config=None, name="alice_hours.csv", engine="openpyxl"):
+    return ReportCache.key_for(
+        "web_dev",
+        config or WebDevConfig(),
+        [(name, CSV)],
+        "Report.xlsx",
+        {"engine": engine},
+    )
+
+
+def test_key_follows_the_report_inputs(monkeypatch):
+    key = key_for()
+    assert key_for() == key
+    assert key_for(name="bob_hours.csv") != key
+    assert key_for(engine="xlsxwriter") != key
+
+    monkeypatch.setattr(WebDevConfig, "version", property(lambda self: "changed"))
+    assert key_for() != key
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("CACHE_FOLDER", str(tmp_path / "cache"))
+    return create_app().test_client()
+
+
+def post_report(client, headers=None):
+    return client.post(
+        "/generate",
+        data={
+            "config": "web_dev",
+            "filename": "Report",
+            "files": [(io.BytesIO(CSV), "alice_hours.csv")],
+        },
+        content_type="multipart/form-data",
+        headers=headers,
+    )
+
+
+def test_matching_etag_is_not_generated_again(client, monkeypatch):
+    executor = client.application.config["GENERATION_EXECUTOR"]
+    response = post_report(client)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    async def generate(*args, **kwargs):
+        raise AssertionError("generated a report the client already has")
+
+    monkeypatch.setattr(executor, "generate", generate)
+    completed = executor.metrics()["completed"]
+    response = post_report(client, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert executor.metrics()["completed"] == completed